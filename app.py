@@ -1,11 +1,36 @@
+import atexit
+import click
 from flask import Flask
 from flask_cors import CORS
-from src.routes import default_bp, plus_one_bp, minus_one_bp, read_bp, register_bp, login_bp, get_security_question_bp, forgot_password_bp, data_analysis_bp
+from env import env
+from src.database import MongoDB, Indexes, close_counter_buffer, counter_buffer_stats, get_view_engine, close_view_engine, view_engine_stats
+from src.notifications import close_webhook_dispatcher, close_webhook_digest, webhook_stats, get_event_broker
+from src.metrics import register_metrics
+from src.middleware import AdmissionControl, get_rate_limiter, get_token_cache, trust_proxies
+from src.serialization import json_provider_class
+from src.security import PasswordHasher, close_password_hasher, password_stats
+from src.analytics import CountStats, get_event_log, close_event_log, event_log_stats
+from src.signals import counts_changed, connect_for_app
+from src.cache import get_user_cache
+from src.routes.data_analysis import get_analysis_cache
+from src.routes.stream import publish_count_changes
+from src.routes.leaderboard import get_leaderboard
+from src.routes.rank import get_rank_index
+from src.routes import default_bp, plus_one_bp, minus_one_bp, read_bp, register_bp, login_bp, get_security_question_bp, forgot_password_bp, data_analysis_bp, metrics_bp, stream_bp, leaderboard_bp, rank_bp, events_bp
 
 def create_app():
     app = Flask(__name__)
     CORS(app, resources={r"/*": {"origins": "*"}})  # Allow all origins
 
+    # Real client addresses for per-IP rate limits behind reverse proxies
+    trust_proxies(app)
+
+    # Fast JSON responses (orjson when installed) with NumPy support
+    app.json = json_provider_class()(app)
+
+    # Per-route-class concurrency limits with fast 503 load shedding
+    admission = AdmissionControl(app)
+
     # Register blueprints
     app.register_blueprint(default_bp)
     app.register_blueprint(plus_one_bp)
@@ -16,7 +41,108 @@ def create_app():
     app.register_blueprint(get_security_question_bp)
     app.register_blueprint(forgot_password_bp)
     app.register_blueprint(data_analysis_bp)
-    
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(stream_bp)
+    app.register_blueprint(leaderboard_bp)
+    app.register_blueprint(rank_bp)
+    app.register_blueprint(events_bp)
+
+    register_metrics('admission', admission.stats)
+    register_metrics('rate_limits', get_rate_limiter(app).stats)
+    register_metrics('auth_tokens', get_token_cache(app).stats)
+    register_metrics('counter_buffer', counter_buffer_stats)
+    register_metrics('webhook', webhook_stats)
+    register_metrics('password_hashing', password_stats)
+
+    # Keep derived data in step with counter writes: from this process's own
+    # writes, or from the users change stream (every process's writes)
+    if env.get('VIEW_ENGINE', False):
+        view_engine = get_view_engine()
+        view_engine.register('count_stats', CountStats.record, CountStats.reconcile)
+        view_engine.start()
+        register_metrics('view_engine', view_engine_stats)
+    else:
+        # One receiver per process: it writes the shared stats document, so
+        # another per app would apply every change once for each app
+        counts_changed.connect(CountStats.onCountsChanged, weak=False)
+
+    # Expires by TTL only: invalidating on every write would empty it under
+    # normal traffic
+    analysis_cache = get_analysis_cache(app)
+    register_metrics('analysis_cache', analysis_cache.stats)
+
+    user_cache = get_user_cache(app)
+    register_metrics('user_cache', user_cache.stats)
+    connect_for_app(app, counts_changed, lambda sender, changes: user_cache.applyCounts(changes))
+    if env.get('USER_CACHE_WATCH', False):
+        # Pick up writes made by other processes (needs a replica set)
+        user_cache.watch()
+        atexit.register(user_cache.close)
+
+    # Push count changes to /stream subscribers
+    broker = get_event_broker(app)
+    register_metrics('stream', broker.stats)
+    connect_for_app(app, counts_changed, lambda sender, changes: publish_count_changes(broker, changes))
+    atexit.register(broker.close)
+
+    leaderboard = get_leaderboard(app)
+    register_metrics('leaderboard', leaderboard.stats)
+    connect_for_app(app, counts_changed, lambda sender, changes: leaderboard.applyCounts(changes))
+
+    rank_index = get_rank_index(app)
+    register_metrics('rank_index', rank_index.stats)
+    connect_for_app(app, counts_changed, lambda sender, changes: rank_index.applyCounts(changes))
+
+    # Time-series log of counter changes with minute/hour/day rollups for /events
+    if env.get('EVENT_LOG', True):
+        register_metrics('event_log', event_log_stats)
+        connect_for_app(app, counts_changed, lambda sender, changes: get_event_log().record(changes))
+
+    @app.cli.command('reconcile-stats')
+    def reconcile_stats():
+        """Rebuild the running count statistics from the users collection."""
+        doc = CountStats.reconcile()
+        print(f"Rebuilt statistics for {doc['n']} users")
+
+    @app.cli.command('calibrate-bcrypt')
+    @click.option('--target-ms', default=250.0, show_default=True, help="Longest acceptable time for one hash.")
+    def calibrate_bcrypt(target_ms):
+        """Pick the bcrypt cost factor that fits the target time on this machine."""
+        rounds, timings = PasswordHasher.calibrate(target_ms)
+        for cost, elapsed_ms in timings.items():
+            print(f"cost {cost:>2}: {elapsed_ms:8.1f} ms")
+        print(f"Set BCRYPT_ROUNDS = {rounds} in env.py")
+
+    # One-time health check; requests reuse the pooled client afterwards
+    if env.get('MONGO_PING_ON_STARTUP', True):
+        try:
+            MongoDB.ping()
+        except Exception as e:
+            print(e)
+
+    if env.get('MONGO_ENSURE_INDEXES', True):
+        try:
+            Indexes.ensureIndexes()
+        except Exception as e:
+            print(f"Failed to ensure indexes: {e}")
+
+    @app.cli.command('ensure-indexes')
+    def ensure_indexes():
+        """Create any missing MongoDB indexes."""
+        for collection_name, index_name in Indexes.ensureIndexes():
+            print(f"{collection_name}: {index_name}")
+
+    # Close the shared connection pool when the process exits; atexit runs
+    # handlers in reverse, so buffered counter writes and webhooks go first
+    # and the event log flushes the changes those writes report
+    atexit.register(MongoDB.closeMongoClient)
+    atexit.register(close_event_log)
+    atexit.register(close_counter_buffer)
+    atexit.register(close_view_engine)
+    atexit.register(close_webhook_dispatcher)
+    atexit.register(close_webhook_digest)
+    atexit.register(close_password_hasher)
+
     return app
 
 if __name__ == "__main__":
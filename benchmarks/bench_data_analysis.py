@@ -0,0 +1,61 @@
+"""
+Compares the /data-analysis strategies against a synthetic users collection.
+
+Needs a reachable MongoDB in env.py. The collection is seeded once and then
+reused; pass --reseed to rebuild it.
+
+    python -m benchmarks.bench_data_analysis --users 1000000
+    python -m benchmarks.bench_data_analysis --users 10000000 --reseed
+    python -m benchmarks.bench_data_analysis --workers 1 2 4 8 16 --processes
+"""
+import argparse
+import time
+import numpy as np
+from src.database.MongoDB import MongoDB
+from src.analytics.ScanStats import ScanStats
+from src.analytics.AggregateStats import AggregateStats
+from src.analytics.StreamingStats import StreamingStats
+from src.analytics.PartitionedScan import PartitionedScan
+
+def seed(collection, users, batch_size=50000):
+    collection.drop()
+    rng = np.random.default_rng(0)
+    for start in range(0, users, batch_size):
+        size = min(batch_size, users - start)
+        counts = rng.poisson(20, size)
+        collection.insert_many(
+            [{"email": f"user{start + i}@example.com", "count": int(c)} for i, c in enumerate(counts)],
+            ordered=False
+        )
+
+def timed(name, fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    print(f"{name:<10} best of {repeat}: {best * 1000:10.1f} ms  n={result['n']} mean={result['mean']:.4f} median={result['median']}")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--reseed', action='store_true')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--processes', action='store_true', help="scan partitions in worker processes")
+    args = parser.parse_args()
+
+    db = MongoDB.getMongoClient().get_database()
+    collection = db.get_collection('bench_users')
+    if args.reseed or collection.estimated_document_count() != args.users:
+        print(f"Seeding {args.users} users...")
+        seed(collection, args.users)
+
+    timed('scan', lambda: ScanStats.compute(collection), args.repeat)
+    timed('aggregate', lambda: AggregateStats.compute(collection), args.repeat)
+    timed('streaming', lambda: StreamingStats.compute(collection), args.repeat)
+    for workers in args.workers:
+        timed(f'part x{workers}', lambda: PartitionedScan.compute(collection, workers=workers, processes=args.processes), args.repeat)
+
+if __name__ == '__main__':
+    main()
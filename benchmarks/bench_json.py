@@ -0,0 +1,59 @@
+"""
+Measures the time to build one JSON response with each JSON provider, for
+a counter response and a /data-analysis response holding NumPy floats.
+
+Needs no database. The orjson provider is skipped when orjson is not installed.
+
+    python -m benchmarks.bench_json
+    python -m benchmarks.bench_json --responses 200000
+"""
+import argparse
+import time
+import numpy as np
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from src.serialization import JsonProvider
+from src.serialization.JsonProvider import NumpyJSONProvider, OrjsonJSONProvider
+
+def payloads():
+    counts = np.random.default_rng(0).poisson(20, 10000).astype(float)
+    return {
+        'counter': {"email": "user@example.com", "count": 42},
+        'data_analysis': {
+            "n": int(counts.size),
+            "mean": np.mean(counts),
+            "median": np.median(counts),
+            "std_dev": np.std(counts),
+            "variance": np.var(counts),
+            "min": np.min(counts),
+            "max": np.max(counts)
+        },
+    }
+
+def timed(app, payload, responses):
+    with app.app_context():
+        started = time.perf_counter()
+        for _ in range(responses):
+            app.json.response(payload).get_data()
+        return (time.perf_counter() - started) / responses * 1e6
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--responses', type=int, default=50000)
+    args = parser.parse_args()
+
+    providers = {'flask': DefaultJSONProvider, 'numpy': NumpyJSONProvider}
+    if JsonProvider.orjson is not None:
+        providers['orjson'] = OrjsonJSONProvider
+
+    print(f"{'payload':<15}" + "".join(f"{name:>10}" for name in providers) + "  (us per response)")
+    for name, payload in payloads().items():
+        row = f"{name:<15}"
+        for provider in providers.values():
+            app = Flask(__name__)
+            app.json = provider(app)
+            row += f"{timed(app, payload, args.responses):10.2f}"
+        print(row)
+
+if __name__ == '__main__':
+    main()
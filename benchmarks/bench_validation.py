@@ -0,0 +1,53 @@
+"""
+Measures the cost of validating one request body with each route's schema,
+building a new schema per request versus reusing one shared instance.
+
+Needs no database.
+
+    python -m benchmarks.bench_validation
+    python -m benchmarks.bench_validation --requests 200000
+"""
+import argparse
+import time
+from src.routes.plus_one.schema import DataSchema as PlusOneSchema
+from src.routes.read.schema import DataSchema as ReadSchema
+from src.routes.login.schema import DataSchema as LoginSchema
+from src.routes.register.schema import DataSchema as RegisterSchema
+from src.routes.get_security_question.schema import DataSchema as SecurityQuestionSchema
+from src.routes.forgot_password.schema import DataSchema as ForgotPasswordSchema
+
+BODIES = {
+    'plus_one': (PlusOneSchema, {"email": "user@example.com", "auth_token": "token"}),
+    'read': (ReadSchema, {"email": "user@example.com", "auth_token": "token"}),
+    'login': (LoginSchema, {"email": "user@example.com", "password": "password"}),
+    'register': (RegisterSchema, {
+        "email": "user@example.com", "password": "password",
+        "security_question": "Pet?", "security_answer": "Rex"
+    }),
+    'get_security_question': (SecurityQuestionSchema, {"email": "user@example.com"}),
+    'forgot_password': (ForgotPasswordSchema, {
+        "email": "user@example.com", "security_answer": "Rex",
+        "new_password": "password", "confirm_password": "password"
+    }),
+}
+
+def timed(fn, requests):
+    started = time.perf_counter()
+    for _ in range(requests):
+        fn()
+    return (time.perf_counter() - started) / requests * 1e6
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=50000)
+    args = parser.parse_args()
+
+    print(f"{'route':<22} {'per request':>12} {'shared':>12}  (us per validation)")
+    for name, (schema_class, body) in BODIES.items():
+        shared = schema_class()
+        per_request_us = timed(lambda: schema_class().load(body), args.requests)
+        shared_us = timed(lambda: shared.load(body), args.requests)
+        print(f"{name:<22} {per_request_us:12.2f} {shared_us:12.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+from pymongo.errors import OperationFailure
+
+class AggregateStats:
+    """
+    Statistics computed inside MongoDB, so only one small document is returned.
+
+    The median uses the $median accumulator (MongoDB 7.0+, approximate). Older
+    servers reject it, and so does any server when the client requests the
+    strict Stable API (as MongoDB.getMongoClient does), since $median is not
+    part of API version 1. Then the median is read by skipping to the middle
+    of the counts in sorted order. A strict client skips $median up front;
+    otherwise the first rejection is logged and remembered.
+    """
+
+    # None until a server has accepted or rejected $median
+    median_supported = None
+
+    @staticmethod
+    def strictApi(collection):
+        server_api = getattr(collection.database.client.options, 'server_api', None)
+        return getattr(server_api, 'strict', False) is True
+
+    @staticmethod
+    def pipeline(with_median=True):
+        group = {
+            "_id": None,
+            "n": {"$sum": 1},
+            "mean": {"$avg": "$count"},
+            "std_dev": {"$stdDevPop": "$count"},
+            "min": {"$min": "$count"},
+            "max": {"$max": "$count"}
+        }
+        if with_median:
+            group["median"] = {"$median": {"input": "$count", "method": "approximate"}}
+        return [
+            {"$match": {"count": {"$type": "number"}}},
+            {"$group": group},
+            {"$project": {"_id": 0}}
+        ]
+
+    @staticmethod
+    def compute(collection):
+        if AggregateStats.median_supported is None and AggregateStats.strictApi(collection):
+            print("$median is not in the strict Stable API; reading the median from sorted counts")
+            AggregateStats.median_supported = False
+
+        result = None
+        with_median = AggregateStats.median_supported is not False
+        if with_median:
+            try:
+                result = next(collection.aggregate(AggregateStats.pipeline()), None)
+                AggregateStats.median_supported = True
+            except OperationFailure as e:
+                print(f"Server rejected $median, reading the median from sorted counts: {e}")
+                AggregateStats.median_supported = False
+                with_median = False
+        if not with_median:
+            result = next(collection.aggregate(AggregateStats.pipeline(with_median=False)), None)
+            if result is not None:
+                result["median"] = AggregateStats.sortedMedian(collection, result["n"])
+
+        if result is None:
+            return {"n": 0}
+
+        return {
+            "n": result["n"],
+            "mean": float(result["mean"]),
+            "median": float(result["median"]),
+            "std_dev": float(result["std_dev"]),
+            "variance": float(result["std_dev"]) ** 2,
+            "min": float(result["min"]),
+            "max": float(result["max"])
+        }
+
+    @staticmethod
+    def sortedMedian(collection, n):
+        middle = list(
+            collection.find({"count": {"$type": "number"}}, {"_id": 0, "count": 1})
+            .sort("count", 1)
+            .skip((n - 1) // 2)
+            .limit(2 if n % 2 == 0 else 1)
+            .allow_disk_use(True)
+        )
+        return sum(doc["count"] for doc in middle) / len(middle)
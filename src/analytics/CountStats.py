@@ -0,0 +1,146 @@
+import math
+from ..database.MongoDB import MongoDB
+
+class CountStats:
+    """
+    Running statistics over every user's count, kept in a single document.
+
+    The document holds n, the sum and sum of squares of all counts and a
+    histogram of count values, so mean, variance, min, max and median can be
+    derived without reading the users collection.
+    """
+
+    COLLECTION = 'stats'
+    DOC_ID = 'counts'
+
+    @staticmethod
+    def buildUpdate(changes):
+        """
+        Folds (email, old_count, new_count) changes into one $inc update.
+        """
+        inc = {}
+
+        def add(field, value):
+            if value:
+                inc[field] = inc.get(field, 0) + value
+
+        for _, old, new in changes:
+            if new is None:
+                # The user was deleted
+                if old is not None:
+                    add('n', -1)
+                    add('sum', -old)
+                    add('sum_sq', -old * old)
+                    add(f'hist.{old}', -1)
+                continue
+            if old is None:
+                add('n', 1)
+                add('sum', new)
+                add('sum_sq', new * new)
+            else:
+                add('sum', new - old)
+                add('sum_sq', new * new - old * old)
+                add(f'hist.{old}', -1)
+            add(f'hist.{new}', 1)
+        return {"$inc": inc} if inc else None
+
+    @staticmethod
+    def record(changes):
+        update = CountStats.buildUpdate(changes)
+        if update is None:
+            return
+        # No upsert: increments on top of a document reconcile() never built
+        # would describe only the users written since
+        db = MongoDB.getMongoClient().get_database()
+        db.get_collection(CountStats.COLLECTION).update_one(
+            {"_id": CountStats.DOC_ID}, update
+        )
+
+    @staticmethod
+    def onCountsChanged(sender, changes):
+        # Never fail the write that triggered the signal; reconcile repairs drift
+        try:
+            CountStats.record(changes)
+        except Exception as e:
+            print(f"Failed to update count statistics: {e}")
+
+    @staticmethod
+    def read():
+        """
+        Returns:
+            dict: The statistics, or None if the document has not been built yet.
+        """
+        db = MongoDB.getMongoClient().get_database()
+        doc = db.get_collection(CountStats.COLLECTION).find_one({"_id": CountStats.DOC_ID})
+        # A document without n holds only increments, not a full build
+        if doc is None or 'n' not in doc:
+            return None
+        return CountStats.summarize(doc)
+
+    @staticmethod
+    def summarize(doc):
+        histogram = sorted(
+            (int(value), frequency) for value, frequency in doc.get('hist', {}).items() if frequency > 0
+        )
+        n = doc.get('n', 0)
+        if not n or not histogram:
+            return {"n": 0}
+
+        total = doc.get('sum', 0)
+        # Integer arithmetic keeps the variance exact until the final division
+        variance = (n * doc.get('sum_sq', 0) - total * total) / (n * n)
+        return {
+            "n": n,
+            "mean": total / n,
+            "median": CountStats.histogramMedian(histogram, n),
+            "std_dev": math.sqrt(max(variance, 0.0)),
+            "variance": variance,
+            "min": float(histogram[0][0]),
+            "max": float(histogram[-1][0])
+        }
+
+    @staticmethod
+    def histogramMedian(histogram, n):
+        """
+        Median of a sorted [(value, frequency)] histogram, averaging the two
+        middle values when n is even like numpy.median.
+        """
+        lower_rank, upper_rank = (n - 1) // 2, n // 2
+        lower = upper = None
+        seen = 0
+        for value, frequency in histogram:
+            seen += frequency
+            if lower is None and seen > lower_rank:
+                lower = value
+            if seen > upper_rank:
+                upper = value
+                break
+        return (lower + upper) / 2
+
+    @staticmethod
+    def reconcile(session=None):
+        """
+        Rebuilds the statistics document from the users collection.
+
+        Counter writes that land while the rebuild runs may be missed; run it
+        during quiet periods or simply run it again. Pass a snapshot `session`
+        to read the users collection as of that snapshot.
+        """
+        db = MongoDB.getMongoClient().get_database()
+        groups = db.get_collection('users').aggregate([
+            {"$match": {"count": {"$exists": True}}},
+            {"$group": {"_id": "$count", "frequency": {"$sum": 1}}}
+        ], session=session)
+
+        doc = {"_id": CountStats.DOC_ID, "n": 0, "sum": 0, "sum_sq": 0, "hist": {}}
+        for group in groups:
+            value, frequency = group['_id'], group['frequency']
+            doc['n'] += frequency
+            doc['sum'] += value * frequency
+            doc['sum_sq'] += value * value * frequency
+            doc['hist'][str(value)] = frequency
+
+        db.get_collection(CountStats.COLLECTION).replace_one(
+            {"_id": CountStats.DOC_ID}, doc, upsert=True
+        )
+        return doc
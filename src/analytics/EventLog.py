@@ -0,0 +1,292 @@
+import threading
+from datetime import datetime, timedelta, timezone
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from env import env
+from ..database.MongoDB import MongoDB
+
+class EventLog:
+    """
+    Write-behind log of counter changes.
+
+    Every change is kept as a raw event in the counter_events time-series
+    collection and folded into per-minute, per-hour and per-day buckets in
+    counter_rollups, so windowed reads touch one document per bucket instead
+    of scanning events. Positive deltas count as `lost`, negative ones as
+    `unlost`.
+
+    Events and bucket increments are held in memory and written once
+    `max_pending` events are waiting or every `flush_interval` seconds, with
+    one insert_many and one unordered bulk_write of upserts. Changes come
+    from counts_changed, so with the counter buffer a flush's deltas arrive
+    already summed per user.
+
+    Older data is downsampled by expiry: minute buckets live for
+    `retention["minute"]`, hour buckets for `retention["hour"]` and day
+    buckets forever. Raw events expire through the collection's own
+    expireAfterSeconds (see Indexes).
+    """
+
+    EVENTS_COLLECTION = 'counter_events'
+    ROLLUPS_COLLECTION = 'counter_rollups'
+    STEPS = {
+        "minute": timedelta(minutes=1),
+        "hour": timedelta(hours=1),
+        "day": timedelta(days=1),
+    }
+
+    def __init__(self, max_pending=1000, flush_interval=1.0, retention=None):
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        # Granularity -> how long its buckets are kept; None keeps them forever
+        self.retention = dict({"minute": timedelta(days=2), "hour": timedelta(days=90), "day": None}, **(retention or {}))
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._events = []
+        # (granularity, bucket start) -> [lost, unlost]
+        self._rollups = {}
+        self._counters = {"recorded": 0, "flushes": 0, "errors": 0}
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _getDb(self):
+        return MongoDB.getMongoClient().get_database()
+
+    @staticmethod
+    def bucketStart(ts, granularity):
+        """
+        Returns the start of the `granularity` bucket holding `ts`, in UTC;
+        a naive `ts` is taken to be UTC.
+        """
+        ts = ts.replace(tzinfo=timezone.utc) if ts.tzinfo is None else ts.astimezone(timezone.utc)
+        if granularity == "minute":
+            return ts.replace(second=0, microsecond=0)
+        if granularity == "hour":
+            return ts.replace(minute=0, second=0, microsecond=0)
+        if granularity == "day":
+            return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+        raise ValueError(f"Unknown granularity: {granularity}")
+
+    def record(self, changes, now=None):
+        """
+        Buffers counts_changed `changes`; new and deleted users are not
+        counter events and are skipped. Never raises for a failed write.
+        """
+        now = now or datetime.now(timezone.utc)
+        events = [
+            {"ts": now, "meta": {"email": email}, "delta": new - old}
+            for email, old, new in changes
+            if old is not None and new is not None and new != old
+        ]
+        if not events:
+            return
+
+        lost = sum(event["delta"] for event in events if event["delta"] > 0)
+        unlost = -sum(event["delta"] for event in events if event["delta"] < 0)
+        with self._lock:
+            self._events.extend(events)
+            for granularity in self.STEPS:
+                totals = self._rollups.setdefault((granularity, self.bucketStart(now, granularity)), [0, 0])
+                totals[0] += lost
+                totals[1] += unlost
+            self._counters["recorded"] += len(events)
+            should_flush = len(self._events) >= self.max_pending
+
+        if should_flush:
+            # Runs on the thread that reported the change, usually a request
+            # whose write already happened; the background flush retries
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Failed to flush event log: {e}")
+
+    def rollupOperations(self, rollups):
+        """
+        Turns buffered bucket increments into upserts; a bucket's expiry is
+        set when it is first written.
+        """
+        operations = []
+        for (granularity, start), (lost, unlost) in rollups.items():
+            on_insert = {"granularity": granularity, "start": start}
+            if self.retention.get(granularity) is not None:
+                on_insert["expires_at"] = start + self.STEPS[granularity] + self.retention[granularity]
+            operations.append(UpdateOne(
+                {"_id": f"{granularity}:{start.isoformat()}"},
+                {"$inc": {"lost": lost, "unlost": unlost}, "$setOnInsert": on_insert},
+                upsert=True
+            ))
+        return operations
+
+    @staticmethod
+    def failedIndexes(error):
+        """
+        Returns the indexes of the operations that `error` says failed, or
+        None if it does not say, in which case any of them may have failed.
+        """
+        if isinstance(error, BulkWriteError):
+            return {write_error["index"] for write_error in error.details.get("writeErrors", [])}
+        return None
+
+    def flush(self):
+        """
+        Writes buffered events and bucket increments.
+
+        What was not written is put back so the next flush retries it: with
+        a BulkWriteError only the failed items, otherwise the whole write.
+        The first failure is re-raised.
+        """
+        with self._flush_lock:
+            with self._lock:
+                events, self._events = self._events, []
+                rollups, self._rollups = self._rollups, {}
+            if not events and not rollups:
+                return
+
+            db = self._getDb()
+            error = None
+            if events:
+                try:
+                    db.get_collection(self.EVENTS_COLLECTION).insert_many(events, ordered=False)
+                except Exception as e:
+                    error = e
+                    failed = self.failedIndexes(e)
+                    if failed is not None:
+                        events = [event for i, event in enumerate(events) if i in failed]
+                    with self._lock:
+                        self._events[:0] = events
+            if rollups:
+                keys = list(rollups)
+                try:
+                    db.get_collection(self.ROLLUPS_COLLECTION).bulk_write(self.rollupOperations(rollups), ordered=False)
+                except Exception as e:
+                    error = error or e
+                    failed = self.failedIndexes(e)
+                    if failed is not None:
+                        keys = [key for i, key in enumerate(keys) if i in failed]
+                    with self._lock:
+                        for key in keys:
+                            lost, unlost = rollups[key]
+                            totals = self._rollups.setdefault(key, [0, 0])
+                            totals[0] += lost
+                            totals[1] += unlost
+
+            with self._lock:
+                self._counters["flushes"] += 1
+                if error is not None:
+                    self._counters["errors"] += 1
+            if error is not None:
+                raise error
+
+    @staticmethod
+    def window(collection, granularity, buckets, until=None):
+        """
+        Reads the `buckets` most recent `granularity` buckets up to and
+        including the one holding `until` (default: now); the
+        granularity_start index serves the range.
+
+        Returns:
+            list: {"start", "lost", "unlost"} entries, oldest first, with
+            zeros for buckets that saw no changes.
+        """
+        step = EventLog.STEPS[granularity]
+        last = EventLog.bucketStart(until or datetime.now(timezone.utc), granularity)
+        first = last - step * (buckets - 1)
+
+        found = {}
+        docs = collection.find(
+            {"granularity": granularity, "start": {"$gte": first, "$lte": last}},
+            {"_id": 0, "start": 1, "lost": 1, "unlost": 1}
+        ).sort("start", 1)
+        for doc in docs:
+            start = doc["start"]
+            if start.tzinfo is None:
+                # PyMongo returns naive UTC datetimes unless tz_aware is set
+                start = start.replace(tzinfo=timezone.utc)
+            found[start] = doc
+
+        window = []
+        for i in range(buckets):
+            start = first + step * i
+            doc = found.get(start, {})
+            window.append({"start": start, "lost": doc.get("lost", 0), "unlost": doc.get("unlost", 0)})
+        return window
+
+    def pendingCount(self):
+        with self._lock:
+            return len(self._events)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="event-log", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Failed to flush event log: {e}")
+
+    def close(self):
+        """
+        Stops the background flusher and writes whatever is still buffered.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats["pending_events"] = len(self._events)
+            stats["pending_buckets"] = len(self._rollups)
+        return stats
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def get_event_log():
+    """
+    Returns the process-wide event log, starting it on first use.
+    """
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                log = EventLog(
+                    max_pending=int(env.get('EVENT_LOG_MAX_PENDING', 1000)),
+                    flush_interval=int(env.get('EVENT_LOG_FLUSH_INTERVAL_MS', 1000)) / 1000,
+                    retention={
+                        "minute": timedelta(days=float(env.get('ROLLUP_MINUTE_RETENTION_DAYS', 2))),
+                        "hour": timedelta(days=float(env.get('ROLLUP_HOUR_RETENTION_DAYS', 90)))
+                    }
+                )
+                log.start()
+                _shared = log
+    return _shared
+
+def close_event_log():
+    """
+    Flushes and stops the shared event log, if one was started.
+    """
+    global _shared
+    with _shared_lock:
+        log, _shared = _shared, None
+    if log is not None:
+        try:
+            log.close()
+        except Exception as e:
+            print(f"Failed to flush event log: {e}")
+
+def event_log_stats():
+    log = _shared
+    if log is None:
+        return {}
+    return log.stats()
@@ -0,0 +1,85 @@
+import math
+import numpy as np
+
+class KLLSketch:
+    """
+    KLL quantile sketch (Karnin, Lang and Liberty, 2016).
+
+    Items live in levels of compactors; an item at level h stands for 2**h
+    inputs. When a level outgrows its capacity it is sorted and every other
+    item, from a random offset, is promoted to the next level. Capacities
+    shrink geometrically towards the lower levels, so the sketch keeps about
+    3k items no matter how many values it has seen. Sketches built on
+    different data merge level by level.
+    """
+
+    def __init__(self, k=200, seed=None):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        if not values.size:
+            return
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.n += int(values.size)
+        self._compress()
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            if self.levels[level].size <= self._capacity(level):
+                level += 1
+                continue
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(self.levels[level])
+            # An odd item out stays behind so total weight remains exactly n
+            kept = items[-1:] if items.size % 2 else items[:0]
+            if items.size % 2:
+                items = items[:-1]
+            offset = int(self._rng.integers(2))
+            self.levels[level] = kept
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], items[offset::2]])
+            # Adding a level shrinks the capacity of every level below it
+            level = 0
+
+    def size(self):
+        return sum(items.size for items in self.levels)
+
+    def quantiles(self, fractions):
+        """
+        Returns approximate values at each rank fraction in `fractions`.
+        """
+        if not self.n:
+            return [None for _ in fractions]
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(level.size, 2 ** h, dtype=np.int64) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, cumulative = items[order], np.cumsum(weights[order])
+        results = []
+        for fraction in fractions:
+            index = int(np.searchsorted(cumulative, fraction * self.n, side='left'))
+            results.append(float(items[min(index, items.size - 1)]))
+        return results
+
+    def rankError(self):
+        """
+        Normalized rank error that holds with about 99% confidence, using the
+        empirical fit published with the Apache DataSketches KLL sketch.
+        """
+        return 2.296 / self.k ** 0.9723
@@ -0,0 +1,150 @@
+import threading
+import time
+from ..database.MongoDB import MongoDB
+
+class Leaderboard:
+    """
+    The users with the highest counts, kept in memory.
+
+    Users are ranked by count, highest first, with ties broken by email.
+    The board holds exactly the users ranked above a bound: everyone who is
+    not on the board ranks at or below it. A change that moves a user above
+    the bound puts them on the board and one that moves a member below it
+    takes them off, so counter writes keep the board exact without reading
+    the database. Once more than `size` + `slack` users are on it, the lowest
+    is dropped and becomes the new bound; once fewer than `size` are left,
+    the board is reloaded. It is also reloaded every `ttl` seconds to pick
+    up writes made by other processes.
+    """
+
+    def __init__(self, size=100, slack=100, ttl=60.0):
+        self.size = size
+        self.capacity = size + slack
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._members = {}
+        # Rank key of the best user not on the board; None if all users are on it
+        self._bound = None
+        self._loaded_at = None
+        self._ranking = None
+        # Changes that arrive while a reload runs, replayed on top of it
+        self._replay = None
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def rankKey(email, count):
+        return (-count, email)
+
+    def applyCounts(self, changes):
+        """
+        Applies counts_changed `changes`; new_count None means the user was deleted.
+        """
+        with self._lock:
+            if self._replay is not None:
+                self._replay.extend(changes)
+            self._applyLocked(changes)
+
+    def _applyLocked(self, changes):
+        if self._loaded_at is None:
+            return
+        for email, old, new in changes:
+            if new is not None and (self._bound is None or self.rankKey(email, new) < self._bound):
+                self._members[email] = new
+            else:
+                self._members.pop(email, None)
+            self._ranking = None
+
+        while len(self._members) > self.capacity:
+            lowest = max(self._members.items(), key=lambda member: self.rankKey(*member))
+            del self._members[lowest[0]]
+            self._bound = self.rankKey(*lowest)
+
+    def _rankingLocked(self):
+        if self._ranking is None:
+            self._ranking = sorted(
+                ({"email": email, "count": count} for email, count in self._members.items()),
+                key=lambda entry: self.rankKey(entry["email"], entry["count"])
+            )
+        return self._ranking
+
+    def _usable(self):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.ttl:
+            return False
+        return self._bound is None or len(self._members) >= self.size
+
+    def top(self, offset=0, limit=10):
+        """
+        Returns:
+            list: {"email", "count"} entries ranked `offset` to `offset + limit`,
+            or None if that page is past what the board holds.
+        """
+        if not self._usable():
+            self.reload()
+        with self._lock:
+            ranking = self._rankingLocked()
+            if self._bound is not None and offset + limit > len(ranking):
+                self._misses += 1
+                return None
+            self._hits += 1
+            return ranking[offset:offset + limit]
+
+    def reload(self, collection=None):
+        """
+        Reloads the board from the users collection; concurrent callers wait
+        for a single reload.
+        """
+        with self._load_lock:
+            if self._usable():
+                return
+            with self._lock:
+                self._replay = []
+            try:
+                if collection is None:
+                    collection = MongoDB.getMongoClient().get_database().get_collection('users')
+                docs = list(Leaderboard.page(collection, 0, self.capacity + 1))
+            except Exception:
+                with self._lock:
+                    self._replay = None
+                raise
+
+            with self._lock:
+                self._members = {doc["email"]: doc["count"] for doc in docs[:self.capacity]}
+                self._bound = self.rankKey(docs[-1]["email"], docs[-1]["count"]) if len(docs) > self.capacity else None
+                self._loaded_at = time.monotonic()
+                self._ranking = None
+                # Counts in changes are absolute, so replaying one the load
+                # already saw is harmless
+                replay, self._replay = self._replay, None
+                self._applyLocked(replay)
+
+    @staticmethod
+    def maskEmail(email):
+        """
+        Hides all but the first character of the local part of `email`.
+        """
+        local, at, domain = email.partition('@')
+        return f"{local[:1]}***{at}{domain}"
+
+    @staticmethod
+    def page(collection, offset, limit):
+        """
+        Reads one page of the ranking from the database; the
+        count_desc_email index serves the sort.
+        """
+        return collection.find(
+            {"count": {"$exists": True}},
+            {"_id": 0, "email": 1, "count": 1}
+        ).sort([("count", -1), ("email", 1)]).skip(offset).limit(limit)
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "members": len(self._members),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": self._hits / lookups if lookups else None
+            }
@@ -0,0 +1,50 @@
+import math
+import numpy as np
+
+class Moments:
+    """
+    Count, mean, sum of squared deviations, min and max of a stream of values.
+
+    Each chunk is reduced with NumPy and merged with Chan et al.'s parallel
+    update, which stays numerically stable where sum / sum-of-squares would
+    cancel catastrophically. Two Moments built on different data can be
+    merged the same way.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        if not values.size:
+            return
+        chunk = Moments()
+        chunk.n = int(values.size)
+        chunk.mean = float(values.mean())
+        chunk.m2 = float(np.square(values - chunk.mean).sum())
+        chunk.min = float(values.min())
+        chunk.max = float(values.max())
+        self.merge(chunk)
+
+    def merge(self, other):
+        if not other.n:
+            return
+        if not self.n:
+            self.n, self.mean, self.m2, self.min, self.max = other.n, other.mean, other.m2, other.min, other.max
+            return
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.n = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self):
+        # Population variance, matching numpy.var
+        return self.m2 / self.n if self.n else 0.0
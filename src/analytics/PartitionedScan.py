@@ -0,0 +1,134 @@
+import math
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import numpy as np
+from ..database.MongoDB import MongoDB
+from .Moments import Moments
+from .CountStats import CountStats
+
+class PartitionedScan:
+    """
+    Exact statistics from several concurrent cursors over `_id` ranges.
+
+    Each worker reduces its range to Moments plus an exact histogram of count
+    values, and the partials are merged. Counts are integers with a small
+    spread, so the histograms stay small and the median is exact.
+    """
+
+    @staticmethod
+    def boundaries(collection, partitions, oversample=32):
+        """
+        Picks `partitions - 1` split points from a random sample of `_id`s so
+        each range holds roughly the same number of documents.
+        """
+        if partitions < 2:
+            return []
+        sample = sorted(
+            doc['_id'] for doc in collection.aggregate([
+                {"$sample": {"size": partitions * oversample}},
+                {"$project": {"_id": 1}}
+            ])
+        )
+        if not sample:
+            return []
+        points = [sample[len(sample) * i // partitions] for i in range(1, partitions)]
+        # Small collections can sample the same _id twice
+        return sorted(set(points))
+
+    @staticmethod
+    def ranges(boundaries):
+        edges = [None] + list(boundaries) + [None]
+        return list(zip(edges[:-1], edges[1:]))
+
+    @staticmethod
+    def scanRange(collection, lower, upper, batch_size=65536):
+        id_filter = {}
+        if lower is not None:
+            id_filter["$gte"] = lower
+        if upper is not None:
+            id_filter["$lt"] = upper
+        query = {"count": {"$type": "number"}}
+        if id_filter:
+            query["_id"] = id_filter
+
+        moments = Moments()
+        histogram = Counter()
+        buffer = np.empty(batch_size, dtype=np.int64)
+        filled = 0
+
+        def fold(values):
+            moments.update(values)
+            unique, frequencies = np.unique(values, return_counts=True)
+            histogram.update(dict(zip(unique.tolist(), frequencies.tolist())))
+
+        for doc in collection.find(query, {"_id": 0, "count": 1}).batch_size(batch_size):
+            buffer[filled] = doc['count']
+            filled += 1
+            if filled == batch_size:
+                fold(buffer)
+                filled = 0
+        if filled:
+            fold(buffer[:filled])
+        return moments, histogram
+
+    @staticmethod
+    def merge(partials):
+        moments = Moments()
+        histogram = Counter()
+        for partial_moments, partial_histogram in partials:
+            moments.merge(partial_moments)
+            histogram.update(partial_histogram)
+        return moments, histogram
+
+    @staticmethod
+    def summarize(moments, histogram):
+        if not moments.n:
+            return {"n": 0}
+        variance = moments.variance
+        return {
+            "n": moments.n,
+            "mean": moments.mean,
+            "median": float(CountStats.histogramMedian(sorted(histogram.items()), moments.n)),
+            "std_dev": math.sqrt(variance),
+            "variance": variance,
+            "min": moments.min,
+            "max": moments.max
+        }
+
+    @staticmethod
+    def compute(collection, workers=4, partition_size=250000, batch_size=65536, processes=False):
+        """
+        Scans `collection` with `workers` concurrent cursors.
+
+        The collection is cut into ranges of about `partition_size` documents
+        (at least one per worker). With `processes` set, ranges are scanned in
+        worker processes, which sidesteps the GIL for BSON decoding; each
+        process opens its own client.
+        """
+        estimated = collection.estimated_document_count()
+        partitions = max(workers, math.ceil(estimated / partition_size)) if estimated else 1
+        ranges = PartitionedScan.ranges(PartitionedScan.boundaries(collection, partitions))
+
+        if processes:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                partials = list(pool.map(
+                    _scanRangeInProcess,
+                    [collection.name] * len(ranges),
+                    [lower for lower, _ in ranges],
+                    [upper for _, upper in ranges],
+                    [batch_size] * len(ranges)
+                ))
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                partials = list(pool.map(
+                    lambda bounds: PartitionedScan.scanRange(collection, bounds[0], bounds[1], batch_size),
+                    ranges
+                ))
+
+        return PartitionedScan.summarize(*PartitionedScan.merge(partials))
+
+
+def _scanRangeInProcess(collection_name, lower, upper, batch_size):
+    # Module-level so ProcessPoolExecutor can pickle it
+    collection = MongoDB.getMongoClient().get_database().get_collection(collection_name)
+    return PartitionedScan.scanRange(collection, lower, upper, batch_size)
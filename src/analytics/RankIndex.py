@@ -0,0 +1,166 @@
+import bisect
+import threading
+import time
+from ..database.MongoDB import MongoDB
+
+class RankIndex:
+    """
+    How many users have each count, in a Fenwick tree over the distinct count
+    values in sorted order, so the rank and percentile of any count take
+    O(log D) for D distinct counts, however far apart the counts are.
+
+    A count value the tree has not seen yet rebuilds it in O(D). Values whose
+    last user moved away stay in the tree with frequency 0 until the next
+    rebuild from the database.
+
+    Kept current by applyCounts() and rebuilt from the users collection by
+    reconcile(). Once the last rebuild is more than `ttl` seconds old, the
+    next lookup starts another in the background and is answered from the
+    current tree meanwhile. Writes that land while a rebuild runs can be
+    off by one each until the next rebuild.
+    """
+
+    def __init__(self, ttl=300.0):
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._reconcile_lock = threading.RLock()
+        self._frequencies = {}
+        # The tree's count values in ascending order, and value -> 1-based position
+        self._values = []
+        self._positions = {}
+        self._tree = [0]
+        self._players = 0
+        self._reconciled_at = None
+        self._reconciling = False
+
+    def _build(self, values):
+        """
+        Rebuilds the tree over the sorted `values` in O(D).
+        """
+        size = len(values)
+        tree = [0] * (size + 1)
+        for i, value in enumerate(values, 1):
+            tree[i] += self._frequencies.get(value, 0)
+            parent = i + (i & -i)
+            if parent <= size:
+                tree[parent] += tree[i]
+        self._values = values
+        self._positions = {value: i for i, value in enumerate(values, 1)}
+        self._tree = tree
+
+    def _add(self, value, delta):
+        frequency = self._frequencies.get(value, 0) + delta
+        if frequency:
+            self._frequencies[value] = frequency
+        else:
+            self._frequencies.pop(value, None)
+        self._players += delta
+
+        i = self._positions.get(value)
+        if i is None:
+            # New value: the rebuild already includes this change
+            self._values.insert(bisect.bisect_left(self._values, value), value)
+            self._build(self._values)
+            return
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _atMost(self, value):
+        """
+        Returns the number of users whose count is at most `value`.
+        """
+        i = bisect.bisect_right(self._values, value)
+        total = 0
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def applyCounts(self, changes):
+        """
+        Applies counts_changed `changes`; old_count None is a new user and
+        new_count None a deleted one.
+        """
+        with self._lock:
+            if self._reconciled_at is None:
+                return
+            for _, old, new in changes:
+                if old is not None:
+                    self._add(old, -1)
+                if new is not None:
+                    self._add(new, 1)
+
+    def lookup(self, count):
+        """
+        Returns:
+            dict: `rank` (1 for the highest count; ties share a rank),
+            `percentile` (the share of users below `count`, counting ties
+            as half) and `players`.
+        """
+        self._ensureFresh()
+        with self._lock:
+            below = self._atMost(count - 1)
+            at_most = self._atMost(count)
+            players = self._players
+        equal = at_most - below
+        return {
+            "rank": players - at_most + 1,
+            "percentile": 100 * (below + equal / 2) / players if players else None,
+            "players": players
+        }
+
+    def _ensureFresh(self):
+        with self._lock:
+            if self._reconciled_at is not None:
+                if self._reconciling or time.monotonic() - self._reconciled_at < self.ttl:
+                    return
+                self._reconciling = True
+                background = True
+            else:
+                background = False
+        if background:
+            threading.Thread(target=self._reconcileInBackground, daemon=True).start()
+            return
+        with self._reconcile_lock:
+            # Concurrent first lookups share one build
+            if self._reconciled_at is None:
+                self.reconcile()
+
+    def _reconcileInBackground(self):
+        try:
+            self.reconcile()
+        except Exception as e:
+            print(f"Failed to reconcile rank index: {e}")
+        finally:
+            with self._lock:
+                self._reconciling = False
+
+    def reconcile(self, collection=None):
+        """
+        Rebuilds the tree from the users collection.
+        """
+        with self._reconcile_lock:
+            if collection is None:
+                collection = MongoDB.getMongoClient().get_database().get_collection('users')
+            groups = collection.aggregate([
+                {"$match": {"count": {"$exists": True}}},
+                {"$group": {"_id": "$count", "frequency": {"$sum": 1}}}
+            ])
+            frequencies = {group['_id']: group['frequency'] for group in groups}
+
+            with self._lock:
+                self._frequencies = frequencies
+                self._players = sum(frequencies.values())
+                self._build(sorted(frequencies))
+                self._reconciled_at = time.monotonic()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "players": self._players,
+                "distinct_counts": len(self._frequencies),
+                "range": [self._values[0], self._values[-1]] if self._values else None,
+                "reconcile_age_s": time.monotonic() - self._reconciled_at if self._reconciled_at is not None else None
+            }
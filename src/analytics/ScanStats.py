@@ -0,0 +1,26 @@
+import numpy as np
+
+class ScanStats:
+    """
+    Statistics computed client-side with NumPy over every user's count.
+    """
+
+    @staticmethod
+    def compute(collection):
+        all_counts = collection.find({}, {'_id': 0, 'count': 1})
+        count_arr = [doc['count'] for doc in all_counts if 'count' in doc]
+
+        if not count_arr:
+            return {"n": 0}
+
+        np_arr = np.array(count_arr, dtype=float)
+
+        return {
+            "n": int(np_arr.size),
+            "mean": np.mean(np_arr),
+            "median": np.median(np_arr),
+            "std_dev": np.std(np_arr),
+            "variance": np.var(np_arr),
+            "min": np.min(np_arr),
+            "max": np.max(np_arr)
+        }
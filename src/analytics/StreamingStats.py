@@ -0,0 +1,75 @@
+import math
+import numpy as np
+from .Moments import Moments
+from .KLLSketch import KLLSketch
+
+class StreamingStats:
+    """
+    Constant-memory statistics over a cursor of user counts.
+
+    Counts are copied into one preallocated NumPy buffer; each full buffer is
+    folded into exact moments and a KLL sketch for the quantiles, then reused.
+    Memory depends on the batch size and sketch size, not on the number of
+    users. Partial results from separate scans can be merged.
+    """
+
+    QUANTILES = {"median": 0.5, "p90": 0.9, "p99": 0.99, "p99_9": 0.999}
+
+    def __init__(self, k=200, seed=None):
+        self.moments = Moments()
+        self.sketch = KLLSketch(k, seed=seed)
+
+    def update(self, values):
+        self.moments.update(values)
+        self.sketch.update(values)
+
+    def merge(self, other):
+        self.moments.merge(other.moments)
+        self.sketch.merge(other.sketch)
+
+    def consume(self, cursor, batch_size=65536):
+        """
+        Folds the `count` field of every document from `cursor` into the stats.
+        """
+        buffer = np.empty(batch_size, dtype=float)
+        filled = 0
+        for doc in cursor:
+            count = doc.get('count')
+            if count is None:
+                continue
+            buffer[filled] = count
+            filled += 1
+            if filled == batch_size:
+                self.update(buffer)
+                filled = 0
+        if filled:
+            self.update(buffer[:filled])
+        return self
+
+    def summary(self):
+        n = self.moments.n
+        if not n:
+            return {"n": 0}
+        quantiles = dict(zip(self.QUANTILES, self.sketch.quantiles(self.QUANTILES.values())))
+        variance = self.moments.variance
+        return {
+            "n": n,
+            "mean": self.moments.mean,
+            "median": quantiles["median"],
+            "std_dev": math.sqrt(variance),
+            "variance": variance,
+            "min": self.moments.min,
+            "max": self.moments.max,
+            "p90": quantiles["p90"],
+            "p99": quantiles["p99"],
+            "p99_9": quantiles["p99_9"],
+            # Quantiles are within this fraction of n ranks of the exact answer
+            "quantile_rank_error": self.sketch.rankError()
+        }
+
+    @staticmethod
+    def compute(collection, batch_size=65536, k=200):
+        cursor = collection.find(
+            {"count": {"$type": "number"}}, {"_id": 0, "count": 1}
+        ).batch_size(batch_size)
+        return StreamingStats(k).consume(cursor, batch_size).summary()
@@ -0,0 +1,12 @@
+from .CountStats import CountStats
+from .ScanStats import ScanStats
+from .AggregateStats import AggregateStats
+from .Moments import Moments
+from .KLLSketch import KLLSketch
+from .StreamingStats import StreamingStats
+from .PartitionedScan import PartitionedScan
+from .Leaderboard import Leaderboard
+from .RankIndex import RankIndex
+from .EventLog import EventLog, get_event_log, close_event_log, event_log_stats
+
+__all__ = ["CountStats", "ScanStats", "AggregateStats", "Moments", "KLLSketch", "StreamingStats", "PartitionedScan", "Leaderboard", "RankIndex", "EventLog", "get_event_log", "close_event_log", "event_log_stats"]
@@ -0,0 +1,120 @@
+import threading
+import time
+
+class ResultCache:
+    """
+    Caches the result of one expensive computation.
+
+    A result is fresh for `ttl` seconds. Concurrent misses share a single
+    computation (single-flight) instead of each running their own. When
+    `stale_ttl` is positive, a result that expired less than `stale_ttl`
+    seconds ago is still served while one background refresh runs
+    (stale-while-revalidate).
+
+    Results expire by time only; writes to the underlying data are not
+    tracked, so a result may lag them by up to `ttl` seconds.
+    """
+
+    def __init__(self, ttl=5.0, stale_ttl=0.0):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+
+        self._lock = threading.Lock()
+        self._value = None
+        self._computed_at = None
+        self._in_flight = None
+        self._counters = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0,
+                          "recomputes": 0, "errors": 0}
+        self._recompute_ms_total = 0.0
+        self._recompute_ms_last = None
+
+    def get(self, compute):
+        """
+        Returns the cached result, calling `compute()` when there is no usable one.
+        """
+        with self._lock:
+            now = time.monotonic()
+            state = self._state(now)
+            if state == 'fresh':
+                self._counters["hits"] += 1
+                return self._value
+            if state == 'stale':
+                self._counters["stale_hits"] += 1
+                if self._in_flight is None:
+                    self._in_flight = _Flight()
+                    threading.Thread(target=self._refresh, args=(compute, self._in_flight), daemon=True).start()
+                return self._value
+
+            self._counters["misses"] += 1
+            flight = self._in_flight
+            leader = flight is None
+            if leader:
+                flight = self._in_flight = _Flight()
+            else:
+                self._counters["coalesced"] += 1
+
+        if leader:
+            self._refresh(compute, flight)
+        return flight.wait()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            recomputes = stats["recomputes"]
+            stats["recompute_ms_last"] = self._recompute_ms_last
+            stats["recompute_ms_avg"] = self._recompute_ms_total / recomputes if recomputes else None
+            lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+            stats["hit_ratio"] = (stats["hits"] + stats["stale_hits"]) / lookups if lookups else None
+        return stats
+
+    def _state(self, now):
+        if self._computed_at is None:
+            return 'missing'
+        expired_at = self._computed_at + self.ttl
+        if now < expired_at:
+            return 'fresh'
+        if now < expired_at + self.stale_ttl:
+            return 'stale'
+        return 'missing'
+
+    def _refresh(self, compute, flight):
+        started = time.perf_counter()
+        try:
+            value = compute()
+        except Exception as e:
+            with self._lock:
+                self._counters["errors"] += 1
+                self._in_flight = None
+            flight.fail(e)
+            return
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._counters["recomputes"] += 1
+            self._recompute_ms_total += elapsed_ms
+            self._recompute_ms_last = elapsed_ms
+            self._value = value
+            self._computed_at = time.monotonic()
+            self._in_flight = None
+        flight.finish(value)
+
+
+class _Flight:
+    def __init__(self):
+        self._done = threading.Event()
+        self._value = None
+        self._error = None
+
+    def finish(self, value):
+        self._value = value
+        self._done.set()
+
+    def fail(self, error):
+        self._error = error
+        self._done.set()
+
+    def wait(self):
+        self._done.wait()
+        if self._error is not None:
+            raise self._error
+        return self._value
@@ -0,0 +1,260 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from env import env
+from ..database.MongoDB import MongoDB
+
+class UserCache:
+    """
+    Read-through LRU of user document projections, keyed by email.
+
+    Each entry holds the fields loaded so far for one user and expires `ttl`
+    seconds after it was first loaded. At most `max_size` users are kept
+    (0 disables caching). Counter writes are applied write-through with
+    applyCounts(); other writes call invalidate().
+
+    A load that overlaps a write to the same email is returned but not
+    stored, so a slow read can never put an older value back in the cache.
+    """
+
+    COLLECTION = 'users'
+
+    def __init__(self, max_size=10000, ttl=30.0):
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._loading = {}
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._stop = threading.Event()
+        self._watcher = None
+
+    def get(self, email, fields):
+        """
+        Returns:
+            dict: The `fields` of the user with `email` (fields the document
+            lacks are left out), or None if there is no such user.
+        """
+        return self.getMany([email], fields).get(email)
+
+    def getMany(self, emails, fields):
+        """
+        Looks up several users at once; every miss is loaded with a single query.
+
+        Returns:
+            dict: email -> `fields` of that user, for the users that exist.
+        """
+        found = {}
+        misses = []
+        with self._lock:
+            now = time.monotonic()
+            for email in dict.fromkeys(emails):
+                entry = self._entries.get(email)
+                if entry is not None and entry["expires_at"] > now and entry["fields"].issuperset(fields):
+                    self._entries.move_to_end(email)
+                    self._hits += 1
+                    found[email] = self._project(entry["doc"], fields)
+                else:
+                    self._misses += 1
+                    misses.append(email)
+            loading = [self._beginLoad(email) for email in misses]
+        if not misses:
+            return found
+
+        try:
+            docs = self.loadMany(misses, fields) if len(misses) > 1 else {misses[0]: self.load(misses[0], fields)}
+        finally:
+            with self._lock:
+                for email in misses:
+                    self._endLoad(email)
+
+        with self._lock:
+            for email, state in zip(misses, loading):
+                doc = docs.get(email)
+                if doc is None:
+                    continue
+                if not state["dirty"]:
+                    self._store(email, doc, fields)
+                found[email] = self._project(doc, fields)
+        return found
+
+    @staticmethod
+    def _project(doc, fields):
+        return {field: doc[field] for field in fields if field in doc}
+
+    def _beginLoad(self, email):
+        state = self._loading.setdefault(email, {"loads": 0, "dirty": False})
+        state["loads"] += 1
+        return state
+
+    def _endLoad(self, email):
+        state = self._loading[email]
+        state["loads"] -= 1
+        if not state["loads"]:
+            del self._loading[email]
+
+    def _collection(self):
+        return MongoDB.getMongoClient().get_database().get_collection(self.COLLECTION)
+
+    def load(self, email, fields):
+        return self._collection().find_one({"email": email}, dict({"_id": 0}, **{field: 1 for field in fields}))
+
+    def loadMany(self, emails, fields):
+        """
+        Returns:
+            dict: email -> document, from one `$in` query.
+        """
+        projection = dict({"_id": 0, "email": 1}, **{field: 1 for field in fields})
+        return {doc["email"]: doc for doc in self._collection().find({"email": {"$in": emails}}, projection)}
+
+    def _store(self, email, doc, fields):
+        if self.max_size <= 0:
+            return
+        now = time.monotonic()
+        entry = self._entries.pop(email, None)
+        if entry is None or entry["expires_at"] <= now:
+            entry = {"doc": {}, "fields": set(), "expires_at": now + self.ttl, "bytes": 0}
+        self._bytes -= entry["bytes"]
+        entry["doc"].update(self._project(doc, fields))
+        entry["fields"].update(fields)
+        entry["bytes"] = self._sizeof(email, entry["doc"])
+        self._bytes += entry["bytes"]
+        self._entries[email] = entry
+        while len(self._entries) > self.max_size:
+            self._drop(next(iter(self._entries)))
+
+    @staticmethod
+    def _sizeof(email, doc):
+        size = sys.getsizeof(email) + sys.getsizeof(doc)
+        for field, value in doc.items():
+            size += sys.getsizeof(field) + sys.getsizeof(value)
+        return size
+
+    def _drop(self, email):
+        entry = self._entries.pop(email, None)
+        if entry is not None:
+            self._bytes -= entry["bytes"]
+
+    def _touch(self, email):
+        loading = self._loading.get(email)
+        if loading is not None:
+            loading["dirty"] = True
+
+    def applyCounts(self, changes):
+        """
+        Applies counts_changed `changes` to cached counts. An entry whose
+        count does not match the change's old value (an event arrived out of
+        order, say) is dropped instead.
+        """
+        with self._lock:
+            for email, old, new in changes:
+                self._touch(email)
+                entry = self._entries.get(email)
+                if entry is None or "count" not in entry["fields"]:
+                    continue
+                if entry["doc"].get("count") == old:
+                    entry["doc"]["count"] = new
+                else:
+                    self._drop(email)
+
+    def invalidate(self, email):
+        with self._lock:
+            self._touch(email)
+            self._drop(email)
+
+    def clear(self):
+        with self._lock:
+            for loading in self._loading.values():
+                loading["dirty"] = True
+            self._entries.clear()
+            self._bytes = 0
+
+    def watch(self, collection=None):
+        """
+        Keeps the cache in step with writes made by other processes by
+        following a change stream on the users collection in a background
+        thread. Needs a replica set or sharded cluster.
+        """
+        if collection is None:
+            collection = self._collection()
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, args=(collection,), name="user-cache-watch", daemon=True)
+        self._watcher.start()
+
+    def _watch(self, collection):
+        pipeline = [{"$match": {"operationType": {"$in": ["update", "replace", "delete"]}}}]
+        resume_token = None
+        while not self._stop.is_set():
+            try:
+                with collection.watch(pipeline, full_document='updateLookup', resume_after=resume_token, max_await_time_ms=1000) as stream:
+                    while not self._stop.is_set():
+                        change = stream.try_next()
+                        if change is not None:
+                            self._onChange(change)
+                        resume_token = stream.resume_token
+            except Exception as e:
+                print(f"User cache watch failed: {e}")
+                # Changes may have been missed while disconnected
+                self.clear()
+                resume_token = None
+                self._stop.wait(5)
+
+    def _onChange(self, change):
+        doc = change.get("fullDocument")
+        if not doc or "email" not in doc:
+            # Deleted, or gone before it could be looked up
+            self.clear()
+            return
+        with self._lock:
+            self._touch(doc["email"])
+            entry = self._entries.get(doc["email"])
+            if entry is None:
+                return
+            for field in entry["fields"]:
+                if field in doc:
+                    entry["doc"][field] = doc[field]
+                else:
+                    entry["doc"].pop(field, None)
+
+    def close(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": self._hits / lookups if lookups else None
+            }
+
+
+_cache_lock = threading.Lock()
+
+def get_user_cache(app=None):
+    """
+    Returns the user cache of `app` (default: the current app), creating it
+    on first use.
+    """
+    app = app or current_app
+    cache = app.extensions.get('user_cache')
+    if cache is None:
+        with _cache_lock:
+            cache = app.extensions.get('user_cache')
+            if cache is None:
+                cache = UserCache(
+                    max_size=int(env.get('USER_CACHE_SIZE', 10000)),
+                    ttl=float(env.get('USER_CACHE_TTL_S', 30))
+                )
+                app.extensions['user_cache'] = cache
+    return cache
@@ -0,0 +1,4 @@
+from .ResultCache import ResultCache
+from .UserCache import UserCache, get_user_cache
+
+__all__ = ["ResultCache", "UserCache", "get_user_cache"]
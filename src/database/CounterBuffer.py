@@ -0,0 +1,251 @@
+import threading
+import time
+from collections import OrderedDict
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from env import env
+from .MongoDB import MongoDB
+from ..signals import send_counts_changed
+
+class CounterBuffer:
+    """
+    Write-behind buffer for counter increments.
+
+    Deltas are summed per email in memory and written with a single unordered
+    bulk_write once `max_pending` emails are waiting or every `flush_interval`
+    seconds, whichever comes first. At most `max_pending` emails worth of taps,
+    or `flush_interval` seconds of traffic, can be lost if the process dies.
+    """
+
+    def __init__(self, max_pending=500, flush_interval=0.25, base_ttl=30.0, max_bases=10000):
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self.base_ttl = base_ttl
+        self.max_bases = max_bases
+
+        self._lock = threading.Lock()
+        # Serializes flushes with cold base lookups so a lookup never reads a
+        # count that a flush in flight is about to add to the base again
+        self._flush_lock = threading.Lock()
+        self._pending = {}
+        # Deltas a flush has taken but not yet added to their base
+        self._inflight = {}
+        # email -> (last persisted count, time it was read)
+        self._bases = OrderedDict()
+        # Persisted changes that could not be reported through counts_changed
+        self._unreported = 0
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _getCollection(self):
+        return MongoDB.getMongoClient().get_database().get_collection('users')
+
+    def _warmBase(self, email):
+        """
+        Makes sure a fresh base count for `email` is cached.
+
+        Returns:
+            bool: False if no user has this email.
+        """
+        with self._lock:
+            entry = self._bases.get(email)
+            if entry is not None and time.monotonic() - entry[1] < self.base_ttl:
+                self._bases.move_to_end(email)
+                return True
+
+        with self._flush_lock:
+            doc = self._getCollection().find_one({"email": email}, {"_id": 0, "count": 1})
+            if doc is None:
+                return False
+            with self._lock:
+                self._bases[email] = (doc.get('count', 0), time.monotonic())
+                self._bases.move_to_end(email)
+                while len(self._bases) > self.max_bases:
+                    self._bases.popitem(last=False)
+            return True
+
+    def add(self, email, delta):
+        """
+        Buffers `delta` for `email`.
+
+        Returns:
+            int: The predicted count once buffered deltas are written, or None
+            if no user has this email.
+        """
+        while True:
+            if not self._warmBase(email):
+                return None
+            # Base, in-flight and pending deltas are read in one hold of the
+            # lock, so a concurrent flush cannot move a delta between them
+            with self._lock:
+                entry = self._bases.get(email)
+                if entry is None:
+                    # Evicted since it was warmed
+                    continue
+                pending = self._pending.get(email, 0) + delta
+                self._pending[email] = pending
+                count = entry[0] + self._inflight.get(email, 0) + pending
+                should_flush = len(self._pending) >= self.max_pending
+                break
+
+        if should_flush:
+            # The delta stays buffered and the background flush retries it,
+            # so the tap itself succeeded
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Failed to flush counter buffer: {e}")
+        return count
+
+    def flush(self):
+        """
+        Writes all buffered deltas with one bulk_write.
+
+        On failure the deltas that were not written are put back so the next
+        flush retries them; with a BulkWriteError those are only the failed
+        operations, otherwise the whole batch.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                written = {email: delta for email, delta in batch.items() if delta}
+                self._inflight = dict(written)
+            if not written:
+                return
+            emails = list(written)
+            operations = [UpdateOne({"email": email}, {"$inc": {"count": written[email]}}) for email in emails]
+
+            error = None
+            try:
+                self._getCollection().bulk_write(operations, ordered=False)
+            except BulkWriteError as e:
+                error = e
+                failed = {emails[write_error["index"]] for write_error in e.details.get("writeErrors", [])}
+            except Exception:
+                self._requeue(written)
+                raise
+            if error is not None:
+                self._requeue({email: written.pop(email) for email in failed})
+
+            self._report(written)
+            if error is not None:
+                raise error
+
+    def _requeue(self, deltas):
+        with self._lock:
+            for email, delta in deltas.items():
+                self._pending[email] = self._pending.get(email, 0) + delta
+                self._inflight.pop(email, None)
+
+    def _report(self, written):
+        """
+        Sends counts_changed for the persisted `written` deltas. Emails whose
+        base was evicted are read back once, in one query, so their change
+        is still reported.
+        """
+        changes = []
+        evicted = {}
+        with self._lock:
+            for email, delta in written.items():
+                self._inflight.pop(email, None)
+                entry = self._bases.get(email)
+                if entry is None:
+                    evicted[email] = delta
+                    continue
+                self._bases[email] = (entry[0] + delta, entry[1])
+                changes.append((email, entry[0], entry[0] + delta))
+
+        if evicted:
+            try:
+                docs = self._getCollection().find(
+                    {"email": {"$in": list(evicted)}}, {"_id": 0, "email": 1, "count": 1}
+                )
+                for doc in docs:
+                    # Another writer may have moved the count too; the delta
+                    # is still this flush's own
+                    new = doc.get("count", 0)
+                    changes.append((doc["email"], new - evicted[doc["email"]], new))
+            except Exception as e:
+                print(f"Failed to read back counts for {len(evicted)} evicted emails: {e}")
+                with self._lock:
+                    self._unreported += len(evicted)
+
+        if changes:
+            send_counts_changed('counter_buffer', changes)
+
+    def pendingCount(self):
+        with self._lock:
+            return len(self._pending)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "pending": len(self._pending),
+                "bases": len(self._bases),
+                "unreported": self._unreported
+            }
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="counter-buffer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Failed to flush counter buffer: {e}")
+
+    def close(self):
+        """
+        Stops the background flusher and writes whatever is still buffered.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def get_counter_buffer():
+    """
+    Returns the process-wide counter buffer, starting it on first use.
+    """
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                buffer = CounterBuffer(
+                    max_pending=int(env.get('COUNTER_FLUSH_MAX_PENDING', 500)),
+                    flush_interval=int(env.get('COUNTER_FLUSH_INTERVAL_MS', 250)) / 1000,
+                    base_ttl=float(env.get('COUNTER_BASE_TTL_S', 30))
+                )
+                buffer.start()
+                _shared = buffer
+    return _shared
+
+def close_counter_buffer():
+    """
+    Flushes and stops the shared counter buffer, if one was started.
+    """
+    global _shared
+    with _shared_lock:
+        buffer, _shared = _shared, None
+    if buffer is not None:
+        try:
+            buffer.close()
+        except Exception as e:
+            print(f"Failed to flush counter buffer: {e}")
+
+def counter_buffer_stats():
+    buffer = _shared
+    if buffer is None:
+        return {}
+    return buffer.stats()
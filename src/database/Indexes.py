@@ -0,0 +1,70 @@
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import CollectionInvalid
+from env import env
+from .MongoDB import MongoDB
+
+class Indexes:
+    """
+    Indexes the routes rely on, grouped by collection.
+
+    create_index is a no-op when an identical index already exists, so
+    ensureIndexes() is safe to run on every startup.
+    """
+
+    SPECS = {
+        'users': [
+            # Registration relies on this to reject duplicate emails
+            ([("email", ASCENDING)], {"name": "email_unique", "unique": True}),
+            # The leaderboard: highest counts first, ties by email. Walked
+            # backwards it also serves ascending count sorts, e.g. the median
+            # fallback in AggregateStats
+            ([("count", DESCENDING), ("email", ASCENDING)], {"name": "count_desc_email"}),
+        ],
+        'rate_limits': [
+            # Shared rate-limit buckets disappear once idle
+            ([("expires_at", ASCENDING)], {"name": "expires_at_ttl", "expireAfterSeconds": 0}),
+        ],
+        'counter_rollups': [
+            # Windowed reads of one granularity
+            ([("granularity", ASCENDING), ("start", ASCENDING)], {"name": "granularity_start"}),
+            # Minute and hour buckets expire; day buckets have no expires_at and are kept
+            ([("expires_at", ASCENDING)], {"name": "expires_at_ttl", "expireAfterSeconds": 0}),
+        ],
+    }
+
+    # Time-series collections, created before their indexes
+    TIMESERIES = {
+        'counter_events': {"timeField": "ts", "metaField": "meta", "granularity": "seconds"},
+    }
+
+    @staticmethod
+    def ensureIndexes(db=None):
+        """
+        Creates any missing indexes.
+
+        Returns:
+            list: The (collection, index name) pairs that were ensured.
+        """
+        if db is None:
+            db = MongoDB.getMongoClient().get_database()
+        ensured = []
+        for collection_name, specs in Indexes.SPECS.items():
+            collection = db.get_collection(collection_name)
+            for keys, options in specs:
+                ensured.append((collection_name, collection.create_index(keys, **options)))
+        # After the indexes, so a server without time-series support (before
+        # 5.0) or a missing privilege cannot keep them from being created
+        for collection_name, timeseries in Indexes.TIMESERIES.items():
+            # Changing the retention of an existing collection needs collMod
+            retention_days = float(env.get('EVENT_RETENTION_DAYS', 7))
+            try:
+                db.create_collection(
+                    collection_name, timeseries=timeseries, expireAfterSeconds=int(retention_days * 86400)
+                )
+            except CollectionInvalid:
+                pass
+            except Exception as e:
+                print(f"Failed to create time-series collection {collection_name}: {e}")
+                continue
+            ensured.append((collection_name, 'timeseries'))
+        return ensured
@@ -1,28 +1,100 @@
+import os
+import threading
 from certifi import where
 from pymongo import MongoClient
 from pymongo.server_api import ServerApi
 from env import env
 
 class MongoDB:
+    _client = None
+    _client_pid = None
+    _lock = threading.Lock()
+
     @staticmethod
     def getMongoClient():
         """
-        Creates and returns a MongoDB client instance.
-        
+        Returns the process-wide MongoDB client, creating it on first use.
+
+        The client owns a connection pool and is safe to share between threads,
+        so every request reuses it instead of opening a new connection. A client
+        inherited across fork() is discarded and rebuilt in the child.
+
         Raises:
-            Exception: If there is an issue connecting to MongoDB.
-        
+            Exception: If there is an issue creating the MongoDB client.
+
         Returns:
-            MongoClient: An instance of the MongoDB client.
+            MongoClient: The shared instance of the MongoDB client.
         """
-        try:
-            client = MongoClient(
-                env['MONGO_URI'],
-                server_api=ServerApi(version="1", strict=True, deprecation_errors=True),
-                tlsCAFile=where()
-            )
-            # Check if the client can connect to the server
-            client.admin.command('ping')
+        client = MongoDB._client
+        if client is not None and MongoDB._client_pid == os.getpid():
             return client
+
+        with MongoDB._lock:
+            if MongoDB._client is not None and MongoDB._client_pid != os.getpid():
+                # Sockets belong to the parent process; never reuse them here
+                MongoDB._client = None
+
+            if MongoDB._client is None:
+                try:
+                    MongoDB._client = MongoDB._createClient()
+                    MongoDB._client_pid = os.getpid()
+                except Exception as e:
+                    raise Exception(f"Failed to connect to MongoDB client: {str(e)}")
+            return MongoDB._client
+
+    @staticmethod
+    def _createClient():
+        """
+        Builds a new MongoDB client using the pool settings from env.
+
+        Returns:
+            MongoClient: A new, not yet connected MongoDB client.
+        """
+        return MongoClient(
+            env['MONGO_URI'],
+            server_api=ServerApi(version="1", strict=True, deprecation_errors=True),
+            tlsCAFile=where(),
+            maxPoolSize=int(env.get('MONGO_MAX_POOL_SIZE', 100)),
+            minPoolSize=int(env.get('MONGO_MIN_POOL_SIZE', 0)),
+            maxIdleTimeMS=int(env.get('MONGO_MAX_IDLE_TIME_MS', 60000)),
+            serverSelectionTimeoutMS=int(env.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000)),
+            connect=False
+        )
+
+    @staticmethod
+    def ping():
+        """
+        Checks that the shared client can reach the server.
+
+        Raises:
+            Exception: If the server cannot be reached.
+        """
+        try:
+            MongoDB.getMongoClient().admin.command('ping')
         except Exception as e:
             raise Exception(f"Failed to connect to MongoDB client: {str(e)}")
+
+    @staticmethod
+    def closeMongoClient():
+        """
+        Closes the shared client and its pool, if one was created in this process.
+        """
+        with MongoDB._lock:
+            client = MongoDB._client
+            owned = MongoDB._client_pid == os.getpid()
+            MongoDB._client = None
+            MongoDB._client_pid = None
+        if client is not None and owned:
+            client.close()
+
+    @staticmethod
+    def _resetAfterFork():
+        # Runs in the child right after fork(); the lock may have been held by
+        # another thread of the parent at fork time, so replace it outright.
+        MongoDB._lock = threading.Lock()
+        MongoDB._client = None
+        MongoDB._client_pid = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=MongoDB._resetAfterFork)
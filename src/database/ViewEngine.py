@@ -0,0 +1,290 @@
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from bson.timestamp import Timestamp
+from pymongo.errors import DuplicateKeyError, OperationFailure
+from env import env
+from .MongoDB import MongoDB
+
+class ViewEngine:
+    """
+    Keeps derived views of the users collection up to date by following its
+    change stream in a background thread. Needs a replica set or sharded
+    cluster (a single-node replica set is enough).
+
+    A view is registered with an `apply(changes)` callable, which receives
+    (email, old_count, new_count) tuples like counts_changed receivers do
+    (old_count is None for a new user, new_count is None for a deleted one),
+    and a `rebuild(session)` callable that recomputes it from scratch, doing
+    its reads in the given snapshot session.
+
+    The resume token is saved after every event, so a restart continues where
+    the last run stopped; an event can at worst be applied twice if the
+    process dies between applying it and saving the token. With no token, or
+    once the oplog no longer holds it, every view is rebuilt from a snapshot
+    and the stream starts right after that snapshot.
+
+    Only one process consumes the stream at a time: it holds a lease in the
+    view_state collection that it renews every `lease_ttl` / 3 seconds.
+    """
+
+    STATE_COLLECTION = 'view_state'
+    # ChangeStreamFatalError and ChangeStreamHistoryLost
+    HISTORY_LOST_CODES = (280, 286)
+    INVALIDATING_EVENTS = ('invalidate', 'drop', 'rename', 'dropDatabase')
+
+    def __init__(self, db=None, name='users', lease_ttl=30.0, rebuild_interval=60.0):
+        self.db = db
+        self.name = name
+        self.lease_ttl = lease_ttl
+        self.rebuild_interval = rebuild_interval
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{id(self)}"
+
+        self._views = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._lease_renewed_at = None
+        self._rebuild_requested = False
+        self._last_rebuild = None
+        self._counters = {"events": 0, "applied": 0, "rebuilds": 0, "history_lost": 0, "errors": 0}
+
+    def register(self, name, apply, rebuild):
+        self._views[name] = (apply, rebuild)
+
+    def _getDb(self):
+        return self.db if self.db is not None else MongoDB.getMongoClient().get_database()
+
+    def _state(self):
+        return self._getDb().get_collection(self.STATE_COLLECTION)
+
+    def _count(self, counter, amount=1):
+        with self._lock:
+            self._counters[counter] += amount
+
+    def acquireLease(self):
+        """
+        Takes or renews the consumer lease.
+
+        Returns:
+            bool: True if this engine holds the lease.
+        """
+        now = datetime.now(timezone.utc)
+        try:
+            self._state().find_one_and_update(
+                {"_id": self.name, "$or": [{"lease_until": {"$not": {"$gte": now}}}, {"owner": self.owner}]},
+                {"$set": {"owner": self.owner, "lease_until": now + timedelta(seconds=self.lease_ttl)}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # Another process holds an unexpired lease
+            return False
+        self._lease_renewed_at = time.monotonic()
+        return True
+
+    def loadResumeToken(self):
+        doc = self._state().find_one({"_id": self.name}, {"resume_token": 1})
+        return doc.get("resume_token") if doc else None
+
+    def saveResumeToken(self, token):
+        self._state().update_one({"_id": self.name, "owner": self.owner}, {"$set": {"resume_token": token}})
+
+    def clearResumeToken(self):
+        self._state().update_one({"_id": self.name}, {"$unset": {"resume_token": ""}})
+
+    def enablePreImages(self):
+        """
+        Asks the server to record document pre-images for the users
+        collection (MongoDB 6.0+), which updates and deletes need to be applied
+        incrementally. Without them each such event schedules a rebuild.
+        """
+        try:
+            self._getDb().command('collMod', 'users', changeStreamPreAndPostImages={"enabled": True})
+        except Exception as e:
+            print(f"Could not enable change stream pre-images: {e}")
+
+    def rebuild(self):
+        """
+        Rebuilds every view from one snapshot of the database.
+
+        Returns:
+            Timestamp: The first cluster time after the snapshot, where the
+            change stream must start.
+        """
+        client = self._getDb().client
+        with client.start_session(snapshot=True) as session:
+            for name, (_, rebuild) in self._views.items():
+                rebuild(session)
+            # After snapshot reads this is the snapshot's cluster time
+            snapshot_time = session.operation_time
+        self._count("rebuilds")
+        self._last_rebuild = time.monotonic()
+        self._rebuild_requested = False
+        if snapshot_time is None:
+            return None
+        return Timestamp(snapshot_time.time, snapshot_time.inc + 1)
+
+    @staticmethod
+    def toChanges(change):
+        """
+        Turns a change event into (email, old_count, new_count) tuples.
+
+        Returns:
+            list: The count changes (often none), or None when the event
+            cannot be applied incrementally because it has no pre-image.
+        """
+        operation = change.get("operationType")
+        before = change.get("fullDocumentBeforeChange")
+        after = change.get("fullDocument")
+
+        if operation == "insert":
+            if "count" not in after:
+                return []
+            return [(after["email"], None, after["count"])]
+
+        if operation == "update":
+            description = change.get("updateDescription", {})
+            updated = description.get("updatedFields", {})
+            if "count" not in updated and "count" not in description.get("removedFields", []):
+                return []
+            if before is None:
+                return None
+            old, new = before.get("count"), updated.get("count")
+        elif operation == "replace":
+            if before is None:
+                return None
+            old, new = before.get("count"), after.get("count")
+        elif operation == "delete":
+            if before is None:
+                return None
+            old, new = before.get("count"), None
+        else:
+            return []
+
+        if old == new:
+            return []
+        return [(before["email"], old, new)]
+
+    def _apply(self, changes):
+        for name, (apply, _) in self._views.items():
+            try:
+                apply(changes)
+            except Exception as e:
+                # The view is now behind; rebuilding brings it back
+                print(f"Failed to update view {name}: {e}")
+                self._count("errors")
+                self._rebuild_requested = True
+
+    def _rebuildDue(self):
+        return self._rebuild_requested and (
+            self._last_rebuild is None or time.monotonic() - self._last_rebuild >= self.rebuild_interval
+        )
+
+    def consume(self):
+        """
+        Follows the change stream until the engine stops, loses its lease or
+        needs a rebuild.
+        """
+        token = self.loadResumeToken()
+        if token is None or self._rebuildDue():
+            position = {"start_at_operation_time": self.rebuild()}
+        else:
+            position = {"resume_after": token}
+
+        users = self._getDb().get_collection('users')
+        with users.watch(full_document_before_change='whenAvailable', max_await_time_ms=1000, **position) as stream:
+            while not self._stop.is_set():
+                if time.monotonic() - self._lease_renewed_at >= self.lease_ttl / 3 and not self.acquireLease():
+                    return
+                change = stream.try_next()
+                if change is None:
+                    if self._rebuildDue():
+                        return
+                    continue
+
+                self._count("events")
+                if change["operationType"] in self.INVALIDATING_EVENTS:
+                    self.clearResumeToken()
+                    return
+                changes = self.toChanges(change)
+                if changes is None:
+                    self._rebuild_requested = True
+                elif changes:
+                    self._apply(changes)
+                    self._count("applied", len(changes))
+                self.saveResumeToken(change["_id"])
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if not self.acquireLease():
+                    self._stop.wait(self.lease_ttl / 3)
+                    continue
+                self.consume()
+            except OperationFailure as e:
+                if e.code in self.HISTORY_LOST_CODES:
+                    print(f"Change stream history lost, rebuilding views: {e}")
+                    self._count("history_lost")
+                    self.clearResumeToken()
+                    continue
+                print(f"View engine failed: {e}")
+                self._count("errors")
+                self._stop.wait(5)
+            except Exception as e:
+                print(f"View engine failed: {e}")
+                self._count("errors")
+                self._stop.wait(5)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self.enablePreImages()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="view-engine", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+        stats["views"] = list(self._views)
+        stats["leader"] = self._lease_renewed_at is not None and time.monotonic() - self._lease_renewed_at < self.lease_ttl
+        return stats
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def get_view_engine():
+    """
+    Returns the process-wide view engine, creating it (not started) on first use.
+    """
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = ViewEngine(
+                    lease_ttl=float(env.get('VIEW_ENGINE_LEASE_S', 30)),
+                    rebuild_interval=float(env.get('VIEW_ENGINE_REBUILD_INTERVAL_S', 60))
+                )
+    return _shared
+
+def close_view_engine():
+    global _shared
+    with _shared_lock:
+        engine, _shared = _shared, None
+    if engine is not None:
+        engine.close()
+
+def view_engine_stats():
+    engine = _shared
+    if engine is None:
+        return {}
+    return engine.stats()
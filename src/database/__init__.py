@@ -1,3 +1,7 @@
 from .MongoDB import MongoDB
+from .CounterBuffer import CounterBuffer, get_counter_buffer, close_counter_buffer, counter_buffer_stats
+from .Indexes import Indexes
+from .ViewEngine import ViewEngine, get_view_engine, close_view_engine, view_engine_stats
 
-__all__ = ["MongoDB"]
+__all__ = ["MongoDB", "CounterBuffer", "get_counter_buffer", "close_counter_buffer", "counter_buffer_stats", "Indexes",
+           "ViewEngine", "get_view_engine", "close_view_engine", "view_engine_stats"]
@@ -0,0 +1,24 @@
+import threading
+
+_providers = {}
+_lock = threading.Lock()
+
+def register_metrics(name, provider):
+    """
+    Registers a zero-argument callable whose dict result is reported under
+    `name` by the /metrics route.
+    """
+    with _lock:
+        _providers[name] = provider
+
+def collect_metrics():
+    with _lock:
+        providers = dict(_providers)
+
+    metrics = {}
+    for name, provider in providers.items():
+        try:
+            metrics[name] = provider()
+        except Exception as e:
+            metrics[name] = {"error": str(e)}
+    return metrics
@@ -0,0 +1,133 @@
+import threading
+import time
+from flask import g, jsonify, request
+from env import env
+
+class AdmissionLimiter:
+    """
+    Caps how many requests of one class run at once.
+
+    Up to `concurrency` requests run; up to `max_queue` more wait at most
+    `queue_timeout` seconds for a slot. Anything else is rejected at once so
+    the server sheds load instead of letting it pile up.
+    """
+
+    def __init__(self, concurrency, max_queue=0, queue_timeout=2.0):
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._queued = 0
+        self._admitted = 0
+        self._rejected = 0
+
+    def acquire(self):
+        """
+        Returns:
+            bool: True if the request may run; it must then call release().
+        """
+        with self._cond:
+            if self._in_flight < self.concurrency and not self._queued:
+                return self._admit()
+            if self._queued >= self.max_queue:
+                self._rejected += 1
+                return False
+
+            self._queued += 1
+            deadline = time.monotonic() + self.queue_timeout
+            try:
+                while self._in_flight >= self.concurrency:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._rejected += 1
+                        return False
+                    self._cond.wait(remaining)
+            finally:
+                self._queued -= 1
+            return self._admit()
+
+    def _admit(self):
+        self._in_flight += 1
+        self._admitted += 1
+        return True
+
+    def release(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "concurrency": self.concurrency,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "queued": self._queued,
+                "admitted": self._admitted,
+                "rejected": self._rejected
+            }
+
+
+class AdmissionControl:
+    """
+    Applies an AdmissionLimiter per route class to every request, keyed by
+    the blueprint that serves it. Blueprints without a class are not limited.
+    """
+
+    # Route class -> limits; override any of them with ADMISSION_LIMITS in env.py
+    DEFAULT_LIMITS = {
+        'counter': {"concurrency": 64, "queue": 128},
+        'auth': {"concurrency": 8, "queue": 16},
+        'analytics': {"concurrency": 4, "queue": 8},
+    }
+
+    ROUTE_CLASSES = {
+        'plus_one': 'counter',
+        'minus_one': 'counter',
+        'read': 'counter',
+        'leaderboard': 'counter',
+        'rank': 'counter',
+        'login': 'auth',
+        'register': 'auth',
+        'forgot_password': 'auth',
+        'get_security_question': 'auth',
+        'data_analysis': 'analytics',
+        'events': 'analytics',
+    }
+
+    def __init__(self, app=None):
+        self.limiters = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        overrides = env.get('ADMISSION_LIMITS', {})
+        queue_timeout = float(env.get('ADMISSION_QUEUE_TIMEOUT_S', 2))
+        for route_class, limits in self.DEFAULT_LIMITS.items():
+            limits = dict(limits, **overrides.get(route_class, {}))
+            self.limiters[route_class] = AdmissionLimiter(
+                int(limits["concurrency"]), int(limits["queue"]), queue_timeout
+            )
+
+        app.extensions['admission_control'] = self
+        app.before_request(self._before_request)
+        app.teardown_request(self._teardown_request)
+
+    def _before_request(self):
+        limiter = self.limiters.get(self.ROUTE_CLASSES.get(request.blueprint))
+        if limiter is None:
+            return None
+        if not limiter.acquire():
+            return jsonify({"error": "Server busy, try again later"}), 503, {"Retry-After": "1"}
+        g.admission_limiter = limiter
+        return None
+
+    def _teardown_request(self, exc):
+        limiter = g.pop('admission_limiter', None)
+        if limiter is not None:
+            limiter.release()
+
+    def stats(self):
+        return {route_class: limiter.stats() for route_class, limiter in self.limiters.items()}
@@ -0,0 +1,155 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, g, jsonify, request
+from marshmallow import ValidationError
+from env import env
+import jwt
+
+class TokenCache:
+    """
+    LRU of already verified tokens and their claims, bounded to `max_size`.
+
+    Tokens are keyed by a SHA-256 digest of the signing secret and the token,
+    so raw tokens are never kept and rotating the secret misses every entry.
+    An entry lives until the token's `exp` claim or for at most `max_ttl`
+    seconds, whichever comes first.
+    """
+
+    def __init__(self, max_size=10000, max_ttl=300.0):
+        self.max_size = max_size
+        self.max_ttl = max_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def digest(secret, token):
+        return hashlib.sha256(f"{secret}\0{token}".encode('utf-8')).digest()
+
+    def get(self, key):
+        """
+        Returns:
+            dict: The cached claims, or None if the token must be verified again.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.time():
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+            self._misses += 1
+            return None
+
+    def put(self, key, claims):
+        expires_at = time.time() + self.max_ttl
+        if isinstance(claims.get('exp'), (int, float)):
+            expires_at = min(expires_at, claims['exp'])
+        with self._lock:
+            self._entries[key] = (claims, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": self._hits / lookups if lookups else None
+            }
+
+
+_cache_lock = threading.Lock()
+
+def get_token_cache(app=None):
+    """
+    Returns the verified-token cache of `app` (default: the current app),
+    creating it on first use.
+    """
+    app = app or current_app
+    cache = app.extensions.get('token_cache')
+    if cache is None:
+        with _cache_lock:
+            cache = app.extensions.get('token_cache')
+            if cache is None:
+                cache = TokenCache(
+                    max_size=int(env.get('AUTH_TOKEN_CACHE_SIZE', 10000)),
+                    max_ttl=float(env.get('AUTH_TOKEN_CACHE_TTL_S', 300))
+                )
+                app.extensions['token_cache'] = cache
+    return cache
+
+def verify_token(token):
+    """
+    Decodes and verifies an HS256 `token`, reusing an earlier verification
+    when the same token was seen recently.
+
+    Raises:
+        jwt.InvalidTokenError: If the token is invalid or has expired.
+    """
+    secret = env['JWT_SECRET_KEY']
+    cache = get_token_cache()
+    key = TokenCache.digest(secret, token)
+    claims = cache.get(key)
+    if claims is None:
+        claims = jwt.decode(token, secret, algorithms=["HS256"])
+        cache.put(key, claims)
+    return claims
+
+def authenticate(token):
+    """
+    Verifies `token` with verify_token().
+
+    Returns:
+        tuple: (claims, None) if it is valid, otherwise (None, error response).
+    """
+    try:
+        return verify_token(token), None
+    except jwt.ExpiredSignatureError:
+        return None, (jsonify({"error": "Token has expired"}), 401)
+    except jwt.InvalidTokenError:
+        return None, (jsonify({"error": "Invalid token"}), 401)
+    except Exception as e:
+        return None, (jsonify({"error": "Internal server error", "message": str(e)}), 500)
+
+def require_auth(schema_class, match_email=True):
+    """
+    Validates the JSON body against `schema_class`, verifies its `auth_token`
+    and, when `match_email` is set, checks that the token was issued for the
+    body's `email`.
+
+    The decoded claims are available to the view as `g.auth_claims`.
+    """
+    schema = schema_class()
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            data = request.get_json()
+            if not data:
+                return jsonify({"error": "No JSON data provided"}), 400
+
+            try:
+                schema.load(data)
+            except ValidationError as err:
+                return jsonify({"error": "JSON body does not match schema", "messages": err.messages}), 400
+
+            claims, error = authenticate(data['auth_token'])
+            if error is not None:
+                return error
+
+            if match_email and claims.get('email') != data['email']:
+                return jsonify({"error": "Token does not match email"}), 403
+
+            g.auth_claims = claims
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
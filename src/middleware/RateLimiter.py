@@ -0,0 +1,176 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, jsonify, request
+from pymongo import ReturnDocument
+from werkzeug.middleware.proxy_fix import ProxyFix
+from env import env
+from ..database.MongoDB import MongoDB
+
+class MemoryBucketStore:
+    """
+    Token buckets kept in this process, in an LRU bounded to `max_keys`.
+
+    Evicting a key forgets its bucket, which only ever makes the limit more
+    lenient for that key.
+    """
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, rate):
+        """
+        Takes one token from the bucket for `key`, refilled at `rate` tokens
+        per second up to `capacity`.
+
+        Returns:
+            float: 0 if a token was taken, otherwise seconds until one is available.
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return 0.0 if allowed else (1 - tokens) / rate
+
+
+class MongoBucketStore:
+    """
+    Token buckets shared by every worker process through MongoDB.
+
+    Each take() is one atomic find_one_and_update with an update pipeline that
+    refills and spends the bucket using the server clock. Idle buckets expire
+    through the TTL index on `expires_at` (see Indexes).
+    """
+
+    COLLECTION = 'rate_limits'
+
+    def __init__(self, idle_ttl=3600):
+        self.idle_ttl = idle_ttl
+
+    def take(self, key, capacity, rate):
+        elapsed_s = {"$divide": [{"$subtract": ["$$NOW", {"$ifNull": ["$updated_at", "$$NOW"]}]}, 1000]}
+        refilled = {"$min": [capacity, {"$add": [{"$ifNull": ["$tokens", capacity]}, {"$multiply": [elapsed_s, rate]}]}]}
+        collection = MongoDB.getMongoClient().get_database().get_collection(self.COLLECTION)
+        bucket = collection.find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {"tokens": refilled, "updated_at": "$$NOW"}},
+                {"$set": {"allowed": {"$gte": ["$tokens", 1]}}},
+                {"$set": {
+                    "tokens": {"$cond": ["$allowed", {"$subtract": ["$tokens", 1]}, "$tokens"]},
+                    "expires_at": {"$add": ["$$NOW", self.idle_ttl * 1000]}
+                }}
+            ],
+            projection={"_id": 0, "tokens": 1, "allowed": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return 0.0 if bucket["allowed"] else (1 - bucket["tokens"]) / rate
+
+
+class RateLimiter:
+    """
+    Per-client-IP and per-email token buckets for named rules.
+
+    A rule maps each key kind to (capacity, period_seconds): `capacity`
+    attempts in a burst, refilled evenly over `period_seconds`.
+    """
+
+    DEFAULT_RULES = {
+        'login': {"ip": (20, 60), "email": (5, 60)},
+        'forgot_password': {"ip": (10, 60), "email": (3, 60)},
+    }
+
+    def __init__(self, store, rules=None):
+        self.store = store
+        self.rules = dict(self.DEFAULT_RULES, **(rules or {}))
+        self._lock = threading.Lock()
+        self._limited = {}
+
+    def check(self, rule_name, ip, email=None):
+        """
+        Returns:
+            float: 0 if the request may go ahead, otherwise the seconds to wait.
+        """
+        rule = self.rules.get(rule_name, {})
+        keys = {"ip": ip, "email": email.lower() if isinstance(email, str) else None}
+        retry_after = 0.0
+        for kind, (capacity, period) in rule.items():
+            if keys.get(kind) is None:
+                continue
+            wait = self.store.take(f"{rule_name}:{kind}:{keys[kind]}", capacity, capacity / period)
+            retry_after = max(retry_after, wait)
+        if retry_after:
+            with self._lock:
+                self._limited[rule_name] = self._limited.get(rule_name, 0) + 1
+        return retry_after
+
+    def stats(self):
+        with self._lock:
+            return {"limited": dict(self._limited)}
+
+
+_limiter_lock = threading.Lock()
+
+def get_rate_limiter(app=None):
+    """
+    Returns the rate limiter of `app` (default: the current app), creating it
+    on first use with the store chosen by RATE_LIMIT_BACKEND.
+    """
+    app = app or current_app
+    limiter = app.extensions.get('rate_limiter')
+    if limiter is None:
+        with _limiter_lock:
+            limiter = app.extensions.get('rate_limiter')
+            if limiter is None:
+                if env.get('RATE_LIMIT_BACKEND', 'memory') == 'mongo':
+                    store = MongoBucketStore()
+                else:
+                    store = MemoryBucketStore(int(env.get('RATE_LIMIT_MAX_KEYS', 100000)))
+                limiter = RateLimiter(store, env.get('RATE_LIMITS'))
+                app.extensions['rate_limiter'] = limiter
+    return limiter
+
+def trust_proxies(app, count=None):
+    """
+    Takes the client address from X-Forwarded-For when `app` runs behind
+    `count` reverse proxies (default: TRUSTED_PROXIES). Without this every
+    client behind a proxy shares the proxy's address and its per-IP bucket.
+    Only the last `count` hops are trusted, so clients cannot spoof it.
+    """
+    if count is None:
+        count = int(env.get('TRUSTED_PROXIES', 0))
+    if count > 0:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=count, x_proto=count)
+
+def rate_limited(rule_name):
+    """
+    Rejects the request with 429 before the view runs when the client IP or
+    the `email` in the JSON body has used up its attempts for `rule_name`.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            data = request.get_json(silent=True)
+            email = data.get('email') if isinstance(data, dict) else None
+            try:
+                retry_after = get_rate_limiter().check(rule_name, request.remote_addr, email)
+            except Exception as e:
+                # A broken shared store must not lock everyone out
+                print(f"Rate limit check failed: {e}")
+                retry_after = 0
+            if retry_after:
+                return jsonify({"error": "Too many attempts, try again later"}), 429, {"Retry-After": str(math.ceil(retry_after))}
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,5 @@
+from .AdmissionControl import AdmissionControl, AdmissionLimiter
+from .Auth import TokenCache, get_token_cache, verify_token, authenticate, require_auth
+from .RateLimiter import RateLimiter, MemoryBucketStore, MongoBucketStore, get_rate_limiter, rate_limited, trust_proxies
+
+__all__ = ["AdmissionControl", "AdmissionLimiter", "RateLimiter", "MemoryBucketStore", "MongoBucketStore", "get_rate_limiter", "rate_limited", "trust_proxies", "TokenCache", "get_token_cache", "verify_token", "authenticate", "require_auth"]
@@ -0,0 +1,149 @@
+import threading
+from flask import current_app
+from env import env
+
+class TooManySubscribers(Exception):
+    """
+    Raised when the broker already has as many subscribers as it allows.
+    """
+
+
+class Subscription:
+    """
+    One subscriber's pending events.
+
+    Events are conflated per topic: only the latest one waiting for each
+    topic is kept, so a slow or idle subscriber holds at most one event per
+    topic it listens to, however many are published.
+    """
+
+    def __init__(self, topics):
+        self.topics = frozenset(topics)
+        self._cond = threading.Condition()
+        self._pending = {}
+        self._closed = False
+
+    def push(self, topic, event):
+        """
+        Returns:
+            bool: True if the event replaced one that was not yet delivered.
+        """
+        with self._cond:
+            conflated = topic in self._pending
+            self._pending[topic] = event
+            self._cond.notify()
+        return conflated
+
+    def next(self, timeout):
+        """
+        Waits up to `timeout` seconds for events.
+
+        Returns:
+            list: (topic, event) pairs, empty on timeout, or None once closed.
+        """
+        with self._cond:
+            if not self._pending and not self._closed:
+                self._cond.wait(timeout)
+            if self._closed:
+                return None
+            events, self._pending = list(self._pending.items()), {}
+        return events
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+
+
+class EventBroker:
+    """
+    In-process publish/subscribe by topic, with at most `max_subscribers`
+    subscriptions at once.
+    """
+
+    def __init__(self, max_subscribers=1000):
+        self.max_subscribers = max_subscribers
+
+        self._lock = threading.Lock()
+        self._topics = {}
+        self._subscriptions = set()
+        self._published = 0
+        self._conflated = 0
+        self._rejected = 0
+
+    def subscribe(self, topics):
+        """
+        Raises:
+            TooManySubscribers: If `max_subscribers` subscriptions are open.
+        """
+        subscription = Subscription(topics)
+        with self._lock:
+            if len(self._subscriptions) >= self.max_subscribers:
+                self._rejected += 1
+                raise TooManySubscribers("Too many subscribers")
+            self._subscriptions.add(subscription)
+            for topic in subscription.topics:
+                self._topics.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.discard(subscription)
+                for topic in subscription.topics:
+                    subscribers = self._topics[topic]
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._topics[topic]
+        subscription.close()
+
+    def hasSubscribers(self, topic):
+        with self._lock:
+            return topic in self._topics
+
+    def publish(self, topic, event):
+        with self._lock:
+            subscribers = list(self._topics.get(topic, ()))
+            self._published += 1
+        conflated = sum(subscription.push(topic, event) for subscription in subscribers)
+        if conflated:
+            with self._lock:
+                self._conflated += conflated
+
+    def close(self):
+        """
+        Closes every subscription, ending their streams.
+        """
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            self.unsubscribe(subscription)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "subscribers": len(self._subscriptions),
+                "max_subscribers": self.max_subscribers,
+                "topics": len(self._topics),
+                "published": self._published,
+                "conflated": self._conflated,
+                "rejected": self._rejected
+            }
+
+
+_broker_lock = threading.Lock()
+
+def get_event_broker(app=None):
+    """
+    Returns the event broker of `app` (default: the current app), creating
+    it on first use.
+    """
+    app = app or current_app
+    broker = app.extensions.get('event_broker')
+    if broker is None:
+        with _broker_lock:
+            broker = app.extensions.get('event_broker')
+            if broker is None:
+                broker = EventBroker(int(env.get('STREAM_MAX_CONNECTIONS', 1000)))
+                app.extensions['event_broker'] = broker
+    return broker
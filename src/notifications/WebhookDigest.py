@@ -0,0 +1,119 @@
+import threading
+from env import env
+from .WebhookDispatcher import get_webhook_dispatcher
+
+class WebhookDigest:
+    """
+    Collects counter events and sends one summary message per window.
+
+    Windows with no events send nothing, so the number of webhook posts is
+    bounded by one per `window` seconds regardless of traffic.
+    """
+
+    def __init__(self, dispatcher, window=60.0):
+        self.dispatcher = dispatcher
+        self.window = window
+
+        self._lock = threading.Lock()
+        self._lost = 0
+        self._unlost = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def record(self, delta):
+        with self._lock:
+            if delta > 0:
+                self._lost += delta
+            else:
+                self._unlost -= delta
+
+    def flush(self):
+        """
+        Queues a summary of the events recorded since the last flush.
+        """
+        with self._lock:
+            lost, unlost = self._lost, self._unlost
+            self._lost = self._unlost = 0
+
+        message = self.formatMessage(lost, unlost)
+        if message is not None:
+            self.dispatcher.submit({"content": message})
+
+    def formatMessage(self, lost, unlost):
+        parts = []
+        if lost:
+            parts.append(f"{lost} {'person' if lost == 1 else 'people'} lost the game")
+        if unlost:
+            parts.append(f"{unlost} {'person' if unlost == 1 else 'people'} unlost the game")
+        if not parts:
+            return None
+        return f"In the last {self.window:g} seconds: " + " and ".join(parts)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="webhook-digest", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.window):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Failed to queue webhook digest: {e}")
+
+    def close(self):
+        """
+        Stops the timer and queues whatever has been recorded so far.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+
+IMMEDIATE_MESSAGES = {
+    1: "Someone just lost the game",
+    -1: "Someone just unlost the game",
+}
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def get_webhook_digest():
+    """
+    Returns the process-wide webhook digest, starting it on first use.
+    """
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                digest = WebhookDigest(
+                    get_webhook_dispatcher(),
+                    window=float(env.get('WEBHOOK_DIGEST_WINDOW_S', 60))
+                )
+                digest.start()
+                _shared = digest
+    return _shared
+
+def close_webhook_digest():
+    """
+    Sends the last partial window and stops the shared digest, if one was started.
+    """
+    global _shared
+    with _shared_lock:
+        digest, _shared = _shared, None
+    if digest is not None:
+        digest.close()
+
+def notify_counter_change(delta):
+    """
+    Reports a counter change to Discord, either as its own message or folded
+    into the next digest when WEBHOOK_MODE is 'digest'.
+    """
+    if env.get('WEBHOOK_MODE', 'immediate') == 'digest':
+        get_webhook_digest().record(delta)
+    else:
+        get_webhook_dispatcher().submit({"content": IMMEDIATE_MESSAGES[delta]})
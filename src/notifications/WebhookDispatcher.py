@@ -0,0 +1,204 @@
+import random
+import threading
+import time
+from collections import deque
+import requests
+from requests.adapters import HTTPAdapter
+from env import env
+
+class WebhookDispatcher:
+    """
+    Sends webhook payloads from background worker threads.
+
+    Payloads wait in a bounded queue; when it is full the oldest payload is
+    dropped to make room. Failed sends are retried with exponential backoff,
+    and a 429 response pauses every worker for the Retry-After period.
+    """
+
+    def __init__(self, url, workers=2, max_queue=1000, max_retries=3,
+                 backoff=0.5, max_backoff=30.0, timeout=2.0, session=None):
+        self.url = url
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        self.session = session
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._closing = False
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._threads = []
+        self._counters = {"sent": 0, "failed": 0, "dropped": 0, "retried": 0, "rate_limited": 0}
+
+    def submit(self, payload):
+        """
+        Queues `payload` to be posted as JSON.
+
+        Returns:
+            bool: False if an older payload had to be dropped to make room.
+        """
+        with self._cond:
+            dropped = False
+            if len(self._queue) >= self.max_queue:
+                self._queue.popleft()
+                self._counters["dropped"] += 1
+                dropped = True
+            self._queue.append(payload)
+            self._cond.notify()
+        return not dropped
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._counters)
+            stats["queue_depth"] = len(self._queue)
+            stats["in_flight"] = self._in_flight
+        return stats
+
+    def start(self):
+        with self._cond:
+            if self._threads:
+                return
+            self._closing = False
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"webhook-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def close(self, timeout=5.0):
+        """
+        Stops the workers once the queue is drained or `timeout` seconds pass.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while (self._queue or self._in_flight) and time.monotonic() < deadline:
+                self._cond.wait(0.05)
+            self._closing = True
+            self._cond.notify_all()
+            threads, self._threads = self._threads, []
+        for thread in threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        self.session.close()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closing:
+                    self._cond.wait()
+                if self._closing:
+                    return
+                payload = self._queue.popleft()
+                self._in_flight += 1
+            try:
+                outcome = self._send(payload)
+            finally:
+                with self._cond:
+                    self._in_flight -= 1
+                    self._counters[outcome] += 1
+                    self._cond.notify_all()
+
+    def _send(self, payload):
+        for attempt in range(self.max_retries + 1):
+            self._waitWhilePaused()
+            if attempt:
+                with self._cond:
+                    self._counters["retried"] += 1
+
+            try:
+                resp = self.session.post(self.url, json=payload, timeout=self.timeout)
+            except requests.RequestException as e:
+                print(f"Failed to send webhook: {e}")
+                self._sleep(self._backoffDelay(attempt))
+                continue
+
+            if resp.status_code == 429:
+                with self._cond:
+                    self._counters["rate_limited"] += 1
+                    self._paused_until = max(self._paused_until, time.monotonic() + self._retryAfter(resp, attempt))
+                continue
+            if resp.status_code >= 500:
+                self._sleep(self._backoffDelay(attempt))
+                continue
+            if resp.status_code >= 400:
+                # Other client errors will not succeed on a retry
+                print(f"Failed to send webhook: HTTP {resp.status_code}")
+                return "failed"
+            return "sent"
+        return "failed"
+
+    def _retryAfter(self, resp, attempt):
+        try:
+            return float(resp.headers["Retry-After"])
+        except (KeyError, ValueError):
+            pass
+        try:
+            # Discord also reports the wait in the JSON body
+            return float(resp.json()["retry_after"])
+        except Exception:
+            return self._backoffDelay(attempt)
+
+    def _backoffDelay(self, attempt):
+        delay = min(self.max_backoff, self.backoff * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _waitWhilePaused(self):
+        with self._cond:
+            delay = self._paused_until - time.monotonic()
+        self._sleep(delay)
+
+    def _sleep(self, delay):
+        # Wake early when closing so shutdown is not held up by a backoff
+        deadline = time.monotonic() + delay
+        with self._cond:
+            while not self._closing:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                self._cond.wait(remaining)
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def get_webhook_dispatcher():
+    """
+    Returns the process-wide Discord webhook dispatcher, starting it on first use.
+    """
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                dispatcher = WebhookDispatcher(
+                    env['DISCORD_WEBHOOK_URL'],
+                    workers=int(env.get('WEBHOOK_WORKERS', 2)),
+                    max_queue=int(env.get('WEBHOOK_MAX_QUEUE', 1000)),
+                    max_retries=int(env.get('WEBHOOK_MAX_RETRIES', 3))
+                )
+                dispatcher.start()
+                _shared = dispatcher
+    return _shared
+
+def close_webhook_dispatcher():
+    """
+    Drains and stops the shared dispatcher, if one was started.
+    """
+    global _shared
+    with _shared_lock:
+        dispatcher, _shared = _shared, None
+    if dispatcher is not None:
+        dispatcher.close()
+
+def webhook_stats():
+    dispatcher = _shared
+    if dispatcher is None:
+        return {}
+    return dispatcher.stats()
@@ -0,0 +1,7 @@
+from .WebhookDispatcher import WebhookDispatcher, get_webhook_dispatcher, close_webhook_dispatcher, webhook_stats
+from .EventBroker import EventBroker, Subscription, TooManySubscribers, get_event_broker
+from .WebhookDigest import WebhookDigest, get_webhook_digest, close_webhook_digest, notify_counter_change
+
+__all__ = ["WebhookDispatcher", "get_webhook_dispatcher", "close_webhook_dispatcher", "webhook_stats",
+           "WebhookDigest", "get_webhook_digest", "close_webhook_digest", "notify_counter_change",
+           "EventBroker", "Subscription", "TooManySubscribers", "get_event_broker"]
@@ -7,5 +7,10 @@ from .login import login_bp
 from .get_security_question import get_security_question_bp
 from .forgot_password import forgot_password_bp
 from .data_analysis import data_analysis_bp
+from .metrics import metrics_bp
+from .stream import stream_bp
+from .leaderboard import leaderboard_bp
+from .rank import rank_bp
+from .events import events_bp
 
-__all__ = ["default_bp", "plus_one_bp", "minus_one_bp", "read_bp", "register_bp", "login_bp", "get_security_question_bp", "forgot_password_bp", "data_analysis_bp"]
\ No newline at end of file
+__all__ = ["default_bp", "plus_one_bp", "minus_one_bp", "read_bp", "register_bp", "login_bp", "get_security_question_bp", "forgot_password_bp", "data_analysis_bp", "metrics_bp", "stream_bp", "leaderboard_bp", "rank_bp", "events_bp"]
\ No newline at end of file
@@ -1,3 +1,3 @@
-from .data_analysis import data_analysis_bp
+from .data_analysis import data_analysis_bp, get_analysis_cache
 
-__all__ = ["data_analysis_bp"]
\ No newline at end of file
+__all__ = ["data_analysis_bp", "get_analysis_cache"]
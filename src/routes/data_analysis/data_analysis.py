@@ -1,35 +1,83 @@
-from flask import Blueprint, request, jsonify
+import threading
+from flask import Blueprint, request, jsonify, current_app
 from marshmallow import ValidationError
+from pymongo.errors import OperationFailure
 from ...database.MongoDB import MongoDB
-import numpy as np
+from ...analytics.CountStats import CountStats
+from ...analytics.ScanStats import ScanStats
+from ...analytics.AggregateStats import AggregateStats
+from ...analytics.StreamingStats import StreamingStats
+from ...analytics.PartitionedScan import PartitionedScan
+from ...cache.ResultCache import ResultCache
+from env import env
 
 data_analysis_bp = Blueprint("data_analysis", __name__)
 
+_cache_lock = threading.Lock()
+
+def get_analysis_cache(app=None):
+    """
+    Returns the /data-analysis response cache of `app` (default: the current
+    app), creating it on first use.
+    """
+    app = app or current_app
+    cache = app.extensions.get('analysis_cache')
+    if cache is None:
+        with _cache_lock:
+            cache = app.extensions.get('analysis_cache')
+            if cache is None:
+                cache = ResultCache(
+                    ttl=float(env.get('ANALYSIS_CACHE_TTL_S', 5)),
+                    stale_ttl=float(env.get('ANALYSIS_CACHE_STALE_S', 0))
+                )
+                app.extensions['analysis_cache'] = cache
+    return cache
+
+def compute_stats():
+    mode = env.get('DATA_ANALYSIS_MODE', 'running')
+    stats = None
+
+    if mode == 'running':
+        # Maintained on every write, so this is a single document read;
+        # None until the statistics document has been built
+        stats = CountStats.read()
+
+    client = MongoDB.getMongoClient()
+    db = client.get_database()
+    collection = db.get_collection('users')
+
+    if mode == 'aggregate':
+        try:
+            stats = AggregateStats.compute(collection)
+        except OperationFailure as e:
+            print(f"Aggregation failed, scanning instead: {e}")
+    elif mode == 'streaming':
+        stats = StreamingStats.compute(
+            collection,
+            batch_size=int(env.get('STREAMING_BATCH_SIZE', 65536)),
+            k=int(env.get('STREAMING_SKETCH_K', 200))
+        )
+    elif mode == 'partitioned':
+        stats = PartitionedScan.compute(
+            collection,
+            workers=int(env.get('PARTITION_WORKERS', 4)),
+            partition_size=int(env.get('PARTITION_SIZE', 250000))
+        )
+
+    # The NumPy scan is the fallback for every mode
+    if stats is None:
+        stats = ScanStats.compute(collection)
+    return stats
+
 @data_analysis_bp.route('/data-analysis',methods =['GET'])
 def data_analysis():
     try:
-        client = MongoDB.getMongoClient()
-        db = client.get_database()
-        collection = db.get_collection('users')
+        # Concurrent misses share one computation
+        stats = get_analysis_cache().get(compute_stats)
 
-        all_counts = collection.find({}, {'_id': 0, 'count': 1})
-        count_arr = [doc['count'] for doc in all_counts if 'count' in doc]
-
-        if not count_arr:
+        if not stats['n']:
             return jsonify({"error": "No data found"}), 404
 
-        np_arr = np.array(count_arr, dtype=float)  
-
-        stats = {
-            "n": int(np_arr.size),
-            "mean": np.mean(np_arr),
-            "median": np.median(np_arr),
-            "std_dev": np.std(np_arr),
-            "variance": np.var(np_arr),
-            "min": np.min(np_arr),
-            "max": np.max(np_arr)
-        }
-
         return jsonify(stats), 200
 
     except Exception as e:
@@ -0,0 +1,3 @@
+from .events import events_bp
+
+__all__ = ["events_bp"]
@@ -0,0 +1,28 @@
+from flask import Blueprint, request, jsonify
+from marshmallow import ValidationError
+from .schema import DataSchema
+from ...analytics.EventLog import EventLog
+from ...database.MongoDB import MongoDB
+
+events_bp = Blueprint("events", __name__)
+schema = DataSchema()
+
+@events_bp.route('/events', methods=['GET'])
+def events():
+    try:
+        args = schema.load(request.args)
+    except ValidationError as err:
+        return jsonify({"error": "Query parameters do not match schema", "messages": err.messages}), 400
+
+    try:
+        collection = MongoDB.getMongoClient().get_database().get_collection(EventLog.ROLLUPS_COLLECTION)
+        window = EventLog.window(collection, args['granularity'], args['buckets'], args['until'])
+
+        return jsonify({
+            "granularity": args['granularity'],
+            "buckets": [dict(bucket, start=bucket["start"].isoformat()) for bucket in window]
+        }), 200
+
+    except Exception as e:
+        print(e)
+        return jsonify({"error": "Internal server error"}), 500
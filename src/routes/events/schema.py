@@ -0,0 +1,6 @@
+from marshmallow import Schema, fields, validate
+
+class DataSchema(Schema):
+    granularity = fields.String(load_default="hour", validate=validate.OneOf(["minute", "hour", "day"]))
+    buckets = fields.Integer(load_default=24, validate=validate.Range(min=1, max=1000))
+    until = fields.DateTime(load_default=None)
@@ -2,18 +2,22 @@ from flask import Blueprint, request, jsonify
 from marshmallow import ValidationError
 from .schema import DataSchema
 from ...database.MongoDB import MongoDB
-import bcrypt
+from ...cache.UserCache import get_user_cache
+from ...security.PasswordHasher import get_password_hasher, PasswordPoolSaturated
+from ...middleware.RateLimiter import rate_limited
 
 forgot_password_bp = Blueprint("forgot_password", __name__)
+schema = DataSchema()
 
 @forgot_password_bp.route('/forgot-password',methods =['POST'])
+@rate_limited('forgot_password')
 def forgot_password():
     data = request.get_json()
     if not data:
         return jsonify({"error": "No JSON data provided"}),400
     
     try:
-        data = DataSchema().load(data)
+        data = schema.load(data)
     except ValidationError as err:
         return jsonify({"error": "JSON body does not match schema", "messages":err.messages}), 400
     
@@ -30,21 +34,30 @@ def forgot_password():
             return jsonify({"error": "Email not found"}), 404
         
         # Check if the security question and answer match
-        if not bcrypt.checkpw(data['security_answer'].encode('utf-8'), result['security_answer']):
+        hasher = get_password_hasher()
+        if not hasher.checkpw(data['security_answer'], result['security_answer']):
             return jsonify({"error": "Security answer is incorrect"}), 401
         
-        # Hash the new password
-        hashed_password = bcrypt.hashpw(data['new_password'].encode('utf-8'), bcrypt.gensalt())
+        # Hash the new password, and the security answer too if it was
+        # stored with another cost factor, in parallel on the pool
+        if hasher.needsRehash(result['security_answer']):
+            password, answer = hasher.hashMany([data['new_password'], data['security_answer']])
+            update = {"password": password, "security_answer": answer}
+        else:
+            update = {"password": hasher.hashpw(data['new_password'])}
 
         # Update the password in the database
         collection.update_one(
             {"email": data['email']},
-            {"$set": {"password": hashed_password}}
+            {"$set": update}
         )
+        get_user_cache().invalidate(data['email'])
 
         # Returns success message
         return jsonify({"message": "Password changed successfully"}), 200
 
+    except PasswordPoolSaturated:
+        return jsonify({"error": "Server busy, try again later"}), 503, {"Retry-After": "1"}
     except Exception as e:
         print(e)
         return jsonify({"error": "Internal server error"}), 500
@@ -0,0 +1,3 @@
+from .leaderboard import leaderboard_bp, get_leaderboard
+
+__all__ = ["leaderboard_bp", "get_leaderboard"]
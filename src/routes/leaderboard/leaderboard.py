@@ -0,0 +1,68 @@
+import threading
+from flask import Blueprint, request, jsonify, current_app, g
+from .schema import DataSchema
+from ...analytics.Leaderboard import Leaderboard
+from ...database.MongoDB import MongoDB
+from ...middleware.Auth import require_auth
+from env import env
+
+leaderboard_bp = Blueprint("leaderboard", __name__)
+schema = DataSchema()
+
+_board_lock = threading.Lock()
+
+def get_leaderboard(app=None):
+    """
+    Returns the in-memory leaderboard of `app` (default: the current app),
+    creating it on first use.
+    """
+    app = app or current_app
+    board = app.extensions.get('leaderboard')
+    if board is None:
+        with _board_lock:
+            board = app.extensions.get('leaderboard')
+            if board is None:
+                board = Leaderboard(
+                    size=int(env.get('LEADERBOARD_SIZE', 100)),
+                    slack=int(env.get('LEADERBOARD_SLACK', 100)),
+                    ttl=float(env.get('LEADERBOARD_REFRESH_S', 60))
+                )
+                app.extensions['leaderboard'] = board
+    return board
+
+@leaderboard_bp.route('/leaderboard', methods=['POST'])
+@require_auth(DataSchema, match_email=False)
+def leaderboard():
+    args = schema.load(request.get_json())
+
+    # Deep pages would let any user list every email, each at the cost of an
+    # O(offset) index walk
+    max_depth = int(env.get('LEADERBOARD_MAX_DEPTH', env.get('LEADERBOARD_SIZE', 100)))
+    offset = args['offset']
+    if offset >= max_depth:
+        return jsonify({"error": f"The leaderboard ranks only the top {max_depth} users"}), 400
+    limit = min(args['limit'], max_depth - offset)
+
+    try:
+        entries = get_leaderboard().top(offset, limit)
+        if entries is None:
+            # Deeper than the in-memory board; the index serves the page
+            collection = MongoDB.getMongoClient().get_database().get_collection('users')
+            entries = list(Leaderboard.page(collection, offset, limit))
+
+        own_email = g.auth_claims.get('email')
+        return jsonify({
+            "offset": offset,
+            "entries": [
+                dict(
+                    entry,
+                    email=entry["email"] if entry["email"] == own_email else Leaderboard.maskEmail(entry["email"]),
+                    rank=offset + i + 1
+                )
+                for i, entry in enumerate(entries)
+            ]
+        }), 200
+
+    except Exception as e:
+        print(e)
+        return jsonify({"error": "Internal server error"}), 500
@@ -0,0 +1,6 @@
+from marshmallow import Schema, fields, validate
+
+class DataSchema(Schema):
+    auth_token = fields.String(required=True)
+    offset = fields.Integer(load_default=0, validate=validate.Range(min=0))
+    limit = fields.Integer(load_default=10, validate=validate.Range(min=1, max=100))
@@ -2,20 +2,35 @@ from flask import Blueprint, request, jsonify
 from marshmallow import ValidationError
 from ...database.MongoDB import MongoDB
 from .schema import DataSchema
-import bcrypt
+from ...security.PasswordHasher import get_password_hasher, PasswordPoolSaturated
+from ...middleware.RateLimiter import rate_limited
 import jwt
 from datetime import datetime, timedelta, timezone
 from env import env
 
 
 login_bp = Blueprint("login", __name__)
+schema = DataSchema()
+
+def store_rehash(collection, user, future):
+    """
+    Stores the upgraded hash from `future` unless the password was changed
+    in the meantime.
+    """
+    try:
+        collection.update_one(
+            {"_id": user['_id'], "password": user['password']},
+            {"$set": {"password": future.result()}}
+        )
+    except Exception as e:
+        print(f"Failed to rehash password: {e}")
 
 @login_bp.route('/login', methods=['POST'])
+@rate_limited('login')
 def login():
     data = request.get_json()
     try:
-        login = DataSchema()
-        login.load(data)
+        schema.load(data)
     except ValidationError as err:
         return jsonify({"error": "JSON body does not match schema", "messages": err.messages}), 400
     
@@ -27,8 +42,22 @@ def login():
         email = data['email']
         user = collection.find_one({"email": email})
         if(user):
-            if not bcrypt.checkpw(data['password'].encode('utf-8'), user['password']):
+            hasher = get_password_hasher()
+            if not hasher.checkpw(data['password'], user['password']):
                 return jsonify({"error": "Invalid credentials"}), 401
+
+            # Upgrade hashes stored with another cost factor while the plain
+            # password is at hand, in the background; a failed upgrade must
+            # not fail or slow down the login
+            try:
+                if hasher.needsRehash(user['password']):
+                    future = hasher.hashLater(data['password'])
+                    future.add_done_callback(lambda done: store_rehash(collection, user, done))
+            except PasswordPoolSaturated:
+                pass
+            except Exception as rehash_error:
+                print(f"Failed to rehash password: {rehash_error}")
+
             token = jwt.encode(
                 {
                     "email": email,
@@ -41,6 +70,8 @@ def login():
             return jsonify({"token": token, "message": "Login successful" }), 200
         else:
             return jsonify({"error": "User not found"}), 404
+    except PasswordPoolSaturated:
+        return jsonify({"error": "Server busy, try again later"}), 503, {"Retry-After": "1"}
     except Exception as e:
         print(e)
         return jsonify({"error": "Internal server error"}), 500
\ No newline at end of file
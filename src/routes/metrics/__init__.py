@@ -0,0 +1,3 @@
+from .metrics import metrics_bp
+
+__all__ = ["metrics_bp"]
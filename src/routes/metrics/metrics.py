@@ -0,0 +1,20 @@
+import hmac
+from flask import Blueprint, request, jsonify
+from ...metrics import collect_metrics
+from env import env
+
+metrics_bp = Blueprint("metrics", __name__)
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    # Queue depths, user counts and error counters are for operators only;
+    # without a configured token the route does not exist
+    token = env.get('METRICS_TOKEN')
+    if not token:
+        return jsonify({"error": "Not found"}), 404
+
+    supplied = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(supplied.encode('utf-8'), f"Bearer {token}".encode('utf-8')):
+        return jsonify({"error": "Invalid token"}), 401
+
+    return jsonify(collect_metrics()), 200
@@ -1,67 +1,50 @@
 from flask import Blueprint, request, jsonify
-from marshmallow import ValidationError
+from pymongo import ReturnDocument
 from .schema import DataSchema
 from ...database.MongoDB import MongoDB
+from ...database.CounterBuffer import get_counter_buffer
+from ...notifications.WebhookDigest import notify_counter_change
+from ...signals import send_counts_changed
+from ...middleware.Auth import require_auth
 from env import env
-import requests
-import jwt
 
 minus_one_bp = Blueprint("minus_one", __name__)
 
 @minus_one_bp.route('/minus-one', methods=['POST'])
+@require_auth(DataSchema)
 def minus_one():
-    data = request.get_json() # Retrieve JSON data from request
+    data = request.get_json() # Validated by require_auth
 
-    # Validate JSON data against schema
     try:
-        schema = DataSchema()
-        schema.load(data)
-    except ValidationError as err:
-        return jsonify({"error": "JSON body does not match schema", "messages": err.messages}), 400
-    
-    # Validate JWT token
-    try:
-        token = data['auth_token']
-        decoded_token = jwt.decode(token, env['JWT_SECRET_KEY'], algorithms=["HS256"])
-    except jwt.ExpiredSignatureError:
-        return jsonify({"error": "Token has expired"}), 401
-    except jwt.InvalidTokenError:
-        return jsonify({"error": "Invalid token"}), 401
-    except Exception as e:
-        return jsonify({"error": "Internal server error", "message": str(e)}), 500
-
-    try:
-        # Connect to MongoDB
-        client = MongoDB.getMongoClient()
-        db = client.get_database()
-        collection = db.get_collection('count')
-
-        # Check if email exists in database
-        if not collection.find_one({"email": data['email']}):
+        if env.get('COUNTER_WRITE_BEHIND', False):
+            # Buffer the change; counts_changed is sent when it is flushed
+            count = get_counter_buffer().add(data['email'], -1)
+            result = None if count is None else {"email": data['email'], "count": count}
+        else:
+            # Connect to MongoDB
+            client = MongoDB.getMongoClient()
+            db = client.get_database()
+            collection = db.get_collection('users')
+
+            # Decrement count by 1 and read back the updated document atomically
+            result = collection.find_one_and_update(
+                {"email": data['email']},
+                {"$inc": {"count": -1}},
+                projection={"_id": 0, "email": 1, "count": 1},
+                return_document=ReturnDocument.AFTER
+            )
+            if result is not None:
+                send_counts_changed('minus_one', [(data['email'], result['count'] + 1, result['count'])])
+
+        # No document matched, so the email does not exist
+        if result is None:
             return jsonify({"error": "Email not found"}), 404
-        
-        # Decrement count by 1
-        collection.update_one(
-            {"email": data['email']},
-            {"$inc": {"count": -1}}
-        )
-
-        # Retrieve updated document
-        result = collection.find_one(
-            { "email": data["email"] },
-            { "_id": 0, "email": 1, "count": 1 }
-        )
-
-         # Send Discord webhook notification
-        webhook_url = env['DISCORD_WEBHOOK_URL']
-        content = f"Someone just unlost the game"
-        payload = {"content": content}
 
+        # Queue Discord webhook notification; it is sent in the background
         try:
-            resp = requests.post(webhook_url, json=payload, timeout=2)
-            resp.raise_for_status()  # Raise an error for bad responses
+            notify_counter_change(-1)
         except Exception as webhook_error:
-            print(f"Failed to send webhook: {webhook_error}")
+            print(f"Failed to queue webhook: {webhook_error}")
 
         # Return the document as JSON
         return jsonify(result), 200
@@ -0,0 +1,3 @@
+from .rank import rank_bp, get_rank_index
+
+__all__ = ["rank_bp", "get_rank_index"]
@@ -0,0 +1,47 @@
+import threading
+from flask import Blueprint, request, jsonify, current_app
+from .schema import DataSchema
+from ...analytics.RankIndex import RankIndex
+from ...database.MongoDB import MongoDB
+from ...middleware.Auth import require_auth
+from env import env
+
+rank_bp = Blueprint("rank", __name__)
+
+_index_lock = threading.Lock()
+
+def get_rank_index(app=None):
+    """
+    Returns the rank index of `app` (default: the current app), creating it
+    on first use.
+    """
+    app = app or current_app
+    index = app.extensions.get('rank_index')
+    if index is None:
+        with _index_lock:
+            index = app.extensions.get('rank_index')
+            if index is None:
+                index = RankIndex(ttl=float(env.get('RANK_RECONCILE_S', 300)))
+                app.extensions['rank_index'] = index
+    return index
+
+@rank_bp.route('/rank', methods=['POST'])
+@require_auth(DataSchema)
+def rank():
+    data = request.get_json()
+
+    try:
+        # The index follows persisted counts, so read the count from the same
+        # place rather than from a cache that may be a TTL behind it
+        collection = MongoDB.getMongoClient().get_database().get_collection('users')
+        user = collection.find_one({"email": data['email']}, {"_id": 0, "count": 1})
+        if not user or 'count' not in user:
+            return jsonify({"error": "Email not found"}), 404
+
+        # O(log D) from memory; no scan of the users collection
+        result = get_rank_index().lookup(user['count'])
+        return jsonify(dict(result, email=data['email'], count=user['count'])), 200
+
+    except Exception as e:
+        print(e)
+        return jsonify({"error": "Internal server error"}), 500
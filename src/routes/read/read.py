@@ -1,44 +1,17 @@
 from flask import Blueprint, request, jsonify
-from marshmallow import ValidationError
 from .schema import DataSchema
-from ...database.MongoDB import MongoDB
-import jwt
-from env import env
+from ...cache.UserCache import get_user_cache
+from ...middleware.Auth import require_auth
 
 read_bp = Blueprint("read", __name__)
 
 @read_bp.route('/read',methods =['POST'])
+@require_auth(DataSchema)
 def read():
     data = request.get_json()
-    if not data:
-        return jsonify({"error": "No JSON data provided"}),400
-    
-    try:
-        schema = DataSchema()
-        schema.load(data)
-    except ValidationError as err:
-        return jsonify({"error": "JSON body does not match schema", "messages":err.messages}), 400
-    
-    
-    try:
-        token = data['auth_token']
-        decoded_token = jwt.decode(token, env['JWT_SECRET_KEY'], algorithms=["HS256"])
-    except jwt.ExpiredSignatureError:
-            return jsonify({"error":"Token has expired"}), 401
-    except jwt.InvalidTokenError:
-            return jsonify({"error":"Invalid token"}), 401
-    except Exception as e:
-            return jsonify({"error":"Internal server error","message":str(e)}), 500
-         
-    try:
-        client = MongoDB.getMongoClient()
-        db = client.get_database()
-        collection = db.get_collection('users')
 
-        result = collection.find_one(
-            { "email": data["email"] },
-            { "_id": 0, "email": 1, "count": 1 }
-        )
+    try:
+        result = get_user_cache().get(data["email"], ("email", "count"))
 
         if not result:
             return jsonify({"error": "Email not found"}), 404
@@ -47,4 +20,4 @@ def read():
     except Exception as e:
         print(e)
         return jsonify({"error": "Internal server error"}), 500
-        
+
@@ -2,4 +2,5 @@ from marshmallow import Schema, fields
 
 class DataSchema(Schema):
     auth_token = fields.String(required=True)
-    email = fields.String(required=True)
\ No newline at end of file
+    email = fields.String(required=True)
+
@@ -1,18 +1,20 @@
 from flask import Blueprint, request, jsonify
 from marshmallow import ValidationError
+from pymongo.errors import DuplicateKeyError
 from ...database.MongoDB import MongoDB
 from .schema import DataSchema
-import bcrypt
+from ...security.PasswordHasher import get_password_hasher, PasswordPoolSaturated
+from ...signals import send_counts_changed
 
 
 register_bp = Blueprint("register", __name__)
+schema = DataSchema()
 
 @register_bp.route('/register', methods=['POST'])
 def register():
     data = request.get_json()
     try:
-        register = DataSchema()
-        register.load(data)
+        schema.load(data)
     except ValidationError as err:
         return jsonify({"error": "JSON body does not match schema", "messages": err.messages}), 400
     
@@ -23,14 +25,10 @@ def register():
 
         email = data['email'].lower()
 
-        # Check if the email already exists in the database
-        if(collection.find_one({"email": email})):
-            return jsonify({"error": "Email already exists"}), 409
-        
         password = data['password']
 
-        hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
-        hashed_answer = bcrypt.hashpw(data['security_answer'].encode('utf-8'), bcrypt.gensalt())
+        # Hash the password and security answer in parallel
+        hashed_password, hashed_answer = get_password_hasher().hashMany([password, data['security_answer']])
 
         user_data = {
             "email": email,
@@ -40,8 +38,15 @@ def register():
             "count": 0,
         }
 
-        collection.insert_one(user_data)
+        # The unique index on email rejects duplicates atomically
+        try:
+            collection.insert_one(user_data)
+        except DuplicateKeyError:
+            return jsonify({"error": "Email already exists"}), 409
+        send_counts_changed('register', [(email, None, 0)])
 
         return jsonify({"message": "User registered successfully"}), 200
+    except PasswordPoolSaturated:
+        return jsonify({"error": "Server busy, try again later"}), 503, {"Retry-After": "1"}
     except Exception as e:
         return jsonify({"error": "Internal server error"}), 500
\ No newline at end of file
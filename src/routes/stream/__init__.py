@@ -0,0 +1,3 @@
+from .stream import stream_bp, publish_count_changes
+
+__all__ = ["stream_bp", "publish_count_changes"]
@@ -0,0 +1,86 @@
+from flask import Blueprint, Response, current_app, request, jsonify
+from ...cache.UserCache import get_user_cache
+from ...middleware.Auth import authenticate
+from ...notifications.EventBroker import get_event_broker, TooManySubscribers
+from ..data_analysis.data_analysis import get_analysis_cache, compute_stats
+from env import env
+
+stream_bp = Blueprint("stream", __name__)
+
+def publish_count_changes(broker, changes):
+    """
+    Publishes counts_changed `changes` to the subscribers of each user's
+    count, and marks the global statistics as changed.
+    """
+    for email, old, new in changes:
+        broker.publish(f"count:{email}", {"email": email, "count": new})
+    if broker.hasSubscribers("stats"):
+        broker.publish("stats", None)
+
+def format_event(app, name, data):
+    return f"event: {name}\ndata: {app.json.dumps(data)}\n\n"
+
+@stream_bp.route('/stream', methods=['GET'])
+def stream():
+    # EventSource cannot send a body or headers, so everything is in the query
+    token = request.args.get('auth_token')
+    email = request.args.get('email')
+    if not token or not email:
+        return jsonify({"error": "auth_token and email query parameters are required"}), 400
+
+    claims, error = authenticate(token)
+    if error is not None:
+        return error
+
+    if claims.get('email') != email:
+        return jsonify({"error": "Token does not match email"}), 403
+
+    topics = [f"count:{email}"]
+    if request.args.get('stats') in ('1', 'true'):
+        topics.append("stats")
+
+    broker = get_event_broker()
+    try:
+        subscription = broker.subscribe(topics)
+    except TooManySubscribers:
+        return jsonify({"error": "Server busy, try again later"}), 503, {"Retry-After": "5"}
+
+    app = current_app._get_current_object()
+    heartbeat = float(env.get('STREAM_HEARTBEAT_S', 15))
+
+    def stats_event():
+        try:
+            return format_event(app, "stats", get_analysis_cache(app).get(compute_stats))
+        except Exception as e:
+            print(f"Failed to compute stream statistics: {e}")
+            return None
+
+    def events():
+        # Start with the current values so clients need no separate /read
+        user = get_user_cache(app).get(email, ("email", "count"))
+        if user is not None:
+            yield format_event(app, "count", user)
+        if "stats" in topics:
+            initial = stats_event()
+            if initial is not None:
+                yield initial
+
+        while True:
+            pending = subscription.next(heartbeat)
+            if pending is None:
+                return
+            if not pending:
+                # Keeps proxies from closing an idle connection
+                yield ": heartbeat\n\n"
+                continue
+            for topic, data in pending:
+                if topic == "stats":
+                    event = stats_event()
+                    if event is not None:
+                        yield event
+                else:
+                    yield format_event(app, "count", data)
+
+    response = Response(events(), mimetype='text/event-stream', headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    response.call_on_close(lambda: broker.unsubscribe(subscription))
+    return response
@@ -0,0 +1,188 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+from env import env
+
+class PasswordPoolSaturated(Exception):
+    """
+    Raised when the password pool already has as much work as it will queue.
+    """
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt work on a dedicated, size-limited thread pool.
+
+    bcrypt releases the GIL while hashing, so threads give real parallelism
+    while capping how many cores password work can take from cheap routes.
+    At most `workers` hashes run and `max_queue` more wait; anything beyond
+    that is rejected at once with PasswordPoolSaturated.
+
+    New hashes use `rounds` as the bcrypt cost factor; hashes stored with a
+    different cost can be detected with needsRehash().
+    """
+
+    def __init__(self, workers=2, max_queue=16, rounds=12):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.rounds = rounds
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._rejected = 0
+        self._timings = {}
+
+    def _submit(self, operation, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise PasswordPoolSaturated("Password pool is saturated")
+        with self._lock:
+            self._pending += 1
+
+        def run():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                self._record(operation, (time.perf_counter() - started) * 1000)
+
+        try:
+            future = self._executor.submit(run)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def _record(self, operation, elapsed_ms):
+        with self._lock:
+            timing = self._timings.setdefault(operation, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            timing["count"] += 1
+            timing["total_ms"] += elapsed_ms
+            timing["max_ms"] = max(timing["max_ms"], elapsed_ms)
+
+    def hashpw(self, secret):
+        """
+        Hashes `secret` (str) with a fresh salt.
+        """
+        return self.hashMany([secret])[0]
+
+    def hashLater(self, secret):
+        """
+        Hashes `secret` (str) without waiting for it.
+
+        Returns:
+            Future: Resolves to the hash.
+        """
+        return self._submit('hash', bcrypt.hashpw, secret.encode('utf-8'), bcrypt.gensalt(rounds=self.rounds))
+
+    def hashMany(self, secrets):
+        """
+        Hashes several secrets in parallel. Either all are accepted or the
+        call is rejected as a whole.
+        """
+        futures = []
+        try:
+            for secret in secrets:
+                futures.append(self.hashLater(secret))
+        except PasswordPoolSaturated:
+            for future in futures:
+                future.cancel()
+            raise
+        return [future.result() for future in futures]
+
+    def checkpw(self, secret, hashed):
+        """
+        Checks `secret` (str) against a stored bcrypt hash.
+        """
+        return self._submit('check', bcrypt.checkpw, secret.encode('utf-8'), hashed).result()
+
+    @staticmethod
+    def hashCost(hashed):
+        """
+        Returns the cost factor stored in a bcrypt hash such as b"$2b$12$...".
+        """
+        if isinstance(hashed, str):
+            hashed = hashed.encode('utf-8')
+        return int(hashed.split(b'$')[2])
+
+    def needsRehash(self, hashed):
+        return self.hashCost(hashed) != self.rounds
+
+    @staticmethod
+    def calibrate(target_ms, min_rounds=4, max_rounds=16):
+        """
+        Times one hash at each cost factor on this machine.
+
+        Returns:
+            tuple: The highest cost whose hash took at most `target_ms`
+            (or `min_rounds` if none did), and a {rounds: ms} dict of timings.
+        """
+        chosen = min_rounds
+        timings = {}
+        for rounds in range(min_rounds, max_rounds + 1):
+            salt = bcrypt.gensalt(rounds=rounds)
+            started = time.perf_counter()
+            bcrypt.hashpw(b"calibration-password", salt)
+            timings[rounds] = (time.perf_counter() - started) * 1000
+            if timings[rounds] > target_ms:
+                break
+            chosen = rounds
+        return chosen, timings
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "rounds": self.rounds,
+                "pending": self._pending,
+                "rejected": self._rejected,
+                "timings": {
+                    operation: dict(timing, avg_ms=timing["total_ms"] / timing["count"])
+                    for operation, timing in self._timings.items()
+                }
+            }
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def get_password_hasher():
+    """
+    Returns the process-wide password hasher, creating it on first use.
+    """
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = PasswordHasher(
+                    workers=int(env.get('PASSWORD_WORKERS', os.cpu_count() or 2)),
+                    max_queue=int(env.get('PASSWORD_MAX_QUEUE', 64)),
+                    rounds=int(env.get('BCRYPT_ROUNDS', 12))
+                )
+    return _shared
+
+def close_password_hasher():
+    global _shared
+    with _shared_lock:
+        hasher, _shared = _shared, None
+    if hasher is not None:
+        hasher.close()
+
+def password_stats():
+    hasher = _shared
+    if hasher is None:
+        return {}
+    return hasher.stats()
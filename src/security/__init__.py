@@ -0,0 +1,3 @@
+from .PasswordHasher import PasswordHasher, PasswordPoolSaturated, get_password_hasher, close_password_hasher, password_stats
+
+__all__ = ["PasswordHasher", "PasswordPoolSaturated", "get_password_hasher", "close_password_hasher", "password_stats"]
@@ -0,0 +1,77 @@
+import numpy as np
+from flask.json.provider import DefaultJSONProvider
+from env import env
+
+try:
+    import orjson
+except ImportError:  # optional; responses fall back to the standard library
+    orjson = None
+
+class NumpyJSONProvider(DefaultJSONProvider):
+    """
+    Flask's standard JSON provider, extended to serialize NumPy scalars
+    and arrays as their plain Python equivalents.
+    """
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, np.generic):
+            return o.item()
+        if isinstance(o, np.ndarray):
+            return o.tolist()
+        return DefaultJSONProvider.default(o)
+
+
+class OrjsonJSONProvider(NumpyJSONProvider):
+    """
+    JSON provider backed by orjson, which serializes NumPy values natively.
+
+    The output matches NumpyJSONProvider apart from whitespace and non-ASCII
+    characters being written as UTF-8 instead of escapes. Anything orjson
+    rejects (such as integers wider than 64 bits), or calls with json.dumps
+    keyword arguments, are handed to the standard library path.
+    """
+
+    def _options(self, indent=False):
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def _encode(self, obj, indent=False):
+        try:
+            return orjson.dumps(obj, default=self.default, option=self._options(indent))
+        except TypeError:
+            return None
+
+    def dumps(self, obj, **kwargs):
+        if not kwargs:
+            encoded = self._encode(obj)
+            if encoded is not None:
+                return encoded.decode('utf-8')
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        encoded = self._encode(obj, indent)
+        if encoded is None:
+            return super().response(obj)
+        return self._app.response_class(encoded + b"\n", mimetype=self.mimetype)
+
+
+def json_provider_class():
+    """
+    Returns the JSON provider to install: orjson when it is installed and
+    JSON_PROVIDER (in env.py) is not 'default', otherwise the standard one.
+    """
+    if orjson is not None and env.get('JSON_PROVIDER', 'orjson') != 'default':
+        return OrjsonJSONProvider
+    return NumpyJSONProvider
@@ -0,0 +1,3 @@
+from .JsonProvider import NumpyJSONProvider, OrjsonJSONProvider, json_provider_class
+
+__all__ = ["NumpyJSONProvider", "OrjsonJSONProvider", "json_provider_class"]
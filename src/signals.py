@@ -0,0 +1,33 @@
+from blinker import Namespace
+
+_signals = Namespace()
+
+# Sent after user counts are written. Receivers get `changes`, a list of
+# (email, old_count, new_count) tuples; old_count is None for a new user.
+counts_changed = _signals.signal('counts-changed')
+
+def send_counts_changed(sender, changes):
+    """
+    Sends counts_changed to each receiver in turn. The write it reports has
+    already happened, so a failing receiver is logged and neither stops the
+    others nor reaches the caller.
+    """
+    for receiver in counts_changed.receivers_for(sender):
+        try:
+            receiver(sender, changes=changes)
+        except Exception as e:
+            print(f"counts_changed receiver failed: {e}")
+
+def connect_for_app(app, signal, receiver):
+    """
+    Connects `receiver` to `signal` for as long as `app` lives.
+
+    The signal holds the receiver weakly and `app` holds it strongly, so apps
+    built by tests or app factories do not leave receivers behind once they
+    are gone. While several apps are alive, each one's receiver still gets
+    every change from every sender; a receiver that writes state shared
+    across apps, such as the stats document, must be connected once per
+    process instead.
+    """
+    app.extensions.setdefault('signal_receivers', []).append(receiver)
+    signal.connect(receiver)
@@ -0,0 +1,75 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from flask import Flask, Blueprint
+from src.middleware.AdmissionControl import AdmissionControl, AdmissionLimiter
+
+class AdmissionLimiterTestCase(unittest.TestCase):
+    def test_rejects_beyond_queue(self):
+        limiter = AdmissionLimiter(concurrency=1, max_queue=0)
+        self.assertTrue(limiter.acquire())
+        self.assertFalse(limiter.acquire())
+        limiter.release()
+        self.assertTrue(limiter.acquire())
+        stats = limiter.stats()
+        self.assertEqual((stats["admitted"], stats["rejected"], stats["in_flight"]), (2, 1, 1))
+
+    def test_queued_request_gets_released_slot(self):
+        limiter = AdmissionLimiter(concurrency=1, max_queue=1, queue_timeout=5)
+        limiter.acquire()
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(limiter.acquire()))
+        waiter.start()
+        time.sleep(0.05)
+        self.assertEqual(limiter.stats()["queued"], 1)
+        limiter.release()
+        waiter.join()
+        self.assertEqual(results, [True])
+
+    def test_queue_timeout(self):
+        limiter = AdmissionLimiter(concurrency=1, max_queue=1, queue_timeout=0.05)
+        limiter.acquire()
+        self.assertFalse(limiter.acquire())
+        self.assertEqual(limiter.stats()["queued"], 0)
+
+
+class AdmissionControlTestCase(unittest.TestCase):
+    @patch.dict('env.env', {'ADMISSION_LIMITS': {'analytics': {'concurrency': 1, 'queue': 0}}}, clear=True)
+    def test_sheds_load_per_route_class(self):
+        app = Flask(__name__)
+        release = threading.Event()
+        analytics = Blueprint("data_analysis", __name__)
+        counter = Blueprint("read", __name__)
+
+        @analytics.route('/slow')
+        def slow():
+            release.wait()
+            return 'done'
+
+        @counter.route('/fast')
+        def fast():
+            return 'ok'
+
+        control = AdmissionControl(app)
+        app.register_blueprint(analytics)
+        app.register_blueprint(counter)
+
+        first = threading.Thread(target=lambda: app.test_client().get('/slow'))
+        first.start()
+        while control.stats()['analytics']['in_flight'] < 1:
+            time.sleep(0.01)
+
+        shed = app.test_client().get('/slow')
+        self.assertEqual(shed.status_code, 503)
+        self.assertEqual(shed.headers['Retry-After'], '1')
+        # Other route classes are unaffected
+        self.assertEqual(app.test_client().get('/fast').status_code, 200)
+
+        release.set()
+        first.join()
+        self.assertEqual(control.stats()['analytics']['in_flight'], 0)
+        self.assertEqual(control.stats()['analytics']['rejected'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
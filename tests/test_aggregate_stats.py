@@ -0,0 +1,104 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from flask import Flask
+from pymongo.errors import OperationFailure
+from src.analytics.AggregateStats import AggregateStats
+from src.routes.data_analysis import data_analysis_bp
+
+class AggregateStatsTestCase(unittest.TestCase):
+    def setUp(self):
+        AggregateStats.median_supported = None
+        self.addCleanup(setattr, AggregateStats, 'median_supported', None)
+
+    def test_single_result_document(self):
+        mock_coll = MagicMock()
+        mock_coll.aggregate.return_value = iter([
+            {"n": 3, "mean": 2.0, "median": 2.0, "std_dev": 0.816496580927726, "min": 1, "max": 3}
+        ])
+        stats = AggregateStats.compute(mock_coll)
+        self.assertEqual(stats['n'], 3)
+        self.assertAlmostEqual(stats['variance'], 0.6666666666666666)
+        self.assertEqual(stats['min'], 1.0)
+        pipeline = mock_coll.aggregate.call_args.args[0]
+        self.assertIn("$median", pipeline[1]["$group"]["median"])
+
+    def test_median_fallback_for_old_servers(self):
+        mock_coll = MagicMock()
+        mock_coll.aggregate.side_effect = [
+            OperationFailure("unknown group operator '$median'"),
+            iter([{"n": 4, "mean": 2.5, "std_dev": 1.118, "min": 1, "max": 4}])
+        ]
+        cursor = mock_coll.find.return_value.sort.return_value.skip.return_value.limit.return_value
+        cursor.allow_disk_use.return_value = [{"count": 2}, {"count": 3}]
+
+        stats = AggregateStats.compute(mock_coll)
+        self.assertEqual(stats['median'], 2.5)
+        mock_coll.find.return_value.sort.return_value.skip.assert_called_once_with(1)
+        mock_coll.find.return_value.sort.return_value.skip.return_value.limit.assert_called_once_with(2)
+
+    def test_strict_api_skips_median(self):
+        mock_coll = MagicMock()
+        mock_coll.database.client.options.server_api.strict = True
+        mock_coll.aggregate.return_value = iter([{"n": 1, "mean": 2.0, "std_dev": 0.0, "min": 2, "max": 2}])
+        cursor = mock_coll.find.return_value.sort.return_value.skip.return_value.limit.return_value
+        cursor.allow_disk_use.return_value = [{"count": 2}]
+
+        stats = AggregateStats.compute(mock_coll)
+        self.assertEqual(stats['median'], 2.0)
+        mock_coll.aggregate.assert_called_once()
+        self.assertNotIn("median", mock_coll.aggregate.call_args.args[0][1]["$group"])
+
+    def test_rejection_is_remembered(self):
+        mock_coll = MagicMock()
+        # What a server answers for $median under the strict Stable API
+        mock_coll.aggregate.side_effect = [
+            OperationFailure("$median is not in API Version 1", code=323),
+            iter([{"n": 1, "mean": 2.0, "std_dev": 0.0, "min": 2, "max": 2}]),
+            iter([{"n": 1, "mean": 2.0, "std_dev": 0.0, "min": 2, "max": 2}])
+        ]
+        cursor = mock_coll.find.return_value.sort.return_value.skip.return_value.limit.return_value
+        cursor.allow_disk_use.return_value = [{"count": 2}]
+
+        AggregateStats.compute(mock_coll)
+        AggregateStats.compute(mock_coll)
+        # The second computation does not try $median again
+        self.assertEqual(mock_coll.aggregate.call_count, 3)
+        self.assertNotIn("median", mock_coll.aggregate.call_args.args[0][1]["$group"])
+
+    def test_empty_collection(self):
+        mock_coll = MagicMock()
+        mock_coll.aggregate.return_value = iter([])
+        self.assertEqual(AggregateStats.compute(mock_coll), {"n": 0})
+
+
+@patch.dict('env.env', {'DATA_ANALYSIS_MODE': 'aggregate'}, clear=True)
+class AggregateRouteTestCase(unittest.TestCase):
+    def setUp(self):
+        AggregateStats.median_supported = None
+        self.addCleanup(setattr, AggregateStats, 'median_supported', None)
+        self.app = Flask(__name__)
+        self.app.register_blueprint(data_analysis_bp)
+        self.client = self.app.test_client()
+
+    @patch('src.database.MongoDB.MongoDB.getMongoClient')
+    def test_aggregate_mode(self, mock_get_client):
+        mock_coll = mock_get_client.return_value.get_database.return_value.get_collection.return_value
+        mock_coll.aggregate.return_value = iter([
+            {"n": 2, "mean": 1.5, "median": 1.5, "std_dev": 0.5, "min": 1, "max": 2}
+        ])
+        resp = self.client.get('/data-analysis')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.get_json()['n'], 2)
+        mock_coll.find.assert_not_called()
+
+    @patch('src.analytics.AggregateStats.AggregateStats.compute', side_effect=OperationFailure("unsupported"))
+    @patch('src.database.MongoDB.MongoDB.getMongoClient')
+    def test_falls_back_to_scan(self, mock_get_client, mock_compute):
+        mock_coll = mock_get_client.return_value.get_database.return_value.get_collection.return_value
+        mock_coll.find.return_value = [{'count': 1}, {'count': 2}, {'count': 3}]
+        resp = self.client.get('/data-analysis')
+        self.assertEqual(resp.status_code, 200)
+        self.assertAlmostEqual(resp.get_json()['median'], 2.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import time
+import unittest
+from unittest.mock import patch
+import jwt
+from datetime import datetime, timedelta, timezone
+from flask import Flask
+from src.middleware.Auth import TokenCache
+from src.routes.read import read_bp
+
+class TokenCacheTestCase(unittest.TestCase):
+    def test_lru_is_bounded(self):
+        cache = TokenCache(max_size=2)
+        for key in (b"a", b"b", b"c"):
+            cache.put(key, {"email": "user@example.com"})
+        self.assertIsNone(cache.get(b"a"))
+        self.assertEqual(cache.get(b"c"), {"email": "user@example.com"})
+
+    def test_entry_expires_with_token(self):
+        cache = TokenCache(max_ttl=300)
+        cache.put(b"k", {"email": "user@example.com", "exp": time.time() - 1})
+        self.assertIsNone(cache.get(b"k"))
+
+    def test_digest_depends_on_secret(self):
+        self.assertNotEqual(TokenCache.digest("one", "token"), TokenCache.digest("two", "token"))
+
+
+@patch.dict('env.env', {'JWT_SECRET_KEY': 'testsecret'}, clear=True)
+class RequireAuthTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.register_blueprint(read_bp)
+        self.client = self.app.test_client()
+        self.email = "user@example.com"
+        self.token = jwt.encode(
+            {"email": self.email, "exp": datetime.now(timezone.utc) + timedelta(days=1)},
+            'testsecret',
+            algorithm="HS256"
+        )
+
+    @patch('src.database.MongoDB.MongoDB.getMongoClient')
+    def test_repeat_requests_verify_once(self, mock_get_client):
+        mock_coll = mock_get_client.return_value.get_database.return_value.get_collection.return_value
+        mock_coll.find_one.return_value = {"email": self.email, "count": 1}
+
+        with patch('jwt.decode', wraps=jwt.decode) as mock_decode:
+            for _ in range(3):
+                resp = self.client.post('/read', json={"email": self.email, "auth_token": self.token})
+                self.assertEqual(resp.status_code, 200)
+        mock_decode.assert_called_once()
+
+    @patch('src.database.MongoDB.MongoDB.getMongoClient')
+    def test_token_for_other_email_is_forbidden(self, mock_get_client):
+        resp = self.client.post('/read', json={"email": "other@example.com", "auth_token": self.token})
+        self.assertEqual(resp.status_code, 403)
+        self.assertIn("Token does not match email", resp.get_data(as_text=True))
+        mock_get_client.assert_not_called()
+
+    def test_invalid_token_is_not_cached(self):
+        with patch('jwt.decode', side_effect=jwt.InvalidTokenError) as mock_decode:
+            for _ in range(2):
+                resp = self.client.post('/read', json={"email": self.email, "auth_token": "badtoken"})
+                self.assertEqual(resp.status_code, 401)
+        self.assertEqual(mock_decode.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
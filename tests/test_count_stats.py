@@ -0,0 +1,122 @@
+import random
+import unittest
+from unittest.mock import patch, MagicMock
+import numpy as np
+from flask import Flask
+from src.analytics.CountStats import CountStats
+from src.routes.data_analysis import data_analysis_bp
+
+def apply_update(doc, update):
+    # Mimics the server applying a $inc update with dotted histogram paths
+    for field, value in update["$inc"].items():
+        if field.startswith('hist.'):
+            key = field[len('hist.'):]
+            doc['hist'][key] = doc['hist'].get(key, 0) + value
+        else:
+            doc[field] = doc.get(field, 0) + value
+
+class CountStatsTestCase(unittest.TestCase):
+    def test_register_and_increment_update(self):
+        self.assertEqual(CountStats.buildUpdate([("a@example.com", None, 0)]),
+                         {"$inc": {"n": 1, "hist.0": 1}})
+        self.assertEqual(CountStats.buildUpdate([("a@example.com", 4, 5)]),
+                         {"$inc": {"sum": 1, "sum_sq": 9, "hist.4": -1, "hist.5": 1}})
+
+    def test_changes_fold_into_one_update(self):
+        update = CountStats.buildUpdate([("a@example.com", 0, 1), ("b@example.com", 2, 3)])
+        self.assertEqual(update, {"$inc": {"sum": 2, "sum_sq": 6, "hist.0": -1, "hist.1": 1, "hist.2": -1, "hist.3": 1}})
+        self.assertIsNone(CountStats.buildUpdate([]))
+
+    def test_delete_update(self):
+        self.assertEqual(CountStats.buildUpdate([("a@example.com", 3, None)]),
+                         {"$inc": {"n": -1, "sum": -3, "sum_sq": -9, "hist.3": -1}})
+
+    def test_matches_numpy_after_random_changes(self):
+        rng = random.Random(7)
+        counts = {}
+        doc = {"hist": {}}
+        for i in range(200):
+            email = f"user{i}@example.com"
+            counts[email] = 0
+            apply_update(doc, CountStats.buildUpdate([(email, None, 0)]))
+        for _ in range(2000):
+            email = rng.choice(list(counts))
+            old = counts[email]
+            counts[email] = old + rng.choice([1, 1, 1, -1])
+            apply_update(doc, CountStats.buildUpdate([(email, old, counts[email])]))
+
+        stats = CountStats.summarize(doc)
+        values = np.array(list(counts.values()), dtype=float)
+        self.assertEqual(stats['n'], values.size)
+        self.assertAlmostEqual(stats['mean'], np.mean(values))
+        self.assertAlmostEqual(stats['median'], np.median(values))
+        self.assertAlmostEqual(stats['variance'], np.var(values))
+        self.assertAlmostEqual(stats['std_dev'], np.std(values))
+        self.assertEqual(stats['min'], np.min(values))
+        self.assertEqual(stats['max'], np.max(values))
+
+    def test_median_of_even_count(self):
+        self.assertEqual(CountStats.histogramMedian([(1, 1), (2, 1), (3, 1), (4, 1)], 4), 2.5)
+
+    @patch('src.database.MongoDB.MongoDB.getMongoClient')
+    def test_reconcile(self, mock_get_client):
+        mock_db = mock_get_client.return_value.get_database.return_value
+        mock_coll = MagicMock()
+        mock_db.get_collection.return_value = mock_coll
+        mock_coll.aggregate.return_value = [{"_id": 1, "frequency": 2}, {"_id": 3, "frequency": 1}]
+
+        doc = CountStats.reconcile()
+        self.assertEqual(doc, {"_id": "counts", "n": 3, "sum": 5, "sum_sq": 11, "hist": {"1": 2, "3": 1}})
+        mock_coll.replace_one.assert_called_once_with({"_id": "counts"}, doc, upsert=True)
+
+    @patch('src.database.MongoDB.MongoDB.getMongoClient')
+    def test_record_does_not_create_document(self, mock_get_client):
+        mock_coll = mock_get_client.return_value.get_database.return_value.get_collection.return_value
+        CountStats.record([("a@example.com", 1, 2)])
+        _, kwargs = mock_coll.update_one.call_args
+        self.assertFalse(kwargs.get("upsert", False))
+
+
+@patch.dict('env.env', {'DATA_ANALYSIS_MODE': 'running'}, clear=True)
+class RunningStatsRouteTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.register_blueprint(data_analysis_bp)
+        self.client = self.app.test_client()
+
+    @patch('src.database.MongoDB.MongoDB.getMongoClient')
+    def test_reads_one_document(self, mock_get_client):
+        mock_coll = mock_get_client.return_value.get_database.return_value.get_collection.return_value
+        mock_coll.find_one.return_value = {"_id": "counts", "n": 3, "sum": 6, "sum_sq": 14, "hist": {"1": 1, "2": 1, "3": 1}}
+
+        resp = self.client.get('/data-analysis')
+        self.assertEqual(resp.status_code, 200)
+        data = resp.get_json()
+        self.assertEqual(data['n'], 3)
+        self.assertAlmostEqual(data['median'], 2.0)
+        self.assertAlmostEqual(data['variance'], 0.6666666666666666)
+        mock_coll.find.assert_not_called()
+
+    @patch('src.database.MongoDB.MongoDB.getMongoClient')
+    def test_falls_back_to_scan_before_reconcile(self, mock_get_client):
+        mock_coll = mock_get_client.return_value.get_database.return_value.get_collection.return_value
+        mock_coll.find_one.return_value = None
+        mock_coll.find.return_value = [{'count': 1}, {'count': 2}]
+
+        resp = self.client.get('/data-analysis')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.get_json()['n'], 2)
+
+    @patch('src.database.MongoDB.MongoDB.getMongoClient')
+    def test_partial_document_falls_back_to_scan(self, mock_get_client):
+        mock_coll = mock_get_client.return_value.get_database.return_value.get_collection.return_value
+        # Left behind by increments that upserted before any reconcile
+        mock_coll.find_one.return_value = {"_id": "counts", "sum": 4, "sum_sq": 8, "hist": {"2": 2}}
+        mock_coll.find.return_value = [{'count': 1}, {'count': 2}, {'count': 5}]
+
+        resp = self.client.get('/data-analysis')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.get_json()['n'], 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import jwt
+from datetime import datetime, timedelta, timezone
+from flask import Flask
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from src.database.CounterBuffer import CounterBuffer
+from src.routes.plus_one import plus_one_bp
+
+class CounterBufferTestCase(unittest.TestCase):
+    def setUp(self):
+        patcher = patch('src.database.MongoDB.MongoDB.getMongoClient')
+        mock_get_client = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_coll = MagicMock()
+        mock_get_client.return_value.get_database.return_value.get_collection.return_value = self.mock_coll
+        self.mock_coll.find_one.return_value = {"count": 10}
+
+    def test_deltas_coalesce_into_one_bulk_write(self):
+        buffer = CounterBuffer(max_pending=100)
+        self.assertEqual(buffer.add("a@example.com", 1), 11)
+        self.assertEqual(buffer.add("a@example.com", 1), 12)
+        self.assertEqual(buffer.add("b@example.com", -1), 9)
+        # The base count is read once per email, not once per tap
+        self.assertEqual(self.mock_coll.find_one.call_count, 2)
+        self.mock_coll.bulk_write.assert_not_called()
+
+        buffer.flush()
+        self.mock_coll.bulk_write.assert_called_once_with([
+            UpdateOne({"email": "a@example.com"}, {"$inc": {"count": 2}}),
+            UpdateOne({"email": "b@example.com"}, {"$inc": {"count": -1}}),
+        ], ordered=False)
+        self.assertEqual(buffer.pendingCount(), 0)
+        # Later predictions build on the flushed counts
+        self.assertEqual(buffer.add("a@example.com", 1), 13)
+
+    @patch('src.database.CounterBuffer.send_counts_changed')
+    def test_flush_reports_count_changes(self, mock_signal):
+        buffer = CounterBuffer()
+        buffer.add("a@example.com", 1)
+        buffer.add("a@example.com", 1)
+        buffer.flush()
+        mock_signal.assert_called_once_with('counter_buffer', [("a@example.com", 10, 12)])
+
+    def test_flush_when_max_pending_reached(self):
+        buffer = CounterBuffer(max_pending=2)
+        buffer.add("a@example.com", 1)
+        self.mock_coll.bulk_write.assert_not_called()
+        buffer.add("b@example.com", 1)
+        self.mock_coll.bulk_write.assert_called_once()
+
+    def test_failed_flush_when_full_still_counts_the_tap(self):
+        buffer = CounterBuffer(max_pending=1)
+        self.mock_coll.bulk_write.side_effect = Exception("DB down")
+        self.assertEqual(buffer.add("a@example.com", 1), 11)
+        self.assertEqual(buffer._pending, {"a@example.com": 1})
+
+    def test_tap_during_flush_counts_in_flight_deltas(self):
+        buffer = CounterBuffer()
+        buffer.add("a@example.com", 1)
+        buffer.add("a@example.com", 1)
+        during = []
+        self.mock_coll.bulk_write.side_effect = lambda operations, ordered: during.append(buffer.add("a@example.com", 1))
+        buffer.flush()
+        self.assertEqual(during, [13])
+        self.assertEqual(buffer.add("a@example.com", 1), 14)
+
+    def test_unknown_email(self):
+        self.mock_coll.find_one.return_value = None
+        buffer = CounterBuffer()
+        self.assertIsNone(buffer.add("missing@example.com", 1))
+        self.assertEqual(buffer.pendingCount(), 0)
+
+    def test_failed_flush_keeps_deltas(self):
+        buffer = CounterBuffer()
+        buffer.add("a@example.com", 1)
+        self.mock_coll.bulk_write.side_effect = Exception("DB down")
+        with self.assertRaises(Exception):
+            buffer.flush()
+        self.assertEqual(buffer.pendingCount(), 1)
+
+        self.mock_coll.bulk_write.side_effect = None
+        buffer.flush()
+        self.mock_coll.bulk_write.assert_called_with(
+            [UpdateOne({"email": "a@example.com"}, {"$inc": {"count": 1}})], ordered=False
+        )
+
+    @patch('src.database.CounterBuffer.send_counts_changed')
+    def test_partial_failure_requeues_failed_writes_only(self, mock_signal):
+        buffer = CounterBuffer()
+        buffer.add("a@example.com", 1)
+        buffer.add("b@example.com", 2)
+        self.mock_coll.bulk_write.side_effect = BulkWriteError({
+            "writeErrors": [{"index": 1, "code": 11000, "errmsg": "failed"}], "nInserted": 0
+        })
+        with self.assertRaises(BulkWriteError):
+            buffer.flush()
+        # The write that succeeded is reported and not repeated
+        mock_signal.assert_called_once_with('counter_buffer', [("a@example.com", 10, 11)])
+
+        self.mock_coll.bulk_write.side_effect = None
+        buffer.flush()
+        self.mock_coll.bulk_write.assert_called_with(
+            [UpdateOne({"email": "b@example.com"}, {"$inc": {"count": 2}})], ordered=False
+        )
+
+    @patch('src.database.CounterBuffer.send_counts_changed')
+    def test_evicted_base_is_still_reported(self, mock_signal):
+        buffer = CounterBuffer(max_bases=1)
+        buffer.add("a@example.com", 1)
+        buffer.add("b@example.com", 1)
+        self.mock_coll.find.return_value = [{"email": "a@example.com", "count": 15}]
+        buffer.flush()
+        mock_signal.assert_called_once_with('counter_buffer', [("b@example.com", 10, 11), ("a@example.com", 14, 15)]
+        )
+        self.assertEqual(buffer.stats()["unreported"], 0)
+
+        buffer.add("b@example.com", 1)
+        buffer._bases.clear()
+        self.mock_coll.find.side_effect = Exception("DB down")
+        buffer.flush()
+        self.assertEqual(buffer.stats()["unreported"], 1)
+
+    def test_close_flushes(self):
+        buffer = CounterBuffer(flush_interval=60)
+        buffer.start()
+        buffer.add("a@example.com", 1)
+        buffer.close()
+        self.mock_coll.bulk_write.assert_called_once()
+
+
+@patch.dict('env.env', {'JWT_SECRET_KEY': 'testsecret', 'DISCORD_WEBHOOK_URL': 'http://localhost/webhook', 'COUNTER_WRITE_BEHIND': True}, clear=True)
+class WriteBehindRouteTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.register_blueprint(plus_one_bp)
+        self.client = self.app.test_client()
+        self.email = "test@example.com"
+        self.valid_token = jwt.encode(
+            {"email": self.email, "exp": datetime.now(timezone.utc) + timedelta(days=1)},
+            'testsecret',
+            algorithm="HS256"
+        )
+
+    @patch('src.routes.plus_one.plus_one.get_counter_buffer')
+    def test_returns_predicted_count(self, mock_get_buffer):
+        mock_get_buffer.return_value.add.return_value = 8
+        resp = self.client.post('/plus-one', json={"email": self.email, "auth_token": self.valid_token})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.get_json(), {"email": self.email, "count": 8})
+        mock_get_buffer.return_value.add.assert_called_once_with(self.email, 1)
+
+    @patch('src.routes.plus_one.plus_one.get_counter_buffer')
+    def test_email_not_found(self, mock_get_buffer):
+        mock_get_buffer.return_value.add.return_value = None
+        resp = self.client.post('/plus-one', json={"email": self.email, "auth_token": self.valid_token})
+        self.assertEqual(resp.status_code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from datetime import datetime, timedelta, timezone
+from flask import Flask
+from pymongo.errors import BulkWriteError
+from src.analytics.EventLog import EventLog
+from src.routes.events import events_bp
+
+NOW = datetime(2024, 5, 6, 7, 8, 9, 123000, tzinfo=timezone.utc)
+
+class EventLogTestCase(unittest.TestCase):
+    def setUp(self):
+        self.log = EventLog(max_pending=100)
+        self.db = MagicMock()
+        self.events = MagicMock()
+        self.rollups = MagicMock()
+        self.db.get_collection.side_effect = lambda name: {
+            'counter_events': self.events, 'counter_rollups': self.rollups
+        }[name]
+        patcher = patch.object(self.log, '_getDb', return_value=self.db)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def rollupWrites(self):
+        operations = self.rollups.bulk_write.call_args[0][0]
+        return {op._filter["_id"]: op._doc for op in operations}
+
+    def test_bucket_start(self):
+        self.assertEqual(EventLog.bucketStart(NOW, "minute"), datetime(2024, 5, 6, 7, 8, tzinfo=timezone.utc))
+        self.assertEqual(EventLog.bucketStart(NOW, "hour"), datetime(2024, 5, 6, 7, tzinfo=timezone.utc))
+        self.assertEqual(EventLog.bucketStart(NOW, "day"), datetime(2024, 5, 6, tzinfo=timezone.utc))
+        # Naive timestamps are UTC
+        self.assertEqual(EventLog.bucketStart(NOW.replace(tzinfo=None), "hour"), datetime(2024, 5, 6, 7, tzinfo=timezone.utc))
+
+    def test_flush_writes_events_and_rollups(self):
+        self.log.record([("a@x.com", 1, 2), ("b@x.com", 5, 3), ("c@x.com", None, 0), ("d@x.com", 4, None)], now=NOW)
+        self.log.record([("a@x.com", 2, 3)], now=NOW + timedelta(minutes=1))
+        self.log.flush()
+
+        events = self.events.insert_many.call_args[0][0]
+        self.assertEqual([(e["meta"]["email"], e["delta"]) for e in events], [("a@x.com", 1), ("b@x.com", -2), ("a@x.com", 1)])
+
+        writes = self.rollupWrites()
+        self.assertEqual(len(writes), 4)
+        minute = writes["minute:2024-05-06T07:08:00+00:00"]
+        self.assertEqual(minute["$inc"], {"lost": 1, "unlost": 2})
+        self.assertEqual(minute["$setOnInsert"]["expires_at"], datetime(2024, 5, 8, 7, 9, tzinfo=timezone.utc))
+        hour = writes["hour:2024-05-06T07:00:00+00:00"]
+        self.assertEqual(hour["$inc"], {"lost": 2, "unlost": 2})
+        self.assertEqual(hour["$setOnInsert"]["expires_at"], datetime(2024, 8, 4, 8, tzinfo=timezone.utc))
+        # Day buckets are kept
+        self.assertNotIn("expires_at", writes["day:2024-05-06T00:00:00+00:00"]["$setOnInsert"])
+        self.assertEqual(self.log.pendingCount(), 0)
+
+    def test_failed_rollup_write_is_retried(self):
+        self.rollups.bulk_write.side_effect = Exception("boom")
+        self.log.record([("a@x.com", 1, 2)], now=NOW)
+        with self.assertRaises(Exception):
+            self.log.flush()
+        # The events were written and are not written again
+        self.events.insert_many.assert_called_once()
+
+        self.rollups.bulk_write.side_effect = None
+        self.log.record([("a@x.com", 2, 3)], now=NOW)
+        self.log.flush()
+        self.assertEqual(self.rollupWrites()["hour:2024-05-06T07:00:00+00:00"]["$inc"], {"lost": 2, "unlost": 0})
+        self.assertEqual(len(self.events.insert_many.call_args[0][0]), 1)
+
+    def test_partial_failure_requeues_failed_items_only(self):
+        self.events.insert_many.side_effect = BulkWriteError({"writeErrors": [{"index": 1, "code": 1, "errmsg": "failed"}]})
+        self.rollups.bulk_write.side_effect = BulkWriteError({"writeErrors": [{"index": 0, "code": 1, "errmsg": "failed"}]})
+        self.log.record([("a@x.com", 1, 2), ("b@x.com", 1, 2)], now=NOW)
+        with self.assertRaises(BulkWriteError):
+            self.log.flush()
+
+        self.events.insert_many.side_effect = None
+        self.rollups.bulk_write.side_effect = None
+        self.log.flush()
+        events = self.events.insert_many.call_args[0][0]
+        self.assertEqual([e["meta"]["email"] for e in events], ["b@x.com"])
+        # Only the minute bucket failed; the hour and day upserts are not repeated
+        self.assertEqual(list(self.rollupWrites()), ["minute:2024-05-06T07:08:00+00:00"])
+
+    def test_flushes_when_full(self):
+        self.log.max_pending = 2
+        self.log.record([("a@x.com", 1, 2)], now=NOW)
+        self.events.insert_many.assert_not_called()
+        self.log.record([("b@x.com", 1, 2)], now=NOW)
+        self.events.insert_many.assert_called_once()
+
+    def test_failed_flush_when_full_does_not_raise(self):
+        self.log.max_pending = 1
+        self.events.insert_many.side_effect = Exception("DB down")
+        self.log.record([("a@x.com", 1, 2)], now=NOW)
+        self.assertEqual(self.log.pendingCount(), 1)
+        self.assertEqual(self.log.stats()["errors"], 1)
+
+    def test_window_fills_empty_buckets(self):
+        collection = MagicMock()
+        collection.find.return_value.sort.return_value = [
+            {"start": datetime(2024, 5, 6, 5), "lost": 3, "unlost": 1}
+        ]
+        window = EventLog.window(collection, "hour", 3, until=NOW)
+
+        query = collection.find.call_args[0][0]
+        self.assertEqual(query["start"], {"$gte": datetime(2024, 5, 6, 5, tzinfo=timezone.utc), "$lte": datetime(2024, 5, 6, 7, tzinfo=timezone.utc)})
+        self.assertEqual([(b["lost"], b["unlost"]) for b in window], [(3, 1), (0, 0), (0, 0)])
+        self.assertEqual(window[1]["start"], datetime(2024, 5, 6, 6, tzinfo=timezone.utc))
+
+
+class EventsRouteTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.register_blueprint(events_bp)
+        self.client = self.app.test_client()
+
+    @patch('src.database.MongoDB.MongoDB.getMongoClient')
+    def test_events(self, mock_get_client):
+        mock_collection = mock_get_client.return_value.get_database.return_value.get_collection.return_value
+        mock_collection.find.return_value.sort.return_value = [
+            {"start": datetime(2024, 5, 6), "lost": 4, "unlost": 2}
+        ]
+        response = self.client.get('/events?granularity=day&buckets=2&until=2024-05-06T12:00:00Z')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json, {
+            "granularity": "day",
+            "buckets": [
+                {"start": "2024-05-05T00:00:00+00:00", "lost": 0, "unlost": 0},
+                {"start": "2024-05-06T00:00:00+00:00", "lost": 4, "unlost": 2}
+            ]
+        })
+        mock_get_client.return_value.get_database.return_value.get_collection.assert_called_with('counter_rollups')
+
+    def test_invalid_query(self):
+        response = self.client.get('/events?granularity=week')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json["error"], "Query parameters do not match schema")
+
+        response = self.client.get('/events?buckets=1001')
+        self.assertEqual(response.status_code, 400)
+
+    @patch('src.database.MongoDB.MongoDB.getMongoClient')
+    def test_db_error(self, mock_get_client):
+        mock_get_client.side_effect = Exception("down")
+        response = self.client.get('/events')
+        self.assertEqual(response.status_code, 500)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+from unittest.mock import MagicMock
+from pymongo.errors import CollectionInvalid
+from src.database.Indexes import Indexes
+
+class IndexesTestCase(unittest.TestCase):
+    def test_unique_email_index(self):
+        mock_db = MagicMock()
+        mock_coll = mock_db.get_collection.return_value
+        mock_coll.create_index.side_effect = lambda keys, **options: options["name"]
+
+        ensured = Indexes.ensureIndexes(mock_db)
+        self.assertIn(('users', 'email_unique'), ensured)
+        mock_coll.create_index.assert_any_call([("email", 1)], name="email_unique", unique=True)
+
+    def test_idempotent(self):
+        mock_db = MagicMock()
+        mock_coll = mock_db.get_collection.return_value
+        mock_coll.create_index.side_effect = lambda keys, **options: options["name"]
+        self.assertEqual(Indexes.ensureIndexes(mock_db), Indexes.ensureIndexes(mock_db))
+
+    def test_existing_timeseries_collection(self):
+        mock_db = MagicMock()
+        mock_db.create_collection.side_effect = CollectionInvalid("collection counter_events already exists")
+        mock_db.get_collection.return_value.create_index.side_effect = lambda keys, **options: options["name"]
+
+        ensured = Indexes.ensureIndexes(mock_db)
+        self.assertIn(('counter_events', 'timeseries'), ensured)
+        self.assertIn(('counter_rollups', 'granularity_start'), ensured)
+
+    def test_timeseries_failure_keeps_indexes(self):
+        mock_db = MagicMock()
+        mock_db.create_collection.side_effect = Exception("not authorized")
+        mock_db.get_collection.return_value.create_index.side_effect = lambda keys, **options: options["name"]
+
+        ensured = Indexes.ensureIndexes(mock_db)
+        self.assertIn(('users', 'email_unique'), ensured)
+        self.assertNotIn(('counter_events', 'timeseries'), ensured)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+from unittest.mock import patch
+import numpy as np
+from flask import Flask, jsonify
+from src.serialization import JsonProvider
+from src.serialization.JsonProvider import NumpyJSONProvider, OrjsonJSONProvider, json_provider_class
+
+def make_app(provider):
+    app = Flask(__name__)
+    app.json = provider(app)
+
+    @app.route('/stats')
+    def stats():
+        return jsonify({"n": np.int64(3), "mean": np.float64(2.5), "hist": np.array([1, 2])}), 200
+
+    return app
+
+class JsonProviderTestCase(unittest.TestCase):
+    def test_numpy_values_serialize(self):
+        providers = [NumpyJSONProvider]
+        if JsonProvider.orjson is not None:
+            providers.append(OrjsonJSONProvider)
+        for provider in providers:
+            with self.subTest(provider=provider.__name__):
+                resp = make_app(provider).test_client().get('/stats')
+                self.assertEqual(resp.status_code, 200)
+                self.assertEqual(resp.get_json(), {"n": 3, "mean": 2.5, "hist": [1, 2]})
+
+    @unittest.skipIf(JsonProvider.orjson is None, "orjson is not installed")
+    def test_orjson_falls_back_for_unsupported_values(self):
+        app = Flask(__name__)
+        app.json = OrjsonJSONProvider(app)
+        self.assertEqual(app.json.dumps({"big": 2 ** 70}), '{"big": 1180591620717411303424}')
+        self.assertEqual(app.json.loads(b'{"a": 1}'), {"a": 1})
+
+    @patch.object(JsonProvider, 'orjson', None)
+    def test_falls_back_without_orjson(self):
+        self.assertIs(json_provider_class(), NumpyJSONProvider)
+
+    @patch.dict('env.env', {'JSON_PROVIDER': 'default'}, clear=True)
+    def test_env_selects_standard_provider(self):
+        self.assertIs(json_provider_class(), NumpyJSONProvider)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import random
+import unittest
+from unittest.mock import patch
+import jwt
+from datetime import datetime, timedelta, timezone
+from flask import Flask
+from src.analytics.Leaderboard import Leaderboard
+from src.routes.leaderboard import leaderboard_bp, get_leaderboard
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, keys):
+        self.docs = sorted(self.docs, key=lambda doc: (-doc["count"], doc["email"]))
+        return self
+
+    def skip(self, offset):
+        self.docs = self.docs[offset:]
+        return self
+
+    def limit(self, limit):
+        self.docs = self.docs[:limit]
+        return self
+
+    def __iter__(self):
+        return iter(self.docs)
+
+
+class FakeUsersCollection:
+    def __init__(self, counts):
+        self.counts = counts
+        self.finds = 0
+
+    def find(self, filter, projection):
+        self.finds += 1
+        return FakeCursor([{"email": email, "count": count} for email, count in self.counts.items()])
+
+
+def ranking(counts, offset, limit):
+    ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    return [{"email": email, "count": count} for email, count in ranked[offset:offset + limit]]
+
+
+class LeaderboardTestCase(unittest.TestCase):
+    def setUp(self):
+        self.counts = {f"user{i}@example.com": i % 7 for i in range(50)}
+        self.collection = FakeUsersCollection(self.counts)
+        self.board = Leaderboard(size=5, slack=5, ttl=60)
+        self.board.reload(self.collection)
+
+    def test_matches_database_after_random_changes(self):
+        rng = random.Random(0)
+        for _ in range(2000):
+            email = f"user{rng.randrange(60)}@example.com"
+            old = self.counts.get(email)
+            new = (old or 0) + rng.choice([-1, 1])
+            self.counts[email] = new
+            self.board.applyCounts([(email, old, new)])
+            if self.board._bound is not None and len(self.board._members) < self.board.size:
+                self.board.reload(self.collection)
+            self.assertEqual(self.board.top(0, 5), ranking(self.counts, 0, 5))
+
+    def test_deleted_user_leaves_board(self):
+        top = self.board.top(0, 1)[0]
+        del self.counts[top["email"]]
+        self.board.applyCounts([(top["email"], top["count"], None)])
+        self.assertEqual(self.board.top(0, 5), ranking(self.counts, 0, 5))
+
+    def test_page_past_board(self):
+        self.assertIsNone(self.board.top(8, 5))
+
+    def test_reads_stay_in_memory(self):
+        finds = self.collection.finds
+        for _ in range(10):
+            self.board.top(0, 5)
+        self.assertEqual(self.collection.finds, finds)
+        self.assertEqual(self.board.stats()["hits"], 10)
+
+
+@patch.dict('env.env', {'JWT_SECRET_KEY': 'testsecret', 'LEADERBOARD_SIZE': 2, 'LEADERBOARD_SLACK': 0, 'LEADERBOARD_MAX_DEPTH': 3}, clear=True)
+class LeaderboardRouteTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.register_blueprint(leaderboard_bp)
+        self.client = self.app.test_client()
+        self.token = jwt.encode(
+            {"email": "a@example.com", "exp": datetime.now(timezone.utc) + timedelta(days=1)},
+            'testsecret',
+            algorithm="HS256"
+        )
+        self.users = FakeUsersCollection({"a@example.com": 5, "b@example.com": 9, "c@example.com": 1})
+
+    @patch('src.database.MongoDB.MongoDB.getMongoClient')
+    def test_top_and_deeper_pages(self, mock_get_client):
+        mock_get_client.return_value.get_database.return_value.get_collection.return_value = self.users
+
+        resp = self.client.post('/leaderboard', json={"auth_token": self.token, "limit": 2})
+        self.assertEqual(resp.status_code, 200)
+        # Other users' emails are masked
+        self.assertEqual(resp.get_json()["entries"], [
+            {"rank": 1, "email": "b***@example.com", "count": 9},
+            {"rank": 2, "email": "a@example.com", "count": 5}
+        ])
+
+        resp = self.client.post('/leaderboard', json={"auth_token": self.token, "offset": 2, "limit": 2})
+        self.assertEqual(resp.get_json()["entries"], [{"rank": 3, "email": "c***@example.com", "count": 1}])
+        self.assertEqual(get_leaderboard(self.app).stats()["misses"], 1)
+
+    @patch('src.database.MongoDB.MongoDB.getMongoClient')
+    def test_depth_is_capped(self, mock_get_client):
+        mock_get_client.return_value.get_database.return_value.get_collection.return_value = self.users
+        resp = self.client.post('/leaderboard', json={"auth_token": self.token, "offset": 3})
+        self.assertEqual(resp.status_code, 400)
+
+        # Pages that reach past the cap are cut short
+        self.users.counts["d@example.com"] = 0
+        resp = self.client.post('/leaderboard', json={"auth_token": self.token, "limit": 10})
+        self.assertEqual([entry["rank"] for entry in resp.get_json()["entries"]], [1, 2, 3])
+
+    def test_limit_is_capped(self):
+        resp = self.client.post('/leaderboard', json={"auth_token": self.token, "limit": 1000})
+        self.assertEqual(resp.status_code, 400)
+
+    def test_requires_token(self):
+        resp = self.client.post('/leaderboard', json={"limit": 2})
+        self.assertEqual(resp.status_code, 400)
+        with patch('jwt.decode', side_effect=jwt.InvalidTokenError):
+            resp = self.client.post('/leaderboard', json={"auth_token": "bad"})
+        self.assertEqual(resp.status_code, 401)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+import unittest
+from unittest.mock import patch
+from flask import Flask
+from src.metrics import register_metrics
+from src.routes.metrics import metrics_bp
+
+class MetricsRouteTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.register_blueprint(metrics_bp)
+        self.client = self.app.test_client()
+        register_metrics('test', lambda: {"value": 1})
+
+    @patch.dict('env.env', {}, clear=True)
+    def test_disabled_without_token(self):
+        resp = self.client.get('/metrics')
+        self.assertEqual(resp.status_code, 404)
+
+    @patch.dict('env.env', {'METRICS_TOKEN': 'secret'}, clear=True)
+    def test_requires_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        resp = self.client.get('/metrics', headers={"Authorization": "Bearer wrong"})
+        self.assertEqual(resp.status_code, 401)
+
+        resp = self.client.get('/metrics', headers={"Authorization": "Bearer secret"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.get_json()["test"], {"value": 1})
+
+if __name__ == '__main__':
+    unittest.main()
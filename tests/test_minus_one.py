@@ -3,9 +3,10 @@ from unittest.mock import patch, MagicMock
 import jwt
 from datetime import datetime, timedelta, timezone
 from flask import Flask
+from pymongo import ReturnDocument
 from src.routes.minus_one import minus_one_bp
 
-@patch.dict('env.env', {'JWT_SECRET_KEY': 'testsecret'}, clear=True)
+@patch.dict('env.env', {'JWT_SECRET_KEY': 'testsecret', 'DISCORD_WEBHOOK_URL': 'http://localhost/webhook'}, clear=True)
 class MinusOneTestCase(unittest.TestCase):
     def setUp(self):
         self.app = Flask(__name__)
@@ -19,19 +20,16 @@ class MinusOneTestCase(unittest.TestCase):
             algorithm="HS256"
         )
 
+    @patch('src.routes.minus_one.minus_one.notify_counter_change')
     @patch('src.database.MongoDB.MongoDB.getMongoClient')
-    def test_successful_minus_one(self, mock_get_client):
+    def test_successful_minus_one(self, mock_get_client, mock_notify):
         mock_client = MagicMock()
         mock_db = MagicMock()
         mock_coll = MagicMock()
         mock_get_client.return_value = mock_client
         mock_client.get_database.return_value = mock_db
         mock_db.get_collection.return_value = mock_coll
-        # first find_one → existence check, second → updated doc
-        mock_coll.find_one.side_effect = [
-            {"email": self.email, "count": 5},
-            {"email": self.email, "count": 4}
-        ]
+        mock_coll.find_one_and_update.return_value = {"email": self.email, "count": 4}
 
         with patch('jwt.decode', return_value={"email": self.email}):
             resp = self.client.post(
@@ -41,9 +39,12 @@ class MinusOneTestCase(unittest.TestCase):
 
         self.assertEqual(resp.status_code, 200)
         self.assertEqual(resp.get_json(), {"email": self.email, "count": 4})
-        mock_coll.update_one.assert_called_once_with(
-            {"email": self.email}, {"$inc": {"count": -1}}
-        )
+        args, kwargs = mock_coll.find_one_and_update.call_args
+        self.assertEqual(args, ({"email": self.email}, {"$inc": {"count": -1}}))
+        self.assertEqual(kwargs['return_document'], ReturnDocument.AFTER)
+        mock_coll.find_one.assert_not_called()
+        mock_coll.update_one.assert_not_called()
+        mock_notify.assert_called_once_with(-1)
 
     def test_invalid_json(self):
         resp = self.client.post(
@@ -88,7 +89,7 @@ class MinusOneTestCase(unittest.TestCase):
         mock_get_client.return_value = mock_client
         mock_client.get_database.return_value = mock_db
         mock_db.get_collection.return_value = mock_coll
-        mock_coll.find_one.return_value = None
+        mock_coll.find_one_and_update.return_value = None
 
         with patch('jwt.decode', return_value={"email": self.email}):
             resp = self.client.post(
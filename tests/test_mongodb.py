@@ -0,0 +1,57 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from src.database.MongoDB import MongoDB
+
+@patch.dict('env.env', {'MONGO_URI': 'mongodb://localhost:27017/test'}, clear=True)
+class MongoDBTestCase(unittest.TestCase):
+    def setUp(self):
+        MongoDB._resetAfterFork()
+
+    def tearDown(self):
+        MongoDB._resetAfterFork()
+
+    @patch('src.database.MongoDB.MongoClient')
+    def test_client_is_shared(self, mock_mongo_client):
+        first = MongoDB.getMongoClient()
+        second = MongoDB.getMongoClient()
+        self.assertIs(first, second)
+        mock_mongo_client.assert_called_once()
+        # No round trip is made just to hand out the client
+        first.admin.command.assert_not_called()
+
+    @patch('src.database.MongoDB.MongoClient')
+    @patch.dict('env.env', {'MONGO_MAX_POOL_SIZE': '25', 'MONGO_SERVER_SELECTION_TIMEOUT_MS': '1500'})
+    def test_pool_settings_from_env(self, mock_mongo_client):
+        MongoDB.getMongoClient()
+        kwargs = mock_mongo_client.call_args.kwargs
+        self.assertEqual(kwargs['maxPoolSize'], 25)
+        self.assertEqual(kwargs['serverSelectionTimeoutMS'], 1500)
+        self.assertEqual(kwargs['maxIdleTimeMS'], 60000)
+
+    @patch('src.database.MongoDB.os.getpid')
+    @patch('src.database.MongoDB.MongoClient')
+    def test_client_rebuilt_in_forked_child(self, mock_mongo_client, mock_getpid):
+        mock_mongo_client.side_effect = [MagicMock(), MagicMock()]
+        mock_getpid.return_value = 100
+        parent = MongoDB.getMongoClient()
+        mock_getpid.return_value = 101
+        child = MongoDB.getMongoClient()
+        self.assertIsNot(parent, child)
+        self.assertEqual(mock_mongo_client.call_count, 2)
+
+    @patch('src.database.MongoDB.MongoClient')
+    def test_close_client(self, mock_mongo_client):
+        client = MongoDB.getMongoClient()
+        MongoDB.closeMongoClient()
+        client.close.assert_called_once()
+        self.assertIsNone(MongoDB._client)
+
+    @patch('src.database.MongoDB.MongoClient')
+    def test_ping_failure(self, mock_mongo_client):
+        mock_mongo_client.return_value.admin.command.side_effect = Exception("unreachable")
+        with self.assertRaises(Exception) as ctx:
+            MongoDB.ping()
+        self.assertIn("Failed to connect to MongoDB client", str(ctx.exception))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import numpy as np
+from flask import Flask
+from src.analytics.PartitionedScan import PartitionedScan
+from src.routes.data_analysis import data_analysis_bp
+
+class FakeCursor(list):
+    def batch_size(self, size):
+        return self
+
+class FakeUsersCollection:
+    """
+    Just enough of a collection for PartitionedScan: $sample, _id range
+    queries and the estimated document count.
+    """
+
+    name = 'users'
+
+    def __init__(self, counts):
+        self.docs = [{"_id": i, "count": c} for i, c in enumerate(counts)]
+        self.queries = []
+
+    def estimated_document_count(self):
+        return len(self.docs)
+
+    def aggregate(self, pipeline):
+        size = pipeline[0]["$sample"]["size"]
+        picked = np.random.default_rng(0).choice(len(self.docs), min(size, len(self.docs)), replace=False)
+        return [{"_id": self.docs[i]["_id"]} for i in picked]
+
+    def find(self, query, projection):
+        self.queries.append(query)
+        bounds = query.get("_id", {})
+        return FakeCursor(
+            {"count": doc["count"]} for doc in self.docs
+            if doc["_id"] >= bounds.get("$gte", -1) and doc["_id"] < bounds.get("$lt", float('inf'))
+        )
+
+class PartitionedScanTestCase(unittest.TestCase):
+    def test_matches_numpy_exactly(self):
+        counts = np.random.default_rng(1).poisson(20, 10000)
+        collection = FakeUsersCollection(counts.tolist())
+
+        stats = PartitionedScan.compute(collection, workers=4, partition_size=1000, batch_size=256)
+        self.assertEqual(stats['n'], counts.size)
+        self.assertAlmostEqual(stats['mean'], np.mean(counts))
+        self.assertEqual(stats['median'], np.median(counts))
+        self.assertAlmostEqual(stats['variance'], np.var(counts))
+        self.assertEqual(stats['min'], counts.min())
+        self.assertEqual(stats['max'], counts.max())
+        # Ten ranges of about partition_size documents each
+        self.assertEqual(len(collection.queries), 10)
+
+    def test_ranges_cover_everything(self):
+        self.assertEqual(PartitionedScan.ranges([5, 9]), [(None, 5), (5, 9), (9, None)])
+        self.assertEqual(PartitionedScan.ranges([]), [(None, None)])
+
+    def test_empty_collection(self):
+        self.assertEqual(PartitionedScan.compute(FakeUsersCollection([]), workers=2), {"n": 0})
+
+    @patch.dict('env.env', {'DATA_ANALYSIS_MODE': 'partitioned', 'PARTITION_WORKERS': '2'}, clear=True)
+    @patch('src.database.MongoDB.MongoDB.getMongoClient')
+    def test_partitioned_mode(self, mock_get_client):
+        collection = FakeUsersCollection([1, 2, 3, 4])
+        mock_get_client.return_value.get_database.return_value.get_collection.return_value = collection
+        app = Flask(__name__)
+        app.register_blueprint(data_analysis_bp)
+
+        resp = app.test_client().get('/data-analysis')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.get_json()['median'], 2.5)
+
+if __name__ == '__main__':
+    unittest.main()
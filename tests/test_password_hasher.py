@@ -0,0 +1,145 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+import bcrypt
+from flask import Flask
+from src.security.PasswordHasher import PasswordHasher, PasswordPoolSaturated
+from src.routes.login import login_bp
+from src.routes.forgot_password import forgot_password_bp
+
+class PasswordHasherTestCase(unittest.TestCase):
+    def setUp(self):
+        self.hasher = PasswordHasher(workers=2, max_queue=1)
+        self.addCleanup(self.hasher.close)
+
+    def test_hash_and_check(self):
+        hashed = self.hasher.hashpw("password123")
+        self.assertTrue(bcrypt.checkpw(b"password123", hashed))
+        self.assertTrue(self.hasher.checkpw("password123", hashed))
+        self.assertFalse(self.hasher.checkpw("wrong", hashed))
+
+        timings = self.hasher.stats()["timings"]
+        self.assertEqual(timings["hash"]["count"], 1)
+        self.assertEqual(timings["check"]["count"], 2)
+        self.assertGreater(timings["check"]["avg_ms"], 0)
+
+    def test_hash_many(self):
+        hashed_password, hashed_answer = self.hasher.hashMany(["password123", "blue"])
+        self.assertTrue(bcrypt.checkpw(b"password123", hashed_password))
+        self.assertTrue(bcrypt.checkpw(b"blue", hashed_answer))
+
+    def test_rejects_when_saturated(self):
+        release = threading.Event()
+        # Two running plus one queued fill the pool
+        blockers = [self.hasher._submit('block', release.wait) for _ in range(3)]
+        with self.assertRaises(PasswordPoolSaturated):
+            self.hasher.hashpw("password123")
+        self.assertEqual(self.hasher.stats()["rejected"], 1)
+
+        release.set()
+        for future in blockers:
+            future.result()
+        self.assertEqual(self.hasher.stats()["pending"], 0)
+        self.hasher.hashpw("password123")
+
+    def test_cost_factor(self):
+        hasher = PasswordHasher(workers=1, rounds=5)
+        self.addCleanup(hasher.close)
+        hashed = hasher.hashpw("password123")
+        self.assertEqual(PasswordHasher.hashCost(hashed), 5)
+        self.assertFalse(hasher.needsRehash(hashed))
+        self.assertTrue(hasher.needsRehash(bcrypt.hashpw(b"password123", bcrypt.gensalt(rounds=4))))
+
+    def test_calibrate(self):
+        rounds, timings = PasswordHasher.calibrate(target_ms=10000, min_rounds=4, max_rounds=6)
+        self.assertEqual(rounds, 6)
+        self.assertEqual(sorted(timings), [4, 5, 6])
+        rounds, _ = PasswordHasher.calibrate(target_ms=0, min_rounds=4, max_rounds=6)
+        self.assertEqual(rounds, 4)
+
+
+@patch.dict('env.env', {'JWT_SECRET_KEY': 'testsecret'}, clear=True)
+class RehashOnLoginTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.register_blueprint(login_bp)
+        self.hasher = PasswordHasher(workers=1, rounds=5)
+        self.addCleanup(self.hasher.close)
+
+    @patch('src.routes.login.login.get_password_hasher')
+    @patch('src.database.MongoDB.MongoDB.getMongoClient')
+    def test_old_cost_is_upgraded(self, mock_get_client, mock_get_hasher):
+        mock_get_hasher.return_value = self.hasher
+        old_hash = bcrypt.hashpw(b"password123", bcrypt.gensalt(rounds=4))
+        mock_coll = mock_get_client.return_value.get_database.return_value.get_collection.return_value
+        mock_coll.find_one.return_value = {"_id": "abc123", "email": "user@example.com", "password": old_hash}
+
+        resp = self.app.test_client().post('/login', json={"email": "user@example.com", "password": "password123"})
+        self.assertEqual(resp.status_code, 200)
+        # The upgrade is stored after the response
+        deadline = time.monotonic() + 5
+        while not mock_coll.update_one.called and time.monotonic() < deadline:
+            time.sleep(0.01)
+        query, update = mock_coll.update_one.call_args.args
+        self.assertEqual(query, {"_id": "abc123", "password": old_hash})
+        new_hash = update["$set"]["password"]
+        self.assertEqual(PasswordHasher.hashCost(new_hash), 5)
+        self.assertTrue(bcrypt.checkpw(b"password123", new_hash))
+
+    @patch('src.routes.login.login.get_password_hasher')
+    @patch('src.database.MongoDB.MongoDB.getMongoClient')
+    def test_current_cost_is_left_alone(self, mock_get_client, mock_get_hasher):
+        mock_get_hasher.return_value = self.hasher
+        mock_coll = mock_get_client.return_value.get_database.return_value.get_collection.return_value
+        mock_coll.find_one.return_value = {"_id": "abc123", "email": "user@example.com",
+                                           "password": bcrypt.hashpw(b"password123", bcrypt.gensalt(rounds=5))}
+
+        resp = self.app.test_client().post('/login', json={"email": "user@example.com", "password": "password123"})
+        self.assertEqual(resp.status_code, 200)
+        mock_coll.update_one.assert_not_called()
+
+
+class RehashOnForgotPasswordTestCase(unittest.TestCase):
+    @patch('src.routes.forgot_password.forgot_password.get_user_cache')
+    @patch('src.routes.forgot_password.forgot_password.get_password_hasher')
+    @patch('src.database.MongoDB.MongoDB.getMongoClient')
+    def test_hashes_run_together(self, mock_get_client, mock_get_hasher, mock_get_cache):
+        app = Flask(__name__)
+        app.register_blueprint(forgot_password_bp)
+        mock_coll = mock_get_client.return_value.get_database.return_value.get_collection.return_value
+        mock_coll.find_one.return_value = {"email": "user@example.com", "security_answer": b"old"}
+        hasher = mock_get_hasher.return_value
+        hasher.checkpw.return_value = True
+        hasher.needsRehash.return_value = True
+        hasher.hashMany.return_value = [b"password-hash", b"answer-hash"]
+
+        resp = app.test_client().post('/forgot-password', json={
+            "email": "user@example.com", "security_answer": "blue",
+            "new_password": "pw2", "confirm_password": "pw2"
+        })
+        self.assertEqual(resp.status_code, 200)
+        hasher.hashMany.assert_called_once_with(["pw2", "blue"])
+        hasher.hashpw.assert_not_called()
+        mock_coll.update_one.assert_called_once_with(
+            {"email": "user@example.com"},
+            {"$set": {"password": b"password-hash", "security_answer": b"answer-hash"}}
+        )
+
+@patch.dict('env.env', {'JWT_SECRET_KEY': 'testsecret'}, clear=True)
+class PasswordPoolSaturatedRouteTestCase(unittest.TestCase):
+    @patch('src.routes.login.login.get_password_hasher')
+    @patch('src.database.MongoDB.MongoDB.getMongoClient')
+    def test_login_sheds_load(self, mock_get_client, mock_get_hasher):
+        app = Flask(__name__)
+        app.register_blueprint(login_bp)
+        mock_coll = mock_get_client.return_value.get_database.return_value.get_collection.return_value
+        mock_coll.find_one.return_value = {"_id": "abc123", "email": "user@example.com", "password": b"hash"}
+        mock_get_hasher.return_value.checkpw.side_effect = PasswordPoolSaturated()
+
+        resp = app.test_client().post('/login', json={"email": "user@example.com", "password": "pw"})
+        self.assertEqual(resp.status_code, 503)
+        self.assertEqual(resp.headers["Retry-After"], "1")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,9 +3,12 @@ from unittest.mock import patch, MagicMock
 import jwt
 from datetime import datetime, timedelta, timezone
 from flask import Flask
+from pymongo import ReturnDocument
 from src.routes.plus_one import plus_one_bp
+from src.analytics.EventLog import EventLog
+from src.signals import counts_changed
 
-@patch.dict('env.env', {'JWT_SECRET_KEY': 'testsecret'}, clear=True)
+@patch.dict('env.env', {'JWT_SECRET_KEY': 'testsecret', 'DISCORD_WEBHOOK_URL': 'http://localhost/webhook'}, clear=True)
 class PlusOneTestCase(unittest.TestCase):
     def setUp(self):
         self.app = Flask(__name__)
@@ -18,8 +21,9 @@ class PlusOneTestCase(unittest.TestCase):
             algorithm="HS256"
         )
 
+    @patch('src.routes.plus_one.plus_one.notify_counter_change')
     @patch('src.database.MongoDB.MongoDB.getMongoClient')
-    def test_successful_plus_one(self, mock_get_client):
+    def test_successful_plus_one(self, mock_get_client, mock_notify):
         mock_client = MagicMock()
         mock_db     = MagicMock()
         mock_coll   = MagicMock()
@@ -27,20 +31,50 @@ class PlusOneTestCase(unittest.TestCase):
         mock_client.get_database.return_value = mock_db
         mock_db.get_collection.return_value  = mock_coll
 
-        # first find_one → existence check, second → updated doc
-        mock_coll.find_one.side_effect = [
-            {"email": self.email, "count": 0},
-            {"email": self.email, "count": 1}
-        ]
+        mock_coll.find_one_and_update.return_value = {"email": self.email, "count": 1}
 
         resp = self.client.post('/plus-one',
             json={"email": self.email, "auth_token": self.valid_token}
         )
         self.assertEqual(resp.status_code, 200)
         self.assertEqual(resp.get_json(), {"email": self.email, "count": 1})
-        mock_coll.update_one.assert_called_once_with(
-            {"email": self.email}, {"$inc": {"count": 1}}
-        )
+        args, kwargs = mock_coll.find_one_and_update.call_args
+        self.assertEqual(args, ({"email": self.email}, {"$inc": {"count": 1}}))
+        self.assertEqual(kwargs['return_document'], ReturnDocument.AFTER)
+        mock_coll.find_one.assert_not_called()
+        mock_coll.update_one.assert_not_called()
+        mock_notify.assert_called_once_with(1)
+
+    @patch('src.routes.plus_one.plus_one.notify_counter_change')
+    @patch('src.database.MongoDB.MongoDB.getMongoClient')
+    def test_failing_receiver_does_not_fail_the_write(self, mock_get_client, mock_notify):
+        mock_coll = mock_get_client.return_value.get_database.return_value.get_collection.return_value
+        mock_coll.find_one_and_update.return_value = {"email": self.email, "count": 1}
+        # An event log whose flush-on-full write fails
+        mock_coll.insert_many.side_effect = Exception("DB down")
+        event_log = EventLog(max_pending=1)
+        calls = []
+
+        def record(sender, changes):
+            event_log.record(changes)
+
+        def failing(sender, changes):
+            raise RuntimeError("receiver failed")
+
+        def later(sender, changes):
+            calls.append(changes)
+
+        for receiver in (record, failing, later):
+            counts_changed.connect(receiver)
+            self.addCleanup(counts_changed.disconnect, receiver)
+
+        resp = self.client.post('/plus-one', json={"email": self.email, "auth_token": self.valid_token})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.get_json(), {"email": self.email, "count": 1})
+        mock_notify.assert_called_once_with(1)
+        self.assertEqual(calls, [[(self.email, 0, 1)]])
+        self.assertEqual(event_log.stats()["errors"], 1)
+        self.assertEqual(event_log.pendingCount(), 1)
 
     def test_invalid_json(self):
         resp = self.client.post('/plus-one', json={"email": self.email})
@@ -80,7 +114,7 @@ class PlusOneTestCase(unittest.TestCase):
         mock_client.get_database.return_value = mock_db
         mock_db.get_collection.return_value   = mock_coll
 
-        mock_coll.find_one.return_value = None
+        mock_coll.find_one_and_update.return_value = None
 
         resp = self.client.post('/plus-one',
             json={"email": self.email, "auth_token": self.valid_token}
@@ -0,0 +1,102 @@
+import random
+import time
+import unittest
+from collections import Counter
+from unittest.mock import patch, MagicMock
+import jwt
+from datetime import datetime, timedelta, timezone
+from flask import Flask
+from src.analytics.RankIndex import RankIndex
+from src.routes.rank import rank_bp
+
+def aggregate_result(counts):
+    return [{"_id": value, "frequency": frequency} for value, frequency in Counter(counts.values()).items()]
+
+def expected(counts, count):
+    values = list(counts.values())
+    below = sum(v < count for v in values)
+    equal = sum(v == count for v in values)
+    return {
+        "rank": sum(v > count for v in values) + 1,
+        "percentile": 100 * (below + equal / 2) / len(values),
+        "players": len(values)
+    }
+
+class RankIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.counts = {f"user{i}": i % 5 for i in range(20)}
+        self.collection = MagicMock()
+        self.collection.aggregate.return_value = aggregate_result(self.counts)
+        self.index = RankIndex(ttl=60)
+        self.index.reconcile(self.collection)
+
+    def test_matches_scan_after_random_changes(self):
+        rng = random.Random(0)
+        for step in range(3000):
+            email = f"user{rng.randrange(25)}"
+            old = self.counts.get(email)
+            # Counts wander well past the initial range, including below zero
+            new = (old if old is not None else 0) + rng.choice([-3, -1, 1, 3])
+            self.counts[email] = new
+            self.index.applyCounts([(email, old, new)])
+            probe = rng.randrange(-60, 60)
+            self.assertEqual(self.index.lookup(probe), expected(self.counts, probe))
+
+    def test_outlier_count_stays_small(self):
+        self.index.applyCounts([("user0", 0, 10 ** 12)])
+        self.counts["user0"] = 10 ** 12
+        self.assertEqual(len(self.index._tree), len(set(self.counts.values())) + 1)
+        self.assertEqual(self.index.lookup(10 ** 12), expected(self.counts, 10 ** 12))
+        self.assertEqual(self.index.lookup(2), expected(self.counts, 2))
+
+    def test_deleted_user(self):
+        self.index.applyCounts([("user4", 4, None)])
+        del self.counts["user4"]
+        self.assertEqual(self.index.lookup(4), expected(self.counts, 4))
+
+    def test_stale_index_reconciles_in_background(self):
+        self.index.ttl = 0
+        with patch.object(self.index, 'reconcile') as mock_reconcile:
+            self.index.lookup(1)
+            deadline = time.monotonic() + 1
+            while not mock_reconcile.called and time.monotonic() < deadline:
+                time.sleep(0.01)
+            mock_reconcile.assert_called_once()
+
+
+@patch.dict('env.env', {'JWT_SECRET_KEY': 'testsecret'}, clear=True)
+class RankRouteTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.register_blueprint(rank_bp)
+        self.client = self.app.test_client()
+        self.email = "user@example.com"
+        self.token = jwt.encode(
+            {"email": self.email, "exp": datetime.now(timezone.utc) + timedelta(days=1)},
+            'testsecret',
+            algorithm="HS256"
+        )
+
+    @patch('src.database.MongoDB.MongoDB.getMongoClient')
+    def test_rank_without_scanning(self, mock_get_client):
+        mock_coll = mock_get_client.return_value.get_database.return_value.get_collection.return_value
+        mock_coll.find_one.return_value = {"count": 3}
+        mock_coll.aggregate.return_value = [{"_id": 1, "frequency": 2}, {"_id": 3, "frequency": 1}, {"_id": 7, "frequency": 1}]
+
+        for _ in range(3):
+            resp = self.client.post('/rank', json={"email": self.email, "auth_token": self.token})
+            self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.get_json(), {"email": self.email, "count": 3, "rank": 2, "percentile": 62.5, "players": 4})
+        mock_coll.aggregate.assert_called_once()
+        # One indexed lookup of the caller's own count per request
+        mock_coll.find_one.assert_called_with({"email": self.email}, {"_id": 0, "count": 1})
+        mock_coll.find.assert_not_called()
+
+    @patch('src.database.MongoDB.MongoDB.getMongoClient')
+    def test_email_not_found(self, mock_get_client):
+        mock_get_client.return_value.get_database.return_value.get_collection.return_value.find_one.return_value = None
+        resp = self.client.post('/rank', json={"email": self.email, "auth_token": self.token})
+        self.assertEqual(resp.status_code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from flask import Flask
+from src.middleware.RateLimiter import MemoryBucketStore, MongoBucketStore, RateLimiter, trust_proxies
+from src.routes.login import login_bp
+
+class MemoryBucketStoreTestCase(unittest.TestCase):
+    @patch('src.middleware.RateLimiter.time.monotonic')
+    def test_burst_then_refill(self, mock_monotonic):
+        mock_monotonic.return_value = 100.0
+        store = MemoryBucketStore()
+        self.assertEqual([store.take("k", 2, 1.0) for _ in range(2)], [0.0, 0.0])
+        self.assertAlmostEqual(store.take("k", 2, 1.0), 1.0)
+        mock_monotonic.return_value = 101.0
+        self.assertEqual(store.take("k", 2, 1.0), 0.0)
+
+    def test_lru_is_bounded(self):
+        store = MemoryBucketStore(max_keys=2)
+        for key in ("a", "b", "c"):
+            store.take(key, 1, 0.01)
+        self.assertEqual(list(store._buckets), ["b", "c"])
+
+
+class MongoBucketStoreTestCase(unittest.TestCase):
+    @patch('src.database.MongoDB.MongoDB.getMongoClient')
+    def test_single_atomic_update(self, mock_get_client):
+        mock_coll = mock_get_client.return_value.get_database.return_value.get_collection.return_value
+        mock_coll.find_one_and_update.return_value = {"tokens": 0.5, "allowed": False}
+
+        self.assertAlmostEqual(MongoBucketStore().take("login:ip:1.2.3.4", 5, 0.25), 2.0)
+        args, kwargs = mock_coll.find_one_and_update.call_args
+        self.assertEqual(args[0], {"_id": "login:ip:1.2.3.4"})
+        self.assertIsInstance(args[1], list)
+        self.assertTrue(kwargs["upsert"])
+
+
+class RateLimiterTestCase(unittest.TestCase):
+    def test_email_limited_across_ips(self):
+        limiter = RateLimiter(MemoryBucketStore(), {'login': {"ip": (100, 60), "email": (2, 60)}})
+        self.assertEqual(limiter.check('login', '1.1.1.1', 'User@example.com'), 0)
+        self.assertEqual(limiter.check('login', '2.2.2.2', 'user@example.com'), 0)
+        self.assertGreater(limiter.check('login', '3.3.3.3', 'user@example.com'), 0)
+        self.assertEqual(limiter.check('login', '3.3.3.3', 'other@example.com'), 0)
+        self.assertEqual(limiter.stats(), {"limited": {"login": 1}})
+
+
+@patch.dict('env.env', {'JWT_SECRET_KEY': 'testsecret', 'RATE_LIMITS': {'login': {"ip": (2, 60)}}}, clear=True)
+class RateLimitedRouteTestCase(unittest.TestCase):
+    @patch('src.database.MongoDB.MongoDB.getMongoClient')
+    def test_rejects_before_database(self, mock_get_client):
+        app = Flask(__name__)
+        app.register_blueprint(login_bp)
+        client = app.test_client()
+        mock_get_client.return_value.get_database.return_value.get_collection.return_value.find_one.return_value = None
+
+        for _ in range(2):
+            self.assertEqual(client.post('/login', json={"email": "a@example.com", "password": "pw"}).status_code, 404)
+        mock_get_client.reset_mock()
+
+        resp = client.post('/login', json={"email": "a@example.com", "password": "pw"})
+        self.assertEqual(resp.status_code, 429)
+        self.assertEqual(resp.headers["Retry-After"], "30")
+        mock_get_client.assert_not_called()
+
+    @patch('src.database.MongoDB.MongoDB.getMongoClient')
+    def test_clients_behind_proxy_have_own_buckets(self, mock_get_client):
+        app = Flask(__name__)
+        app.register_blueprint(login_bp)
+        trust_proxies(app, 1)
+        client = app.test_client()
+        mock_get_client.return_value.get_database.return_value.get_collection.return_value.find_one.return_value = None
+
+        def login(ip, email):
+            return client.post('/login', json={"email": email, "password": "pw"}, headers={"X-Forwarded-For": ip}).status_code
+
+        self.assertEqual([login("1.1.1.1", f"{i}@example.com") for i in range(3)], [404, 404, 429])
+        self.assertEqual(login("2.2.2.2", "a@example.com"), 404)
+
+if __name__ == '__main__':
+    unittest.main()
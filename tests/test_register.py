@@ -2,6 +2,7 @@ import unittest
 from unittest.mock import patch, MagicMock
 import bcrypt
 from flask import Flask
+from pymongo.errors import DuplicateKeyError
 from src.routes.register import register_bp
 
 class RegisterTestCase(unittest.TestCase):
@@ -50,18 +51,21 @@ class RegisterTestCase(unittest.TestCase):
 
         mock_client.get_database.return_value = mock_db
         mock_db.get_collection.return_value = mock_collection
-        # Simulate that the email already exists in the collection
-        mock_collection.find_one.return_value = {"email": "test@example.com"}
+        # Simulate the unique email index rejecting the insert
+        mock_collection.insert_one.side_effect = DuplicateKeyError("E11000 duplicate key error")
         mock_get_client.return_value = mock_client
 
         payload = {
             "email": "test@example.com",
-            "password": "password123"
+            "password": "password123",
+            "security_question": "Favourite colour?",
+            "security_answer": "blue"
         }
 
         response = self.client.post('/register', json=payload)
         self.assertEqual(response.status_code, 409)
         self.assertIn("Email already exists", response.get_data(as_text=True))
+        mock_collection.find_one.assert_not_called()
 
     def test_invalid_json(self):
         # Provide a payload that doesn't match the expected schema (e.g., missing required fields)
@@ -0,0 +1,92 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from flask import Flask
+from src.cache.ResultCache import ResultCache
+from src.routes.data_analysis import data_analysis_bp
+
+class ResultCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.calls = 0
+
+    def compute(self):
+        self.calls += 1
+        return self.calls
+
+    def test_hit_within_ttl(self):
+        cache = ResultCache(ttl=60)
+        self.assertEqual(cache.get(self.compute), 1)
+        self.assertEqual(cache.get(self.compute), 1)
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["recomputes"]), (1, 1, 1))
+        self.assertEqual(stats["hit_ratio"], 0.5)
+
+    def test_recompute_after_ttl(self):
+        cache = ResultCache(ttl=0.05)
+        cache.get(self.compute)
+        time.sleep(0.06)
+        self.assertEqual(cache.get(self.compute), 2)
+
+    def test_concurrent_misses_compute_once(self):
+        cache = ResultCache(ttl=60)
+        release = threading.Event()
+
+        def slow():
+            release.wait()
+            return self.compute()
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get(slow))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [1] * 8)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(cache.stats()["coalesced"], 7)
+
+    def test_stale_while_revalidate(self):
+        cache = ResultCache(ttl=0.2, stale_ttl=60)
+        cache.get(self.compute)
+        time.sleep(0.25)
+        # The old result is served immediately while a refresh runs
+        self.assertEqual(cache.get(self.compute), 1)
+        deadline = time.monotonic() + 1
+        while cache.stats()["recomputes"] < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(cache.get(self.compute), 2)
+        self.assertEqual(cache.stats()["stale_hits"], 1)
+
+    def test_errors_reach_every_waiter_and_are_not_cached(self):
+        cache = ResultCache(ttl=60)
+
+        def broken():
+            raise RuntimeError("DB down")
+
+        with self.assertRaises(RuntimeError):
+            cache.get(broken)
+        self.assertEqual(cache.get(self.compute), 1)
+        self.assertEqual(cache.stats()["errors"], 1)
+
+
+class DataAnalysisCacheRouteTestCase(unittest.TestCase):
+    @patch.dict('env.env', {'DATA_ANALYSIS_MODE': 'scan', 'ANALYSIS_CACHE_TTL_S': '60'}, clear=True)
+    @patch('src.database.MongoDB.MongoDB.getMongoClient')
+    def test_repeat_polls_hit_cache(self, mock_get_client):
+        app = Flask(__name__)
+        app.register_blueprint(data_analysis_bp)
+        client = app.test_client()
+        mock_coll = mock_get_client.return_value.get_database.return_value.get_collection.return_value
+        mock_coll.find.return_value = [{'count': 1}, {'count': 3}]
+
+        first = client.get('/data-analysis')
+        second = client.get('/data-analysis')
+        self.assertEqual(first.get_json(), second.get_json())
+        mock_coll.find.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import gc
+import unittest
+from unittest.mock import MagicMock, patch
+from flask import Flask
+from src.analytics.CountStats import CountStats
+from src.signals import counts_changed, connect_for_app
+
+class ConnectForAppTestCase(unittest.TestCase):
+    def test_receivers_go_with_their_app(self):
+        calls = []
+        first, second = Flask(__name__), Flask(__name__)
+        connect_for_app(first, counts_changed, lambda sender, changes: calls.append(("first", changes)))
+        connect_for_app(second, counts_changed, lambda sender, changes: calls.append(("second", changes)))
+
+        del first
+        gc.collect()
+        counts_changed.send('test', changes=[("a@example.com", 1, 2)])
+        self.assertEqual(calls, [("second", [("a@example.com", 1, 2)])])
+
+    def test_receiver_lives_with_app(self):
+        app = Flask(__name__)
+        receiver = MagicMock()
+        connect_for_app(app, counts_changed, lambda sender, changes: receiver(changes))
+        gc.collect()
+        counts_changed.send('test', changes=[])
+        receiver.assert_called_once_with([])
+
+
+class CountStatsReceiverTestCase(unittest.TestCase):
+    @patch('src.analytics.CountStats.CountStats.record')
+    def test_one_receiver_per_process(self, mock_record):
+        # What create_app does for each app it builds
+        for _ in range(2):
+            counts_changed.connect(CountStats.onCountsChanged, weak=False)
+        self.addCleanup(counts_changed.disconnect, CountStats.onCountsChanged)
+
+        counts_changed.send('test', changes=[("a@example.com", 1, 2)])
+        mock_record.assert_called_once_with([("a@example.com", 1, 2)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import threading
+import unittest
+from unittest.mock import patch
+import jwt
+from datetime import datetime, timedelta, timezone
+from flask import Flask
+from src.notifications.EventBroker import EventBroker, TooManySubscribers
+from src.routes.stream import stream_bp, publish_count_changes
+from src.notifications import get_event_broker
+
+class EventBrokerTestCase(unittest.TestCase):
+    def test_routes_by_topic(self):
+        broker = EventBroker()
+        a = broker.subscribe(["count:a"])
+        b = broker.subscribe(["count:b"])
+        broker.publish("count:a", 1)
+        self.assertEqual(a.next(0), [("count:a", 1)])
+        self.assertEqual(b.next(0), [])
+
+    def test_pending_events_are_conflated(self):
+        broker = EventBroker()
+        subscription = broker.subscribe(["count:a"])
+        for count in range(100):
+            broker.publish("count:a", count)
+        self.assertEqual(subscription.next(0), [("count:a", 99)])
+        self.assertEqual(broker.stats()["conflated"], 99)
+
+    def test_subscriber_cap(self):
+        broker = EventBroker(max_subscribers=1)
+        subscription = broker.subscribe(["count:a"])
+        with self.assertRaises(TooManySubscribers):
+            broker.subscribe(["count:b"])
+        broker.unsubscribe(subscription)
+        broker.unsubscribe(subscription)
+        broker.subscribe(["count:b"])
+        self.assertEqual(broker.stats()["subscribers"], 1)
+
+    def test_close_wakes_waiting_subscriber(self):
+        broker = EventBroker()
+        subscription = broker.subscribe(["count:a"])
+        results = []
+        thread = threading.Thread(target=lambda: results.append(subscription.next(10)))
+        thread.start()
+        broker.close()
+        thread.join(1)
+        self.assertEqual(results, [None])
+
+
+@patch.dict('env.env', {'JWT_SECRET_KEY': 'testsecret', 'STREAM_HEARTBEAT_S': 0.01}, clear=True)
+class StreamRouteTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.register_blueprint(stream_bp)
+        self.client = self.app.test_client()
+        self.email = "user@example.com"
+        self.token = jwt.encode(
+            {"email": self.email, "exp": datetime.now(timezone.utc) + timedelta(days=1)},
+            'testsecret',
+            algorithm="HS256"
+        )
+
+    @patch('src.database.MongoDB.MongoDB.getMongoClient')
+    def test_streams_snapshot_heartbeat_and_changes(self, mock_get_client):
+        mock_coll = mock_get_client.return_value.get_database.return_value.get_collection.return_value
+        mock_coll.find_one.return_value = {"email": self.email, "count": 4}
+
+        resp = self.client.get(f'/stream?auth_token={self.token}&email={self.email}', buffered=False)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.mimetype, 'text/event-stream')
+        chunks = iter(resp.response)
+        self.assertEqual(next(chunks), b'event: count\ndata: {"count": 4, "email": "user@example.com"}\n\n')
+        self.assertEqual(next(chunks), b": heartbeat\n\n")
+
+        broker = get_event_broker(self.app)
+        publish_count_changes(broker, [(self.email, 4, 5), ("other@example.com", 1, 2)])
+        self.assertEqual(next(chunks), b'event: count\ndata: {"count": 5, "email": "user@example.com"}\n\n')
+
+        resp.close()
+        self.assertEqual(broker.stats()["subscribers"], 0)
+
+    def test_token_for_other_email_is_forbidden(self):
+        resp = self.client.get(f'/stream?auth_token={self.token}&email=other@example.com')
+        self.assertEqual(resp.status_code, 403)
+
+    def test_missing_token(self):
+        resp = self.client.get(f'/stream?email={self.email}')
+        self.assertEqual(resp.status_code, 400)
+
+    @patch.dict('env.env', {'STREAM_MAX_CONNECTIONS': 0})
+    def test_connection_cap(self):
+        resp = self.client.get(f'/stream?auth_token={self.token}&email={self.email}')
+        self.assertEqual(resp.status_code, 503)
+
+if __name__ == '__main__':
+    unittest.main()
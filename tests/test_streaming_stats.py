@@ -0,0 +1,96 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import numpy as np
+from flask import Flask
+from src.analytics.Moments import Moments
+from src.analytics.KLLSketch import KLLSketch
+from src.analytics.StreamingStats import StreamingStats
+from src.routes.data_analysis import data_analysis_bp
+
+class MomentsTestCase(unittest.TestCase):
+    def test_chunked_matches_numpy(self):
+        values = np.random.default_rng(0).normal(1e9, 3.0, 100000)
+        moments = Moments()
+        for chunk in np.array_split(values, 7):
+            moments.update(chunk)
+        self.assertEqual(moments.n, values.size)
+        self.assertAlmostEqual(moments.mean, np.mean(values), places=3)
+        # Large offset, small spread: naive sum of squares would lose this
+        self.assertAlmostEqual(moments.variance, np.var(values), places=3)
+        self.assertEqual(moments.min, np.min(values))
+        self.assertEqual(moments.max, np.max(values))
+
+    def test_merge(self):
+        left, right, both = Moments(), Moments(), Moments()
+        left.update([1, 2, 3])
+        right.update([10, 20])
+        both.update([1, 2, 3, 10, 20])
+        left.merge(right)
+        self.assertEqual(left.n, 5)
+        self.assertAlmostEqual(left.mean, both.mean)
+        self.assertAlmostEqual(left.variance, both.variance)
+
+
+class KLLSketchTestCase(unittest.TestCase):
+    def assertRankWithin(self, values, fraction, estimate, error):
+        rank = np.searchsorted(np.sort(values), estimate, side='right') / values.size
+        low = np.searchsorted(np.sort(values), estimate, side='left') / values.size
+        self.assertLessEqual(low - error, fraction)
+        self.assertGreaterEqual(rank + error, fraction)
+
+    def test_quantiles_within_error_bound(self):
+        values = np.random.default_rng(1).exponential(50, 500000).round()
+        sketch = KLLSketch(200, seed=2)
+        for chunk in np.array_split(values, 20):
+            sketch.update(chunk)
+        for fraction, estimate in zip([0.5, 0.9, 0.99], sketch.quantiles([0.5, 0.9, 0.99])):
+            self.assertRankWithin(values, fraction, estimate, sketch.rankError())
+
+    def test_memory_is_bounded(self):
+        sketch = KLLSketch(100, seed=0)
+        for _ in range(50):
+            sketch.update(np.random.default_rng(3).integers(0, 1000, 20000))
+        self.assertEqual(sketch.n, 1000000)
+        self.assertLess(sketch.size(), 3 * 100 + 2 * len(sketch.levels))
+
+    def test_merge(self):
+        values = np.arange(100000, dtype=float)
+        left, right = KLLSketch(200, seed=4), KLLSketch(200, seed=5)
+        left.update(values[:60000])
+        right.update(values[60000:])
+        left.merge(right)
+        self.assertEqual(left.n, values.size)
+        self.assertRankWithin(values, 0.5, left.quantiles([0.5])[0], left.rankError())
+
+    def test_empty(self):
+        self.assertEqual(KLLSketch().quantiles([0.5]), [None])
+
+
+class StreamingStatsTestCase(unittest.TestCase):
+    def test_consume_cursor(self):
+        counts = list(range(1, 1001))
+        cursor = [{"count": c} for c in counts] + [{}]
+        stats = StreamingStats(seed=0).consume(cursor, batch_size=64).summary()
+        self.assertEqual(stats['n'], 1000)
+        self.assertAlmostEqual(stats['mean'], np.mean(counts))
+        self.assertAlmostEqual(stats['variance'], np.var(counts))
+        self.assertLessEqual(abs(stats['median'] - np.median(counts)), stats['quantile_rank_error'] * 1000 + 1)
+        self.assertIn('p99_9', stats)
+
+    @patch.dict('env.env', {'DATA_ANALYSIS_MODE': 'streaming'}, clear=True)
+    @patch('src.database.MongoDB.MongoDB.getMongoClient')
+    def test_streaming_mode(self, mock_get_client):
+        app = Flask(__name__)
+        app.register_blueprint(data_analysis_bp)
+        mock_coll = mock_get_client.return_value.get_database.return_value.get_collection.return_value
+        mock_coll.find.return_value.batch_size.return_value = [{'count': 1}, {'count': 2}, {'count': 3}]
+
+        resp = app.test_client().get('/data-analysis')
+        self.assertEqual(resp.status_code, 200)
+        data = resp.get_json()
+        self.assertEqual(data['n'], 3)
+        self.assertAlmostEqual(data['variance'], 0.6666666666666666)
+        self.assertEqual(data['median'], 2.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import threading
+import unittest
+from unittest.mock import patch, MagicMock
+from flask import Flask
+from src.cache.UserCache import UserCache
+from src.routes.get_security_question import get_security_question_bp
+
+class UserCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.cache = UserCache(max_size=2, ttl=60)
+        self.cache.load = MagicMock(side_effect=lambda email, fields: {"email": email, "count": 1, "security_question": "Pet?"})
+
+    def test_read_through(self):
+        self.assertEqual(self.cache.get("a@example.com", ("email", "count")), {"email": "a@example.com", "count": 1})
+        self.assertEqual(self.cache.get("a@example.com", ("count",)), {"count": 1})
+        self.cache.load.assert_called_once()
+        # A field that was never loaded is a miss
+        self.assertEqual(self.cache.get("a@example.com", ("security_question",)), {"security_question": "Pet?"})
+        self.assertEqual(self.cache.load.call_count, 2)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["size"]), (1, 2, 1))
+        self.assertGreater(stats["bytes"], 0)
+
+    def test_missing_user_is_not_cached(self):
+        self.cache.load.side_effect = None
+        self.cache.load.return_value = None
+        self.assertIsNone(self.cache.get("a@example.com", ("count",)))
+        self.assertIsNone(self.cache.get("a@example.com", ("count",)))
+        self.assertEqual(self.cache.load.call_count, 2)
+
+    def test_lru_is_bounded(self):
+        for email in ("a", "b", "c"):
+            self.cache.get(email, ("count",))
+        self.assertEqual(list(self.cache._entries), ["b", "c"])
+
+    def test_apply_counts_write_through(self):
+        self.cache.get("a", ("count",))
+        self.cache.applyCounts([("a", 1, 2)])
+        self.assertEqual(self.cache.get("a", ("count",)), {"count": 2})
+        # Out of order: the cached count is not the change's old value
+        self.cache.applyCounts([("a", 5, 6)])
+        self.assertNotIn("a", self.cache._entries)
+
+    def test_write_during_load_is_not_overwritten(self):
+        loading = threading.Event()
+        release = threading.Event()
+
+        def slow_load(email, fields):
+            loading.set()
+            release.wait()
+            return {"count": 1}
+
+        self.cache.load.side_effect = slow_load
+        thread = threading.Thread(target=self.cache.get, args=("a", ("count",)))
+        thread.start()
+        loading.wait()
+        self.cache.applyCounts([("a", 1, 2)])
+        release.set()
+        thread.join()
+        self.assertNotIn("a", self.cache._entries)
+
+    def test_change_stream_event_refreshes_entry(self):
+        self.cache.get("a", ("count",))
+        self.cache._onChange({"operationType": "update", "fullDocument": {"email": "a", "count": 7}})
+        self.assertEqual(self.cache.get("a", ("count",)), {"count": 7})
+        self.cache._onChange({"operationType": "delete"})
+        self.assertEqual(self.cache.stats()["size"], 0)
+
+
+class SecurityQuestionCacheRouteTestCase(unittest.TestCase):
+    @patch('src.database.MongoDB.MongoDB.getMongoClient')
+    def test_repeat_lookups_hit_cache(self, mock_get_client):
+        app = Flask(__name__)
+        app.register_blueprint(get_security_question_bp)
+        client = app.test_client()
+        mock_coll = mock_get_client.return_value.get_database.return_value.get_collection.return_value
+        mock_coll.find_one.return_value = {"security_question": "Pet?"}
+
+        for _ in range(3):
+            resp = client.post('/get-security-question', json={"email": "user@example.com"})
+            self.assertEqual(resp.get_json(), {"security_question": "Pet?"})
+        mock_coll.find_one.assert_called_once_with({"email": "user@example.com"}, {"_id": 0, "security_question": 1})
+
+if __name__ == '__main__':
+    unittest.main()
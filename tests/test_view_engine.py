@@ -0,0 +1,164 @@
+import unittest
+from unittest.mock import MagicMock
+from bson.timestamp import Timestamp
+from pymongo.errors import DuplicateKeyError, OperationFailure
+from src.database.ViewEngine import ViewEngine
+
+class FakeStateCollection:
+    """
+    The subset of a collection the engine uses for its lease and resume token.
+    """
+
+    def __init__(self):
+        self.docs = {}
+
+    def find_one_and_update(self, filter, update, upsert=False):
+        doc = self.docs.get(filter["_id"])
+        if doc is not None:
+            lease_free, owned = filter["$or"]
+            now = lease_free["lease_until"]["$not"]["$gte"]
+            if doc.get("lease_until") is not None and doc["lease_until"] >= now and doc.get("owner") != owned["owner"]:
+                raise DuplicateKeyError("E11000 duplicate key")
+        doc = self.docs.setdefault(filter["_id"], {"_id": filter["_id"]})
+        doc.update(update["$set"])
+        return doc
+
+    def find_one(self, filter, projection=None):
+        return self.docs.get(filter["_id"])
+
+    def update_one(self, filter, update):
+        doc = self.docs.get(filter["_id"])
+        if doc is None or doc.get("owner", filter.get("owner")) != filter.get("owner", doc.get("owner")):
+            return
+        doc.update(update.get("$set", {}))
+        for field in update.get("$unset", {}):
+            doc.pop(field, None)
+
+
+class FakeStream:
+    def __init__(self, events, on_idle):
+        self.events = list(events)
+        self.on_idle = on_idle
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def try_next(self):
+        if self.events:
+            return self.events.pop(0)
+        self.on_idle()
+        return None
+
+
+class FakeUsersCollection:
+    def __init__(self):
+        self.events = []
+        self.watch_calls = []
+        self.history_lost = False
+        self.on_idle = lambda: None
+
+    def watch(self, **kwargs):
+        self.watch_calls.append(kwargs)
+        if self.history_lost and "resume_after" in kwargs:
+            raise OperationFailure("Resume of change stream was not possible", code=286)
+        events, self.events = self.events, []
+        return FakeStream(events, self.on_idle)
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.state = FakeStateCollection()
+        self.users = FakeUsersCollection()
+        self.client = MagicMock()
+        session = self.client.start_session.return_value.__enter__.return_value
+        session.operation_time = Timestamp(100, 1)
+        self.session = session
+
+    def get_collection(self, name):
+        return self.state if name == ViewEngine.STATE_COLLECTION else self.users
+
+    def command(self, *args, **kwargs):
+        return {"ok": 1}
+
+
+def update_event(token, email, old, new):
+    return {
+        "_id": {"_data": token},
+        "operationType": "update",
+        "updateDescription": {"updatedFields": {"count": new}, "removedFields": []},
+        "fullDocumentBeforeChange": {"email": email, "count": old}
+    }
+
+
+class ToChangesTestCase(unittest.TestCase):
+    def test_events(self):
+        self.assertEqual(
+            ViewEngine.toChanges({"operationType": "insert", "fullDocument": {"email": "a", "count": 0}}),
+            [("a", None, 0)]
+        )
+        self.assertEqual(ViewEngine.toChanges(update_event("t", "a", 1, 2)), [("a", 1, 2)])
+        self.assertEqual(ViewEngine.toChanges({
+            "operationType": "delete", "fullDocumentBeforeChange": {"email": "a", "count": 3}
+        }), [("a", 3, None)])
+
+    def test_unrelated_update_is_ignored(self):
+        self.assertEqual(ViewEngine.toChanges({
+            "operationType": "update",
+            "updateDescription": {"updatedFields": {"password": "x"}, "removedFields": []}
+        }), [])
+
+    def test_missing_pre_image(self):
+        event = update_event("t", "a", 1, 2)
+        event["fullDocumentBeforeChange"] = None
+        self.assertIsNone(ViewEngine.toChanges(event))
+
+
+class ViewEngineTestCase(unittest.TestCase):
+    def setUp(self):
+        self.db = FakeDatabase()
+        self.engine = ViewEngine(db=self.db)
+        self.db.users.on_idle = self.engine._stop.set
+        self.applied = []
+        self.rebuild = MagicMock()
+        self.engine.register('test', self.applied.extend, self.rebuild)
+
+    def test_first_run_rebuilds_then_follows_stream(self):
+        self.db.users.events = [update_event("t1", "a", 1, 2), update_event("t2", "b", 5, 4)]
+        self.engine._run()
+
+        self.rebuild.assert_called_once_with(self.db.session)
+        self.assertEqual(self.db.users.watch_calls[0]["start_at_operation_time"], Timestamp(100, 2))
+        self.assertEqual(self.applied, [("a", 1, 2), ("b", 5, 4)])
+        self.assertEqual(self.engine.loadResumeToken(), {"_data": "t2"})
+
+    def test_restart_resumes_from_saved_token(self):
+        self.db.state.docs["users"] = {"_id": "users", "resume_token": {"_data": "t1"}}
+        self.db.users.events = [update_event("t2", "a", 2, 3)]
+        self.engine._run()
+
+        self.rebuild.assert_not_called()
+        self.assertEqual(self.db.users.watch_calls[0]["resume_after"], {"_data": "t1"})
+        self.assertEqual(self.applied, [("a", 2, 3)])
+
+    def test_history_lost_rebuilds(self):
+        self.db.state.docs["users"] = {"_id": "users", "resume_token": {"_data": "expired"}}
+        self.db.users.history_lost = True
+        self.db.users.events = [update_event("t3", "a", 2, 3)]
+        self.engine._run()
+
+        self.rebuild.assert_called_once()
+        self.assertEqual(self.engine.stats()["history_lost"], 1)
+        self.assertIn("start_at_operation_time", self.db.users.watch_calls[-1])
+        self.assertEqual(self.engine.loadResumeToken(), {"_data": "t3"})
+
+    def test_only_one_engine_holds_the_lease(self):
+        other = ViewEngine(db=self.db)
+        self.assertTrue(self.engine.acquireLease())
+        self.assertFalse(other.acquireLease())
+        self.assertTrue(self.engine.acquireLease())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from src.notifications.WebhookDigest import WebhookDigest, notify_counter_change
+
+class WebhookDigestTestCase(unittest.TestCase):
+    def setUp(self):
+        self.dispatcher = MagicMock()
+        self.digest = WebhookDigest(self.dispatcher, window=60)
+
+    def test_one_message_per_window(self):
+        for _ in range(5):
+            self.digest.record(1)
+        self.digest.record(-1)
+        self.digest.flush()
+        self.dispatcher.submit.assert_called_once_with(
+            {"content": "In the last 60 seconds: 5 people lost the game and 1 person unlost the game"}
+        )
+
+    def test_counts_reset_after_flush(self):
+        self.digest.record(1)
+        self.digest.flush()
+        self.digest.record(-1)
+        self.digest.flush()
+        self.assertEqual(self.dispatcher.submit.call_args_list[1].args[0],
+                         {"content": "In the last 60 seconds: 1 person unlost the game"})
+
+    def test_empty_window_sends_nothing(self):
+        self.digest.flush()
+        self.dispatcher.submit.assert_not_called()
+
+    def test_close_sends_partial_window(self):
+        self.digest.start()
+        self.digest.record(1)
+        self.digest.close()
+        self.dispatcher.submit.assert_called_once()
+
+
+class NotifyCounterChangeTestCase(unittest.TestCase):
+    @patch.dict('env.env', {}, clear=True)
+    @patch('src.notifications.WebhookDigest.get_webhook_dispatcher')
+    def test_immediate_mode(self, mock_get_dispatcher):
+        notify_counter_change(-1)
+        mock_get_dispatcher.return_value.submit.assert_called_once_with({"content": "Someone just unlost the game"})
+
+    @patch.dict('env.env', {'WEBHOOK_MODE': 'digest'}, clear=True)
+    @patch('src.notifications.WebhookDigest.get_webhook_digest')
+    @patch('src.notifications.WebhookDigest.get_webhook_dispatcher')
+    def test_digest_mode(self, mock_get_dispatcher, mock_get_digest):
+        notify_counter_change(1)
+        mock_get_digest.return_value.record.assert_called_once_with(1)
+        mock_get_dispatcher.return_value.submit.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
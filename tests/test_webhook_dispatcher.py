@@ -0,0 +1,116 @@
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from src.notifications.WebhookDispatcher import WebhookDispatcher
+
+class StubWebhookServer(HTTPServer):
+    """
+    Local stand-in for the Discord webhook endpoint. Each POST pops the next
+    (status, headers, body) from `responses`, defaulting to 204.
+    """
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StubWebhookHandler)
+        self.responses = []
+        self.received = []
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/webhook"
+
+
+class StubWebhookHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.server.received.append(json.loads(self.rfile.read(length)))
+        status, headers, body = self.server.responses.pop(0) if self.server.responses else (204, {}, None)
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        payload = json.dumps(body).encode() if body is not None else b''
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class WebhookDispatcherTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = StubWebhookServer()
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def make_dispatcher(self, **kwargs):
+        kwargs.setdefault('backoff', 0.01)
+        dispatcher = WebhookDispatcher(self.server.url, **kwargs)
+        self.addCleanup(dispatcher.close, 1.0)
+        return dispatcher
+
+    def test_sends_in_background(self):
+        dispatcher = self.make_dispatcher()
+        dispatcher.start()
+        dispatcher.submit({"content": "Someone just lost the game"})
+        dispatcher.close()
+        self.assertEqual(self.server.received, [{"content": "Someone just lost the game"}])
+        self.assertEqual(dispatcher.stats()["sent"], 1)
+
+    def test_retries_server_errors(self):
+        self.server.responses = [(500, {}, None), (502, {}, None)]
+        dispatcher = self.make_dispatcher()
+        dispatcher.start()
+        dispatcher.submit({"content": "x"})
+        dispatcher.close()
+        stats = dispatcher.stats()
+        self.assertEqual(len(self.server.received), 3)
+        self.assertEqual(stats["sent"], 1)
+        self.assertEqual(stats["retried"], 2)
+
+    def test_rate_limited_waits_for_retry_after(self):
+        self.server.responses = [(429, {}, {"retry_after": 0.2})]
+        dispatcher = self.make_dispatcher()
+        dispatcher.start()
+        started = time.monotonic()
+        dispatcher.submit({"content": "x"})
+        dispatcher.close()
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+        stats = dispatcher.stats()
+        self.assertEqual(stats["rate_limited"], 1)
+        self.assertEqual(stats["sent"], 1)
+
+    def test_client_error_not_retried(self):
+        self.server.responses = [(404, {}, None)]
+        dispatcher = self.make_dispatcher()
+        dispatcher.start()
+        dispatcher.submit({"content": "x"})
+        dispatcher.close()
+        self.assertEqual(len(self.server.received), 1)
+        self.assertEqual(dispatcher.stats()["failed"], 1)
+
+    def test_overflow_drops_oldest(self):
+        dispatcher = self.make_dispatcher(workers=1, max_queue=2)
+        self.assertTrue(dispatcher.submit({"content": "1"}))
+        self.assertTrue(dispatcher.submit({"content": "2"}))
+        self.assertFalse(dispatcher.submit({"content": "3"}))
+        stats = dispatcher.stats()
+        self.assertEqual(stats["queue_depth"], 2)
+        self.assertEqual(stats["dropped"], 1)
+
+        dispatcher.start()
+        dispatcher.close()
+        self.assertEqual(self.server.received, [{"content": "2"}, {"content": "3"}])
+
+    def test_unreachable_endpoint_fails_after_retries(self):
+        dispatcher = WebhookDispatcher("http://127.0.0.1:9/webhook", max_retries=1, backoff=0.01, timeout=0.5)
+        dispatcher.start()
+        dispatcher.submit({"content": "x"})
+        dispatcher.close()
+        self.assertEqual(dispatcher.stats()["failed"], 1)
+
+if __name__ == '__main__':
+    unittest.main()